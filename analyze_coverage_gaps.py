@@ -3,8 +3,11 @@
 
 import os
 import sys
+import ast
 import argparse
 import xml.etree.ElementTree as ET
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 import re
 from collections import defaultdict
@@ -22,8 +25,12 @@ DEFAULT_EXCLUDE_PATTERNS = [
 def parse_args():
     """Parse command line arguments"""
     parser = argparse.ArgumentParser(description='Analyze test coverage gaps')
-    parser.add_argument('--coverage-xml', type=str, default=str(DEFAULT_COVERAGE_XML),
-                        help=f'Path to coverage XML report (default: {DEFAULT_COVERAGE_XML})')
+    parser.add_argument('--coverage-xml', type=str, nargs='+', default=[str(DEFAULT_COVERAGE_XML)],
+                        help=f'Coverage XML report(s) to merge (default: {DEFAULT_COVERAGE_XML})')
+    parser.add_argument('--baseline', type=str, nargs='+',
+                        help='Baseline coverage XML report(s); only report lines newly uncovered/covered since')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Processes used to parse multiple reports (default: one per report, up to CPU count)')
     parser.add_argument('--exclude-patterns', type=str, nargs='+', default=DEFAULT_EXCLUDE_PATTERNS,
                         help='Patterns to exclude from analysis')
     return parser.parse_args()
@@ -35,30 +42,74 @@ def should_exclude(path, exclude_patterns):
             return True
     return False
 
+class FunctionIndex:
+    """Line -> innermost enclosing function/class lookup for one source file.
+
+    The file is parsed once with ``ast``. Definitions are properly nested, so
+    they are flattened into sorted, non-overlapping line segments, each owned by
+    the innermost definition covering it; lookups are a single bisect.
+    Names are qualified (``Outer.method``, ``func.inner``) so nested and async
+    methods are attributed correctly regardless of how deep the line is.
+    """
+
+    _DEF_NODES = (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)
+
+    def __init__(self, file_content):
+        self.starts = []
+        self.segments = []
+        if not file_content:
+            return
+        try:
+            tree = ast.parse(file_content)
+        except SyntaxError as e:
+            print(f"Could not parse source for function lookup: {e}")
+            return
+        for node in self._child_defs(tree):
+            self._add_segments(node, '')
+
+    @classmethod
+    def _child_defs(cls, node):
+        """Direct definition descendants of ``node`` (looking through if/try/with blocks)."""
+        found = []
+        for child in ast.iter_child_nodes(node):
+            if isinstance(child, cls._DEF_NODES):
+                found.append(child)
+            else:
+                found.extend(cls._child_defs(child))
+        return sorted(found, key=cls._start)
+
+    @staticmethod
+    def _start(node):
+        # Decorator lines belong to the definition they decorate
+        return min([node.lineno] + [d.lineno for d in node.decorator_list])
+
+    def _add_segments(self, node, prefix):
+        name = f"{prefix}{node.name}"
+        cursor = self._start(node)
+        for child in self._child_defs(node):
+            child_start = self._start(child)
+            if child_start > cursor:
+                self._add(cursor, child_start - 1, name)
+            self._add_segments(child, f"{name}.")
+            cursor = child.end_lineno + 1
+        if node.end_lineno >= cursor:
+            self._add(cursor, node.end_lineno, name)
+
+    def _add(self, start, end, name):
+        self.starts.append(start)
+        self.segments.append((end, name))
+
+    def lookup(self, line):
+        """Return the qualified name of the definition enclosing ``line`` (or None)."""
+        i = bisect_right(self.starts, line) - 1
+        if i < 0:
+            return None
+        end, name = self.segments[i]
+        return name if line <= end else None
+
 def extract_function_name(line, file_content):
     """Extract function name from a line number"""
-    if not file_content:
-        return None
-    
-    lines = file_content.split('\n')
-    if line > len(lines):
-        return None
-    
-    # Look for function definition in current line and above
-    for i in range(line, max(0, line-10), -1):
-        if i-1 >= len(lines):
-            continue
-        current_line = lines[i-1].strip()
-        # Match function or method definition
-        match = re.match(r'^(async\s+)?def\s+([a-zA-Z0-9_]+)\s*\(', current_line)
-        if match:
-            return match.group(2)
-        # Match class definition
-        match = re.match(r'^class\s+([a-zA-Z0-9_]+)\s*[\(:]', current_line)
-        if match:
-            return match.group(1)
-    
-    return None
+    return FunctionIndex(file_content).lookup(line)
 
 def read_file_content(file_path):
     """Read file content safely"""
@@ -69,48 +120,145 @@ def read_file_content(file_path):
         print(f"Error reading file {file_path}: {e}")
         return None
 
-def analyze_coverage_xml(coverage_xml_path, exclude_patterns):
-    """Analyze coverage XML report and identify gaps"""
-    if not os.path.exists(coverage_xml_path):
-        print(f"Coverage XML file not found: {coverage_xml_path}")
+def parse_coverage_hits(coverage_xml_path):
+    """Stream one coverage XML report into ``{filename: {line_number: hits}}``.
+
+    The report is read with ``iterparse`` and each ``<class>`` element is
+    released once processed, so memory stays flat on large reports.
+    """
+    hits_by_file = defaultdict(dict)
+    for _, elem in ET.iterparse(coverage_xml_path):
+        if elem.tag != 'class':
+            continue
+        file_hits = hits_by_file[elem.attrib.get('filename')]
+        for line in elem.iterfind('lines/line'):
+            number = int(line.attrib.get('number', '0'))
+            file_hits[number] = file_hits.get(number, 0) + int(line.attrib.get('hits', '0'))
+        elem.clear()
+    return dict(hits_by_file)
+
+def merge_coverage_hits(reports):
+    """Sum hit counts per file/line across several parsed reports."""
+    merged = defaultdict(dict)
+    for report in reports:
+        for filename, file_hits in report.items():
+            merged_file = merged[filename]
+            for number, hits in file_hits.items():
+                merged_file[number] = merged_file.get(number, 0) + hits
+    return dict(merged)
+
+def _as_path_list(coverage_xml_paths):
+    if isinstance(coverage_xml_paths, (str, os.PathLike)):
+        return [str(coverage_xml_paths)]
+    return [str(path) for path in coverage_xml_paths]
+
+def parse_coverage_reports(coverage_xml_paths, workers=None):
+    """Parse reports in parallel worker processes; returns one hits dict per path."""
+    paths = _as_path_list(coverage_xml_paths)
+    missing = [path for path in paths if not os.path.exists(path)]
+    if missing:
+        for path in missing:
+            print(f"Coverage XML file not found: {path}")
         return None
+    if len(paths) == 1 or workers == 1:
+        return [parse_coverage_hits(path) for path in paths]
+    max_workers = workers or min(len(paths), os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        return list(pool.map(parse_coverage_hits, paths))
+
+def _uncovered_with_functions(lines_by_file):
+    """Attach enclosing function names to ``{filename: [line_number]}``."""
+    uncovered_by_file = defaultdict(list)
+    for filename, line_numbers in lines_by_file.items():
+        if not line_numbers:
+            continue
+        # coverage.xml paths are relative to backend/app, so prepend that path
+        file_path = os.path.join('backend', 'app', filename)
+        index = FunctionIndex(read_file_content(file_path))
+        for line_number in sorted(line_numbers):
+            uncovered_by_file[filename].append({
+                'line': line_number,
+                'function': index.lookup(line_number)
+            })
+    return uncovered_by_file
+
+def _line_rate(hits_by_file):
+    total = sum(len(file_hits) for file_hits in hits_by_file.values())
+    covered = sum(1 for file_hits in hits_by_file.values() for hits in file_hits.values() if hits > 0)
+    return covered / total * 100 if total else 0.0
+
+def build_coverage_data(hits_by_file, exclude_patterns):
+    """Turn merged hit counts into the ``analyze_coverage_xml`` result shape."""
+    uncovered_lines = {
+        filename: [number for number, hits in file_hits.items() if hits == 0]
+        for filename, file_hits in hits_by_file.items()
+        if not should_exclude(filename, exclude_patterns)
+    }
+    return {
+        'overall_coverage': _line_rate(hits_by_file),
+        'uncovered_by_file': _uncovered_with_functions(uncovered_lines)
+    }
+
+def analyze_coverage_xml(coverage_xml_path, exclude_patterns, workers=None):
+    """Analyze one or more coverage XML reports and identify gaps.
+
+    Several reports (e.g. pytest + behave, or one per CI shard) are parsed in
+    parallel and their hit counts merged per file/line, so a line only counts
+    as uncovered if no report executed it. Source files are parsed into a
+    ``FunctionIndex`` once, and only if they have uncovered lines.
+    """
+    try:
+        reports = parse_coverage_reports(coverage_xml_path, workers)
+        if reports is None:
+            return None
+        return build_coverage_data(merge_coverage_hits(reports), exclude_patterns)
     
+    except Exception as e:
+        print(f"Error parsing coverage XML: {e}")
+        return None
+
+def diff_coverage_hits(baseline_hits, current_hits, exclude_patterns):
+    """Lines newly uncovered and newly covered between two merged snapshots.
+
+    A line is newly uncovered when it has no hits now but was covered (or did
+    not exist) in the baseline, and newly covered when it had no hits in the
+    baseline but has hits now.
+    """
+    newly_uncovered = {}
+    newly_covered = {}
+    for filename, file_hits in current_hits.items():
+        if should_exclude(filename, exclude_patterns):
+            continue
+        baseline_file = baseline_hits.get(filename, {})
+        newly_uncovered[filename] = [
+            number for number, hits in file_hits.items()
+            if hits == 0 and baseline_file.get(number, 1) > 0
+        ]
+        newly_covered[filename] = [
+            number for number, hits in file_hits.items()
+            if hits > 0 and baseline_file.get(number) == 0
+        ]
+    return newly_uncovered, newly_covered
+
+def analyze_coverage_diff(coverage_xml_paths, baseline_xml_paths, exclude_patterns, workers=None):
+    """Compare merged current reports against merged baseline reports."""
+    current_paths = _as_path_list(coverage_xml_paths)
+    baseline_paths = _as_path_list(baseline_xml_paths)
     try:
-        tree = ET.parse(coverage_xml_path)
-        root = tree.getroot()
-        
-        # Extract overall coverage
-        overall_coverage = float(root.attrib.get('line-rate', '0')) * 100
-        
-        # Extract uncovered lines by file
-        uncovered_by_file = defaultdict(list)
-        
-        for package in root.findall('.//package'):
-            for class_elem in package.findall('.//class'):
-                filename = class_elem.attrib.get('filename')
-                
-                # Skip excluded files
-                if should_exclude(filename, exclude_patterns):
-                    continue
-                
-                # Get file content for function name extraction
-                # coverage.xml paths are relative to backend/app, so prepend that path
-                file_path = os.path.join('backend', 'app', filename)
-                file_content = read_file_content(file_path)
-                
-                for line in class_elem.findall('.//line'):
-                    hits = int(line.attrib.get('hits', '0'))
-                    if hits == 0:  # Uncovered line
-                        line_number = int(line.attrib.get('number', '0'))
-                        function_name = extract_function_name(line_number, file_content)
-                        uncovered_by_file[filename].append({
-                            'line': line_number,
-                            'function': function_name
-                        })
-        
+        # Parse both snapshots in a single pool so all reports are read concurrently
+        reports = parse_coverage_reports(current_paths + baseline_paths, workers)
+        if reports is None:
+            return None
+        current_hits = merge_coverage_hits(reports[:len(current_paths)])
+        baseline_hits = merge_coverage_hits(reports[len(current_paths):])
+        newly_uncovered, newly_covered = diff_coverage_hits(
+            baseline_hits, current_hits, exclude_patterns
+        )
         return {
-            'overall_coverage': overall_coverage,
-            'uncovered_by_file': uncovered_by_file
+            'overall_coverage': _line_rate(current_hits),
+            'baseline_coverage': _line_rate(baseline_hits),
+            'uncovered_by_file': _uncovered_with_functions(newly_uncovered),
+            'newly_covered_by_file': _uncovered_with_functions(newly_covered)
         }
     
     except Exception as e:
@@ -154,6 +302,26 @@ def print_coverage_gaps(coverage_data):
         
         print()
 
+def print_coverage_diff(diff_data):
+    """Print lines newly uncovered/covered relative to the baseline"""
+    if not diff_data:
+        print("No coverage data available.")
+        return
+    
+    print(f"\n=== Coverage Diff Against Baseline ===\n")
+    print(f"Baseline coverage: {diff_data['baseline_coverage']:.2f}%")
+    print(f"Current coverage: {diff_data['overall_coverage']:.2f}%")
+    
+    for title, key in (("Newly uncovered", 'uncovered_by_file'),
+                       ("Newly covered", 'newly_covered_by_file')):
+        print(f"\n{title} code by file:\n")
+        for filename, lines in sorted(diff_data[key].items()):
+            print(f"File: {filename}")
+            for function, numbers in sorted(group_by_function(lines).items()):
+                print(f"  Function: {function}")
+                print(f"    Lines: {', '.join(map(str, sorted(numbers)))}")
+            print()
+
 def generate_bdd_suggestions(coverage_data):
     """Generate BDD test suggestions for uncovered code"""
     if not coverage_data:
@@ -219,8 +387,20 @@ def main():
     """Main function"""
     args = parse_args()
     
+    if args.baseline:
+        # Only report regressions/improvements since the baseline snapshot
+        coverage_data = analyze_coverage_diff(
+            args.coverage_xml, args.baseline, args.exclude_patterns, args.workers
+        )
+        if not coverage_data:
+            print("Failed to analyze coverage data.")
+            return 1
+        print_coverage_diff(coverage_data)
+        generate_bdd_suggestions(coverage_data)
+        return 0
+    
     # Analyze coverage XML
-    coverage_data = analyze_coverage_xml(args.coverage_xml, args.exclude_patterns)
+    coverage_data = analyze_coverage_xml(args.coverage_xml, args.exclude_patterns, args.workers)
     
     if not coverage_data:
         print("Failed to analyze coverage data.")
@@ -0,0 +1,95 @@
+"""Add full-text search vector and title prefix index to items
+
+Revision ID: 1523974583f0
+Revises: 1a31ce608336
+Create Date: 2026-10-17 10:12:31.204118
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '1523974583f0'
+down_revision = '1a31ce608336'
+branch_labels = None
+depends_on = None
+
+SEARCH_DOCUMENT = (
+    "to_tsvector('english', coalesce({row}title, '') || ' ' || coalesce({row}description, ''))"
+)
+BACKFILL_BATCH_SIZE = 5000
+
+
+def upgrade():
+    # A STORED generated column would rewrite the whole table under an
+    # ACCESS EXCLUSIVE lock. A nullable column is only a catalog change, and a
+    # trigger keeps it up to date from here on
+    op.add_column('item', sa.Column('search_vector', postgresql.TSVECTOR(), nullable=True))
+    op.execute(f"""
+        CREATE FUNCTION item_search_vector_update() RETURNS trigger AS $$
+        BEGIN
+            NEW.search_vector := {SEARCH_DOCUMENT.format(row='NEW.')};
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER item_search_vector_update
+        BEFORE INSERT OR UPDATE OF title, description ON item
+        FOR EACH ROW EXECUTE FUNCTION item_search_vector_update()
+    """)
+
+    with op.get_context().autocommit_block():
+        # Existing rows are filled in short transactions, walking the primary
+        # key, so each batch only locks its own rows
+        connection = op.get_bind()
+        last_id = None
+        while True:
+            ids = connection.execute(
+                sa.text(
+                    "SELECT id FROM item WHERE (CAST(:last_id AS uuid) IS NULL OR id > :last_id)"
+                    " ORDER BY id LIMIT :batch_size"
+                ),
+                {'last_id': last_id, 'batch_size': BACKFILL_BATCH_SIZE},
+            ).scalars().all()
+            if not ids:
+                break
+            connection.execute(
+                sa.text(
+                    f"UPDATE item SET search_vector = {SEARCH_DOCUMENT.format(row='')}"
+                    " WHERE id = ANY(:ids) AND search_vector IS NULL"
+                ),
+                {'ids': ids},
+            )
+            last_id = ids[-1]
+
+        # CONCURRENTLY can't run inside a transaction block, but doesn't lock
+        # the item table against writes while the indexes build
+        op.create_index(
+            'ix_item_search_vector',
+            'item',
+            ['search_vector'],
+            postgresql_using='gin',
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_item_title_lower_pattern',
+            'item',
+            [sa.text('lower(title) text_pattern_ops')],
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_item_title_lower_pattern', table_name='item', postgresql_concurrently=True
+        )
+        op.drop_index(
+            'ix_item_search_vector', table_name='item', postgresql_concurrently=True
+        )
+    op.execute("DROP TRIGGER item_search_vector_update ON item")
+    op.execute("DROP FUNCTION item_search_vector_update()")
+    op.drop_column('item', 'search_vector')
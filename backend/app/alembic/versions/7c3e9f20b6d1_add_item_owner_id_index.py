@@ -0,0 +1,36 @@
+"""Add index on item.owner_id
+
+Revision ID: 7c3e9f20b6d1
+Revises: 1523974583f0
+Create Date: 2026-10-17 11:02:48.519362
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '7c3e9f20b6d1'
+down_revision = '1523974583f0'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # CONCURRENTLY can't run inside a transaction block, but doesn't lock the
+    # item table against writes while the index builds
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_item_owner_id_id',
+            'item',
+            ['owner_id', 'id'],
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_item_owner_id_id',
+            table_name='item',
+            postgresql_concurrently=True,
+        )
@@ -0,0 +1,27 @@
+"""Add version columns to user and item
+
+Revision ID: b4d71e05a9c2
+Revises: 7c3e9f20b6d1
+Create Date: 2026-10-17 11:48:05.771203
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b4d71e05a9c2'
+down_revision = '7c3e9f20b6d1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # A constant server default doesn't rewrite the table on Postgres 11+
+    op.add_column('user', sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+    op.add_column('item', sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade():
+    op.drop_column('item', 'version')
+    op.drop_column('user', 'version')
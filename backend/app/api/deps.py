@@ -1,17 +1,18 @@
-from collections.abc import Generator
+from collections.abc import AsyncGenerator, Generator
 from typing import Annotated
 
-import jwt
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jwt.exceptions import InvalidTokenError
-from pydantic import ValidationError
 from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.core import security
 from app.core.config import settings
-from app.core.db import engine
-from app.models import TokenPayload, User
+from app.core.db import async_session_maker, engine
+from app.core.revocation import revocation_store
+from app.core.tokens import AccessToken, token_verifier
+from app.core.user_cache import attach_user, user_cache
+from app.models import User
 
 reusable_oauth2 = OAuth2PasswordBearer(
     tokenUrl=f"{settings.API_V1_STR}/login/access-token"
@@ -23,30 +24,89 @@ def get_db() -> Generator[Session, None, None]:
         yield session
 
 
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    async with async_session_maker() as session:
+        yield session
+
+
 SessionDep = Annotated[Session, Depends(get_db)]
+AsyncSessionDep = Annotated[AsyncSession, Depends(get_async_db)]
 TokenDep = Annotated[str, Depends(reusable_oauth2)]
 
 
-def get_current_user(session: SessionDep, token: TokenDep) -> User:
+def decode_access_token(token: str) -> AccessToken:
     try:
-        payload = jwt.decode(
-            token, settings.SECRET_KEY, algorithms=[security.ALGORITHM]
+        return token_verifier.verify(token)
+    except InvalidTokenError:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Could not validate credentials",
         )
-        token_data = TokenPayload(**payload)
-    except (InvalidTokenError, ValidationError):
+
+
+def check_not_revoked(access_token: AccessToken) -> None:
+    if revocation_store.is_revoked(access_token):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Could not validate credentials",
         )
-    user = session.get(User, token_data.sub)
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
+
+
+def check_user_active(user: User) -> User:
     if not user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
     return user
 
 
+def refresh_auth_state(session: Session) -> None:
+    """
+    Pick up the revocations and user changes made by other processes. Only
+    the one request that wins the due refresh runs the queries.
+    """
+    if revocation_store.refresh(session, only_if_due=True):
+        user_cache.refresh_versions(session)
+
+
+def get_current_user(session: SessionDep, token: TokenDep) -> User:
+    # Verified tokens are cached, so this and the revocation check cost
+    # lookups rather than a signature check and a query
+    access_token = decode_access_token(token)
+    if revocation_store.refresh_due():
+        refresh_auth_state(session)
+    check_not_revoked(access_token)
+    snapshot = user_cache.get(token)
+    if snapshot is not None:
+        return check_user_active(attach_user(session, snapshot))
+    generation = user_cache.generation()
+    user = session.get(User, access_token.subject)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    user_cache.put(
+        token, user, token_expires_at=access_token.expires_at, generation=generation
+    )
+    return check_user_active(user)
+
+
+async def get_current_user_async(session: AsyncSessionDep, token: TokenDep) -> User:
+    access_token = decode_access_token(token)
+    if revocation_store.refresh_due():
+        await session.run_sync(refresh_auth_state)
+    check_not_revoked(access_token)
+    snapshot = user_cache.get(token)
+    if snapshot is not None:
+        return check_user_active(attach_user(session.sync_session, snapshot))
+    generation = user_cache.generation()
+    user = await session.get(User, access_token.subject)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    user_cache.put(
+        token, user, token_expires_at=access_token.expires_at, generation=generation
+    )
+    return check_user_active(user)
+
+
 CurrentUser = Annotated[User, Depends(get_current_user)]
+AsyncCurrentUser = Annotated[User, Depends(get_current_user_async)]
 
 
 def get_current_active_superuser(current_user: CurrentUser) -> User:
@@ -55,3 +115,11 @@ def get_current_active_superuser(current_user: CurrentUser) -> User:
             status_code=403, detail="The user doesn't have enough privileges"
         )
     return current_user
+
+
+async def get_current_active_superuser_async(current_user: AsyncCurrentUser) -> User:
+    if not current_user.is_superuser:
+        raise HTTPException(
+            status_code=403, detail="The user doesn't have enough privileges"
+        )
+    return current_user
@@ -0,0 +1,55 @@
+import hashlib
+import uuid
+from collections.abc import Iterable
+from typing import Any, Protocol
+
+from fastapi import HTTPException, Response
+
+
+class Versioned(Protocol):
+    id: uuid.UUID
+    version: int
+
+
+def _etag(*parts: Any) -> str:
+    digest = hashlib.blake2b(repr(parts).encode(), digest_size=16).hexdigest()
+    return f'W/"{digest}"'
+
+
+def row_etag(row: Versioned) -> str:
+    """Weak ETag of a single row, changes whenever the row is updated."""
+    return _etag(type(row).__name__, row.id, row.version)
+
+
+def list_etag(rows: Iterable[Versioned], *extra: Any) -> str:
+    """
+    Weak ETag of a page of rows; `extra` holds the other parts of the
+    response, such as the count and the next cursor.
+    """
+    return _etag([(row.id, row.version) for row in rows], *extra)
+
+
+def etag_matches(header: str | None, etag: str) -> bool:
+    """
+    Whether an If-None-Match / If-Match header value lists `etag`.
+
+    Uses weak comparison for both headers, as all our ETags are weak.
+    """
+    if header is None:
+        return False
+    if header.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in header.split(","))
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag})
+
+
+def check_if_match(if_match: str | None, etag: str) -> None:
+    """Reject a write whose If-Match doesn't name the current version."""
+    if if_match is not None and not etag_matches(if_match, etag):
+        raise HTTPException(
+            status_code=412, detail="The resource has been modified since it was read"
+        )
@@ -0,0 +1,145 @@
+import base64
+import binascii
+import json
+import uuid
+from collections.abc import Sequence
+from typing import Annotated, Any, Literal, TypeVar
+
+from fastapi import HTTPException, Query
+from sqlalchemy import text
+from sqlmodel import Session, SQLModel, func, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+ModelT = TypeVar("ModelT", bound=SQLModel)
+
+# How list endpoints compute `count`:
+# exact: count(*) OVER () in the page query itself (no extra round-trip)
+# estimate: planner estimate from pg_class.reltuples for unfiltered listings
+# none: skip counting, `count` is null
+CountMode = Literal["exact", "estimate", "none"]
+
+# Largest page a list endpoint returns
+MAX_PAGE_SIZE = 1000
+
+Skip = Annotated[int, Query(ge=0)]
+Limit = Annotated[int, Query(ge=1, le=MAX_PAGE_SIZE)]
+
+
+def encode_cursor(values: list[Any]) -> str:
+    """Encode the sort key of the last row of a page as an opaque cursor."""
+    raw = json.dumps([str(value) for value in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> list[str] | None:
+    """
+    Decode a cursor produced by `encode_cursor`.
+
+    An empty cursor starts from the first page and returns None.
+    """
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not isinstance(values, list) or len(values) != size:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return [str(value) for value in values]
+
+
+def decode_uuid_cursor(cursor: str, size: int) -> list[uuid.UUID] | None:
+    """Decode a cursor whose sort key is made of UUID columns."""
+    values = decode_cursor(cursor, size)
+    if values is None:
+        return None
+    try:
+        return [uuid.UUID(value) for value in values]
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def count_rows(session: Session, model: type[SQLModel], filters: Sequence[Any]) -> int:
+    statement = select(func.count()).select_from(model).where(*filters)
+    return session.exec(statement).one()
+
+
+def estimate_rows(session: Session, model: type[SQLModel]) -> int | None:
+    """
+    Approximate row count of the model's table from the planner statistics.
+
+    Returns None when the table has never been analyzed.
+    """
+    estimate = (
+        session.connection()
+        .execute(
+            text("SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(:table)"),
+            {"table": model.__tablename__},
+        )
+        .scalar()
+    )
+    if estimate is None or estimate < 0:
+        return None
+    return int(estimate)
+
+
+def fetch_page(
+    session: Session,
+    model: type[ModelT],
+    *,
+    filters: Sequence[Any] = (),
+    keyset: Sequence[Any] = (),
+    order_by: Sequence[Any] = (),
+    offset: int = 0,
+    limit: int,
+    count_mode: CountMode = "exact",
+) -> tuple[list[ModelT], int | None]:
+    """
+    Fetch one page of `model` rows matching `filters`, plus the total count.
+
+    `keyset` predicates narrow the page but not the count. When they are absent,
+    an exact count is taken with a window function in the same query, so only
+    one round-trip is made.
+    """
+    if count_mode == "estimate" and not filters:
+        estimate = estimate_rows(session, model)
+        if estimate is not None:
+            rows = session.exec(
+                select(model)
+                .where(*filters, *keyset)
+                .order_by(*order_by)
+                .offset(offset)
+                .limit(limit)
+            ).all()
+            return list(rows), estimate
+    if count_mode != "none" and not keyset:
+        counted = session.exec(
+            select(model, func.count().over())
+            .where(*filters)
+            .order_by(*order_by)
+            .offset(offset)
+            .limit(limit)
+        ).all()
+        if counted:
+            return [row[0] for row in counted], counted[0][1]
+        # An empty page carries no window value; only past the end is a count needed
+        return [], count_rows(session, model, filters) if offset else 0
+
+    rows = session.exec(
+        select(model)
+        .where(*filters, *keyset)
+        .order_by(*order_by)
+        .offset(offset)
+        .limit(limit)
+    ).all()
+    if count_mode == "none":
+        return list(rows), None
+    return list(rows), count_rows(session, model, filters)
+
+
+async def fetch_page_async(
+    session: AsyncSession, model: type[ModelT], **kwargs: Any
+) -> tuple[list[ModelT], int | None]:
+    """`fetch_page` for async sessions; queries run without blocking the event loop."""
+    return await session.run_sync(fetch_page, model, **kwargs)
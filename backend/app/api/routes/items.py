@@ -1,48 +1,238 @@
 import uuid
-from typing import Any
+from typing import Annotated, Any, Literal
 
-from fastapi import APIRouter, HTTPException
-from sqlmodel import func, select
+from fastapi import APIRouter, Header, HTTPException, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.dialects.postgresql import websearch_to_tsquery
+from sqlmodel import col, func, tuple_
 
+from app import crud
 from app.api.deps import CurrentUser, SessionDep
-from app.models import Item, ItemCreate, ItemPublic, ItemsPublic, ItemUpdate, Message
+from app.api.etag import (
+    check_if_match,
+    etag_matches,
+    list_etag,
+    not_modified,
+    row_etag,
+)
+from app.api.export import ExportFormat, export_rows
+from app.api.pagination import (
+    CountMode,
+    Limit,
+    Skip,
+    decode_uuid_cursor,
+    encode_cursor,
+    fetch_page,
+)
+from app.models import (
+    ITEM_SEARCH_CONFIG,
+    Item,
+    ItemCreate,
+    ItemPublic,
+    ItemsBulkCreate,
+    ItemsBulkDelete,
+    ItemsBulkDeleted,
+    ItemsBulkPublic,
+    ItemsBulkUpdate,
+    ItemsPublic,
+    ItemUpdate,
+    Message,
+    User,
+    item_search_vector,
+)
 
 router = APIRouter(prefix="/items", tags=["items"])
 
+# A leading "-" sorts descending; "rank" orders full-text matches by relevance
+ItemSort = Literal["title", "-title", "description", "-description", "rank"]
+
+
+def item_filters(
+    current_user: User, title_prefix: str | None = None, q: str | None = None
+) -> list[Any]:
+    """Filters shared by the item list and export endpoints."""
+    filters: list[Any] = []
+    if not current_user.is_superuser:
+        filters.append(Item.owner_id == current_user.id)
+    if title_prefix:
+        filters.append(
+            func.lower(Item.title).startswith(title_prefix.lower(), autoescape=True)
+        )
+    if q:
+        filters.append(
+            item_search_vector.bool_op("@@")(
+                websearch_to_tsquery(ITEM_SEARCH_CONFIG, q)
+            )
+        )
+    return filters
+
+
+def item_order_by(sort: ItemSort | None, q: str | None = None) -> list[Any]:
+    if sort is None:
+        return []
+    if sort == "rank":
+        if not q:
+            raise HTTPException(status_code=400, detail="Sorting by rank requires q")
+        rank = func.ts_rank(
+            item_search_vector, websearch_to_tsquery(ITEM_SEARCH_CONFIG, q)
+        )
+        return [rank.desc(), col(Item.id)]
+    column = col(getattr(Item, sort.lstrip("-")))
+    # id breaks ties so that skip/limit pages don't overlap
+    return [column.desc() if sort.startswith("-") else column, col(Item.id)]
+
 
 @router.get("/", response_model=ItemsPublic)
 def read_items(
-    session: SessionDep, current_user: CurrentUser, skip: int = 0, limit: int = 100
+    response: Response,
+    session: SessionDep,
+    current_user: CurrentUser,
+    skip: Skip = 0,
+    limit: Limit = 100,
+    cursor: str | None = None,
+    count_mode: CountMode = "exact",
+    title_prefix: str | None = None,
+    q: str | None = None,
+    sort: ItemSort | None = None,
+    if_none_match: Annotated[str | None, Header()] = None,
 ) -> Any:
     """
     Retrieve items.
+
+    Pass `cursor` (empty for the first page, then the returned `next_cursor`)
+    to page by `(owner_id, id)` instead of `skip`, which stays fast on deep pages.
+    `count_mode` selects an exact, estimated (superusers only) or omitted `count`.
+    `title_prefix` matches titles case-insensitively, `q` is a full-text search
+    on title and description (web search syntax) and `sort` orders the results;
+    `sort` can't be combined with `cursor`.
+    Responds 304 when `If-None-Match` holds the ETag of an unchanged page.
     """
 
-    if current_user.is_superuser:
-        count_statement = select(func.count()).select_from(Item)
-        count = session.exec(count_statement).one()
-        statement = select(Item).offset(skip).limit(limit)
-        items = session.exec(statement).all()
-    else:
-        count_statement = (
-            select(func.count())
-            .select_from(Item)
-            .where(Item.owner_id == current_user.id)
+    filters = item_filters(current_user, title_prefix, q)
+    order_by = item_order_by(sort, q)
+
+    if cursor is not None:
+        if sort is not None:
+            raise HTTPException(
+                status_code=400, detail="sort is not supported with cursor"
+            )
+        after = decode_uuid_cursor(cursor, 2)
+        keyset = (
+            [tuple_(col(Item.owner_id), col(Item.id)) > tuple_(*after)] if after else []
+        )
+        items, count = fetch_page(
+            session,
+            Item,
+            filters=filters,
+            keyset=keyset,
+            order_by=[col(Item.owner_id), col(Item.id)],
+            limit=limit + 1,
+            count_mode=count_mode,
         )
-        count = session.exec(count_statement).one()
-        statement = (
-            select(Item)
-            .where(Item.owner_id == current_user.id)
-            .offset(skip)
-            .limit(limit)
+        next_cursor = None
+        if len(items) > limit:
+            items = items[:limit]
+            next_cursor = encode_cursor([items[-1].owner_id, items[-1].id])
+    else:
+        items, count = fetch_page(
+            session,
+            Item,
+            filters=filters,
+            order_by=order_by,
+            offset=skip,
+            limit=limit,
+            count_mode=count_mode,
         )
-        items = session.exec(statement).all()
+        next_cursor = None
 
-    return ItemsPublic(data=items, count=count)
+    etag = list_etag(items, count, next_cursor)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
+    return ItemsPublic(data=items, count=count, next_cursor=next_cursor)
+
+
+@router.get("/export")
+def export_items(
+    session: SessionDep,
+    current_user: CurrentUser,
+    format: ExportFormat = "ndjson",
+    title_prefix: str | None = None,
+    q: str | None = None,
+) -> StreamingResponse:
+    """
+    Export all items visible to the user as NDJSON or CSV.
+
+    The response is streamed in batches, so it can cover any number of items.
+    `title_prefix` and `q` filter as in the item list.
+    """
+    return export_rows(
+        session,
+        Item,
+        ItemPublic,
+        filters=item_filters(current_user, title_prefix, q),
+        order_by=[col(Item.owner_id), col(Item.id)],
+        format=format,
+    )
+
+
+@router.post("/bulk", response_model=ItemsBulkPublic)
+def create_items_bulk(
+    *, session: SessionDep, current_user: CurrentUser, items_in: ItemsBulkCreate
+) -> Any:
+    """
+    Create many items in one transaction.
+    """
+    items = crud.create_items(
+        session=session, items_in=items_in.data, owner_id=current_user.id
+    )
+    return ItemsBulkPublic(data=items, errors=[])
+
+
+@router.patch("/bulk", response_model=ItemsBulkPublic)
+def update_items_bulk(
+    *, session: SessionDep, current_user: CurrentUser, items_in: ItemsBulkUpdate
+) -> Any:
+    """
+    Update many items in one transaction.
+
+    Items that don't exist or belong to another user are listed in `errors`
+    by their position in the request, the others are updated.
+    """
+    items, errors = crud.update_items(
+        session=session,
+        items_in=items_in.data,
+        owner_id=None if current_user.is_superuser else current_user.id,
+    )
+    return ItemsBulkPublic(data=items, errors=errors)
+
+
+@router.delete("/bulk", response_model=ItemsBulkDeleted)
+def delete_items_bulk(
+    *, session: SessionDep, current_user: CurrentUser, items_in: ItemsBulkDelete
+) -> Any:
+    """
+    Delete many items in one transaction.
+
+    Items that don't exist or belong to another user are listed in `errors`
+    by their position in the request, the others are deleted.
+    """
+    ids, errors = crud.delete_items(
+        session=session,
+        ids=items_in.ids,
+        owner_id=None if current_user.is_superuser else current_user.id,
+    )
+    return ItemsBulkDeleted(ids=ids, errors=errors)
 
 
 @router.get("/{id}", response_model=ItemPublic)
-def read_item(session: SessionDep, current_user: CurrentUser, id: uuid.UUID) -> Any:
+def read_item(
+    response: Response,
+    session: SessionDep,
+    current_user: CurrentUser,
+    id: uuid.UUID,
+    if_none_match: Annotated[str | None, Header()] = None,
+) -> Any:
     """
     Get item by ID.
     """
@@ -51,6 +241,10 @@ def read_item(session: SessionDep, current_user: CurrentUser, id: uuid.UUID) ->
         raise HTTPException(status_code=404, detail="Item not found")
     if not current_user.is_superuser and (item.owner_id != current_user.id):
         raise HTTPException(status_code=400, detail="Not enough permissions")
+    etag = row_etag(item)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
     return item
 
 
@@ -71,24 +265,32 @@ def create_item(
 @router.put("/{id}", response_model=ItemPublic)
 def update_item(
     *,
+    response: Response,
     session: SessionDep,
     current_user: CurrentUser,
     id: uuid.UUID,
     item_in: ItemUpdate,
+    if_match: Annotated[str | None, Header()] = None,
 ) -> Any:
     """
     Update an item.
+
+    With `If-Match`, the update only applies if the item still has that ETag
+    and fails with 412 otherwise.
     """
-    item = session.get(Item, id)
+    # Lock the row so it can't change between the ETag check and the update
+    item = session.get(Item, id, with_for_update=if_match is not None)
     if not item:
         raise HTTPException(status_code=404, detail="Item not found")
     if not current_user.is_superuser and (item.owner_id != current_user.id):
         raise HTTPException(status_code=400, detail="Not enough permissions")
+    check_if_match(if_match, row_etag(item))
     update_dict = item_in.model_dump(exclude_unset=True)
     item.sqlmodel_update(update_dict)
     session.add(item)
     session.commit()
     session.refresh(item)
+    response.headers["ETag"] = row_etag(item)
     return item
 
 
@@ -0,0 +1,281 @@
+import uuid
+from typing import Annotated, Any
+
+from fastapi import APIRouter, Header, HTTPException, Response
+from fastapi.responses import StreamingResponse
+from sqlmodel import col, tuple_
+
+from app import crud
+from app.api.deps import AsyncCurrentUser, AsyncSessionDep
+from app.api.etag import (
+    check_if_match,
+    etag_matches,
+    list_etag,
+    not_modified,
+    row_etag,
+)
+from app.api.export import ExportFormat, export_rows_async
+from app.api.pagination import (
+    CountMode,
+    Limit,
+    Skip,
+    decode_uuid_cursor,
+    encode_cursor,
+    fetch_page_async,
+)
+from app.api.routes.items import ItemSort, item_filters, item_order_by
+from app.models import (
+    Item,
+    ItemCreate,
+    ItemPublic,
+    ItemsBulkCreate,
+    ItemsBulkDelete,
+    ItemsBulkDeleted,
+    ItemsBulkPublic,
+    ItemsBulkUpdate,
+    ItemsPublic,
+    ItemUpdate,
+    Message,
+)
+
+router = APIRouter(prefix="/items", tags=["items"])
+
+
+@router.get("/", response_model=ItemsPublic)
+async def read_items(
+    response: Response,
+    session: AsyncSessionDep,
+    current_user: AsyncCurrentUser,
+    skip: Skip = 0,
+    limit: Limit = 100,
+    cursor: str | None = None,
+    count_mode: CountMode = "exact",
+    title_prefix: str | None = None,
+    q: str | None = None,
+    sort: ItemSort | None = None,
+    if_none_match: Annotated[str | None, Header()] = None,
+) -> Any:
+    """
+    Retrieve items.
+
+    Pass `cursor` (empty for the first page, then the returned `next_cursor`)
+    to page by `(owner_id, id)` instead of `skip`, which stays fast on deep pages.
+    `count_mode` selects an exact, estimated (superusers only) or omitted `count`.
+    `title_prefix` matches titles case-insensitively, `q` is a full-text search
+    on title and description (web search syntax) and `sort` orders the results;
+    `sort` can't be combined with `cursor`.
+    Responds 304 when `If-None-Match` holds the ETag of an unchanged page.
+    """
+
+    filters = item_filters(current_user, title_prefix, q)
+    order_by = item_order_by(sort, q)
+
+    if cursor is not None:
+        if sort is not None:
+            raise HTTPException(
+                status_code=400, detail="sort is not supported with cursor"
+            )
+        after = decode_uuid_cursor(cursor, 2)
+        keyset = (
+            [tuple_(col(Item.owner_id), col(Item.id)) > tuple_(*after)] if after else []
+        )
+        items, count = await fetch_page_async(
+            session,
+            Item,
+            filters=filters,
+            keyset=keyset,
+            order_by=[col(Item.owner_id), col(Item.id)],
+            limit=limit + 1,
+            count_mode=count_mode,
+        )
+        next_cursor = None
+        if len(items) > limit:
+            items = items[:limit]
+            next_cursor = encode_cursor([items[-1].owner_id, items[-1].id])
+    else:
+        items, count = await fetch_page_async(
+            session,
+            Item,
+            filters=filters,
+            order_by=order_by,
+            offset=skip,
+            limit=limit,
+            count_mode=count_mode,
+        )
+        next_cursor = None
+
+    etag = list_etag(items, count, next_cursor)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
+    return ItemsPublic(data=items, count=count, next_cursor=next_cursor)
+
+
+@router.get("/export")
+async def export_items(
+    current_user: AsyncCurrentUser,
+    format: ExportFormat = "ndjson",
+    title_prefix: str | None = None,
+    q: str | None = None,
+) -> StreamingResponse:
+    """
+    Export all items visible to the user as NDJSON or CSV.
+
+    The response is streamed in batches, so it can cover any number of items.
+    `title_prefix` and `q` filter as in the item list.
+    """
+    return export_rows_async(
+        Item,
+        ItemPublic,
+        filters=item_filters(current_user, title_prefix, q),
+        order_by=[col(Item.owner_id), col(Item.id)],
+        format=format,
+    )
+
+
+@router.post("/bulk", response_model=ItemsBulkPublic)
+async def create_items_bulk(
+    *,
+    session: AsyncSessionDep,
+    current_user: AsyncCurrentUser,
+    items_in: ItemsBulkCreate,
+) -> Any:
+    """
+    Create many items in one transaction.
+    """
+    items = await session.run_sync(
+        lambda sync_session: crud.create_items(
+            session=sync_session, items_in=items_in.data, owner_id=current_user.id
+        )
+    )
+    return ItemsBulkPublic(data=items, errors=[])
+
+
+@router.patch("/bulk", response_model=ItemsBulkPublic)
+async def update_items_bulk(
+    *,
+    session: AsyncSessionDep,
+    current_user: AsyncCurrentUser,
+    items_in: ItemsBulkUpdate,
+) -> Any:
+    """
+    Update many items in one transaction.
+
+    Items that don't exist or belong to another user are listed in `errors`
+    by their position in the request, the others are updated.
+    """
+    owner_id = None if current_user.is_superuser else current_user.id
+    items, errors = await session.run_sync(
+        lambda sync_session: crud.update_items(
+            session=sync_session, items_in=items_in.data, owner_id=owner_id
+        )
+    )
+    return ItemsBulkPublic(data=items, errors=errors)
+
+
+@router.delete("/bulk", response_model=ItemsBulkDeleted)
+async def delete_items_bulk(
+    *,
+    session: AsyncSessionDep,
+    current_user: AsyncCurrentUser,
+    items_in: ItemsBulkDelete,
+) -> Any:
+    """
+    Delete many items in one transaction.
+
+    Items that don't exist or belong to another user are listed in `errors`
+    by their position in the request, the others are deleted.
+    """
+    owner_id = None if current_user.is_superuser else current_user.id
+    ids, errors = await session.run_sync(
+        lambda sync_session: crud.delete_items(
+            session=sync_session, ids=items_in.ids, owner_id=owner_id
+        )
+    )
+    return ItemsBulkDeleted(ids=ids, errors=errors)
+
+
+@router.get("/{id}", response_model=ItemPublic)
+async def read_item(
+    response: Response,
+    session: AsyncSessionDep,
+    current_user: AsyncCurrentUser,
+    id: uuid.UUID,
+    if_none_match: Annotated[str | None, Header()] = None,
+) -> Any:
+    """
+    Get item by ID.
+    """
+    item = await session.get(Item, id)
+    if not item:
+        raise HTTPException(status_code=404, detail="Item not found")
+    if not current_user.is_superuser and (item.owner_id != current_user.id):
+        raise HTTPException(status_code=400, detail="Not enough permissions")
+    etag = row_etag(item)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
+    return item
+
+
+@router.post("/", response_model=ItemPublic)
+async def create_item(
+    *, session: AsyncSessionDep, current_user: AsyncCurrentUser, item_in: ItemCreate
+) -> Any:
+    """
+    Create new item.
+    """
+    item = Item.model_validate(item_in, update={"owner_id": current_user.id})
+    session.add(item)
+    await session.commit()
+    await session.refresh(item)
+    return item
+
+
+@router.put("/{id}", response_model=ItemPublic)
+async def update_item(
+    *,
+    response: Response,
+    session: AsyncSessionDep,
+    current_user: AsyncCurrentUser,
+    id: uuid.UUID,
+    item_in: ItemUpdate,
+    if_match: Annotated[str | None, Header()] = None,
+) -> Any:
+    """
+    Update an item.
+
+    With `If-Match`, the update only applies if the item still has that ETag
+    and fails with 412 otherwise.
+    """
+    # Lock the row so it can't change between the ETag check and the update
+    item = await session.get(Item, id, with_for_update=if_match is not None)
+    if not item:
+        raise HTTPException(status_code=404, detail="Item not found")
+    if not current_user.is_superuser and (item.owner_id != current_user.id):
+        raise HTTPException(status_code=400, detail="Not enough permissions")
+    check_if_match(if_match, row_etag(item))
+    update_dict = item_in.model_dump(exclude_unset=True)
+    item.sqlmodel_update(update_dict)
+    session.add(item)
+    await session.commit()
+    await session.refresh(item)
+    response.headers["ETag"] = row_etag(item)
+    return item
+
+
+@router.delete("/{id}")
+async def delete_item(
+    session: AsyncSessionDep, current_user: AsyncCurrentUser, id: uuid.UUID
+) -> Message:
+    """
+    Delete an item.
+    """
+    item = await session.get(Item, id)
+    if not item:
+        raise HTTPException(status_code=404, detail="Item not found")
+    if not current_user.is_superuser and (item.owner_id != current_user.id):
+        raise HTTPException(status_code=400, detail="Not enough permissions")
+    await session.delete(item)
+    await session.commit()
+    return Message(message="Item deleted successfully")
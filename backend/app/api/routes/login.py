@@ -2,19 +2,29 @@ from datetime import timedelta
 from typing import Annotated, Any
 
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import HTMLResponse
 from fastapi.security import OAuth2PasswordRequestForm
 
 from app import crud
-from app.api.deps import CurrentUser, SessionDep, get_current_active_superuser
+from app.api.deps import (
+    CurrentUser,
+    SessionDep,
+    TokenDep,
+    decode_access_token,
+    get_current_active_superuser,
+    get_current_user,
+)
 from app.core import security
 from app.core.config import settings
-from app.core.security import get_password_hash
+from app.core.revocation import revocation_store
+from app.core.security import get_password_hash_async
+from app.core.user_cache import user_cache
 from app.models import Message, NewPassword, Token, UserPublic
 from app.utils import (
     generate_password_reset_token,
     generate_reset_password_email,
-    send_email,
+    queue_email,
     verify_password_reset_token,
 )
 
@@ -22,14 +32,18 @@ router = APIRouter(tags=["login"])
 
 
 @router.post("/login/access-token")
-def login_access_token(
+async def login_access_token(
     session: SessionDep, form_data: Annotated[OAuth2PasswordRequestForm, Depends()]
 ) -> Token:
     """
     OAuth2 compatible token login, get an access token for future requests
     """
-    user = crud.authenticate(
-        session=session, email=form_data.username, password=form_data.password
+    # Only the hash check runs on the password hashing pool, so a burst of
+    # logins cannot occupy the threadpool shared by every other sync endpoint
+    user = await crud.authenticate_in_threadpool(
+        session=session,
+        email=form_data.username,
+        password=form_data.password,
     )
     if not user:
         raise HTTPException(status_code=400, detail="Incorrect email or password")
@@ -51,6 +65,19 @@ def test_token(current_user: CurrentUser) -> Any:
     return current_user
 
 
+@router.post("/logout", dependencies=[Depends(get_current_user)])
+def logout(session: SessionDep, token: TokenDep) -> Message:
+    """
+    Revoke the access token used for this request
+    """
+    access_token = decode_access_token(token)
+    if access_token.token_id is None:
+        raise HTTPException(status_code=400, detail="Token cannot be revoked")
+    revocation_store.revoke_token(session, access_token)
+    session.commit()
+    return Message(message="Logged out")
+
+
 @router.post("/password-recovery/{email}")
 def recover_password(email: str, session: SessionDep) -> Message:
     """
@@ -67,23 +94,19 @@ def recover_password(email: str, session: SessionDep) -> Message:
     email_data = generate_reset_password_email(
         email_to=user.email, email=email, token=password_reset_token
     )
-    send_email(
-        email_to=user.email,
-        subject=email_data.subject,
-        html_content=email_data.html_content,
-    )
+    queue_email(email_to=user.email, email_data=email_data)
     return Message(message="Password recovery email sent")
 
 
 @router.post("/reset-password/")
-def reset_password(session: SessionDep, body: NewPassword) -> Message:
+async def reset_password(session: SessionDep, body: NewPassword) -> Message:
     """
     Reset password
     """
     email = verify_password_reset_token(token=body.token)
     if not email:
         raise HTTPException(status_code=400, detail="Invalid token")
-    user = crud.get_user_by_email(session=session, email=email)
+    user = await run_in_threadpool(crud.get_user_by_email, session=session, email=email)
     if not user:
         raise HTTPException(
             status_code=404,
@@ -91,10 +114,13 @@ def reset_password(session: SessionDep, body: NewPassword) -> Message:
         )
     elif not user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
-    hashed_password = get_password_hash(password=body.new_password)
+    hashed_password = await get_password_hash_async(password=body.new_password)
+    user_id = user.id
     user.hashed_password = hashed_password
     session.add(user)
-    session.commit()
+    revocation_store.revoke_user(session, user_id)
+    await run_in_threadpool(session.commit)
+    user_cache.invalidate_user(user_id)
     return Message(message="Password updated successfully")
 
 
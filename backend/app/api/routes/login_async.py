@@ -0,0 +1,145 @@
+from datetime import timedelta
+from typing import Annotated, Any
+
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import HTMLResponse
+from fastapi.security import OAuth2PasswordRequestForm
+
+from app import crud
+from app.api.deps import (
+    AsyncCurrentUser,
+    AsyncSessionDep,
+    TokenDep,
+    decode_access_token,
+    get_current_active_superuser_async,
+    get_current_user_async,
+)
+from app.core import security
+from app.core.config import settings
+from app.core.revocation import revocation_store
+from app.core.security import get_password_hash_async
+from app.core.user_cache import user_cache
+from app.models import Message, NewPassword, Token, UserPublic
+from app.utils import (
+    generate_password_reset_token,
+    generate_reset_password_email,
+    queue_email,
+    verify_password_reset_token,
+)
+
+router = APIRouter(tags=["login"])
+
+
+@router.post("/login/access-token")
+async def login_access_token(
+    session: AsyncSessionDep, form_data: Annotated[OAuth2PasswordRequestForm, Depends()]
+) -> Token:
+    """
+    OAuth2 compatible token login, get an access token for future requests
+    """
+    user = await crud.authenticate_async(
+        session=session, email=form_data.username, password=form_data.password
+    )
+    if not user:
+        raise HTTPException(status_code=400, detail="Incorrect email or password")
+    elif not user.is_active:
+        raise HTTPException(status_code=400, detail="Inactive user")
+    access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    return Token(
+        access_token=security.create_access_token(
+            user.id, expires_delta=access_token_expires
+        )
+    )
+
+
+@router.post("/login/test-token", response_model=UserPublic)
+async def test_token(current_user: AsyncCurrentUser) -> Any:
+    """
+    Test access token
+    """
+    return current_user
+
+
+@router.post("/logout", dependencies=[Depends(get_current_user_async)])
+async def logout(session: AsyncSessionDep, token: TokenDep) -> Message:
+    """
+    Revoke the access token used for this request
+    """
+    access_token = decode_access_token(token)
+    if access_token.token_id is None:
+        raise HTTPException(status_code=400, detail="Token cannot be revoked")
+    revocation_store.revoke_token(session, access_token)
+    await session.commit()
+    return Message(message="Logged out")
+
+
+@router.post("/password-recovery/{email}")
+async def recover_password(email: str, session: AsyncSessionDep) -> Message:
+    """
+    Password Recovery
+    """
+    user = await crud.get_user_by_email_async(session=session, email=email)
+
+    if not user:
+        raise HTTPException(
+            status_code=404,
+            detail="The user with this email does not exist in the system.",
+        )
+    password_reset_token = generate_password_reset_token(email=email)
+    email_data = generate_reset_password_email(
+        email_to=user.email, email=email, token=password_reset_token
+    )
+    queue_email(email_to=user.email, email_data=email_data)
+    return Message(message="Password recovery email sent")
+
+
+@router.post("/reset-password/")
+async def reset_password(session: AsyncSessionDep, body: NewPassword) -> Message:
+    """
+    Reset password
+    """
+    email = verify_password_reset_token(token=body.token)
+    if not email:
+        raise HTTPException(status_code=400, detail="Invalid token")
+    user = await crud.get_user_by_email_async(session=session, email=email)
+    if not user:
+        raise HTTPException(
+            status_code=404,
+            detail="The user with this email does not exist in the system.",
+        )
+    elif not user.is_active:
+        raise HTTPException(status_code=400, detail="Inactive user")
+    hashed_password = await get_password_hash_async(password=body.new_password)
+    user_id = user.id
+    user.hashed_password = hashed_password
+    session.add(user)
+    revocation_store.revoke_user(session, user_id)
+    await session.commit()
+    user_cache.invalidate_user(user_id)
+    return Message(message="Password updated successfully")
+
+
+@router.post(
+    "/password-recovery-html-content/{email}",
+    dependencies=[Depends(get_current_active_superuser_async)],
+    response_class=HTMLResponse,
+)
+async def recover_password_html_content(email: str, session: AsyncSessionDep) -> Any:
+    """
+    HTML Content for Password Recovery
+    """
+    user = await crud.get_user_by_email_async(session=session, email=email)
+
+    if not user:
+        raise HTTPException(
+            status_code=404,
+            detail="The user with this username does not exist in the system.",
+        )
+    password_reset_token = generate_password_reset_token(email=email)
+    email_data = generate_reset_password_email(
+        email_to=user.email, email=email, token=password_reset_token
+    )
+
+    return HTMLResponse(
+        content=email_data.html_content, headers={"subject:": email_data.subject}
+    )
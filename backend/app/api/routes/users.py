@@ -1,8 +1,10 @@
 import uuid
-from typing import Any
+from typing import Annotated, Any
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlmodel import col, delete, func, select
+from fastapi import APIRouter, Depends, Header, HTTPException, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlmodel import col, delete
 
 from app import crud
 from app.api.deps import (
@@ -10,8 +12,20 @@ from app.api.deps import (
     SessionDep,
     get_current_active_superuser,
 )
+from app.api.etag import check_if_match, etag_matches, not_modified, row_etag
+from app.api.export import ExportFormat, export_rows
+from app.api.pagination import (
+    CountMode,
+    Limit,
+    Skip,
+    decode_uuid_cursor,
+    encode_cursor,
+    fetch_page,
+)
 from app.core.config import settings
-from app.core.security import get_password_hash, verify_password
+from app.core.revocation import revocation_store
+from app.core.security import get_password_hash_async, verify_password_async
+from app.core.user_cache import user_cache
 from app.models import (
     Item,
     Message,
@@ -24,7 +38,7 @@ from app.models import (
     UserUpdate,
     UserUpdateMe,
 )
-from app.utils import generate_new_account_email, send_email
+from app.utils import generate_new_account_email, queue_email
 
 router = APIRouter(prefix="/users", tags=["users"])
 
@@ -34,44 +48,85 @@ router = APIRouter(prefix="/users", tags=["users"])
     dependencies=[Depends(get_current_active_superuser)],
     response_model=UsersPublic,
 )
-def read_users(session: SessionDep, skip: int = 0, limit: int = 100) -> Any:
+def read_users(
+    session: SessionDep,
+    skip: Skip = 0,
+    limit: Limit = 100,
+    cursor: str | None = None,
+    count_mode: CountMode = "exact",
+) -> Any:
     """
     Retrieve users.
-    """
 
-    count_statement = select(func.count()).select_from(User)
-    count = session.exec(count_statement).one()
+    Pass `cursor` (empty for the first page, then the returned `next_cursor`)
+    to page by `id` instead of `skip`, which stays fast on deep pages.
+    `count_mode` selects an exact, estimated or omitted `count`.
+    """
 
-    statement = select(User).offset(skip).limit(limit)
-    users = session.exec(statement).all()
+    if cursor is not None:
+        after = decode_uuid_cursor(cursor, 1)
+        users, count = fetch_page(
+            session,
+            User,
+            keyset=[col(User.id) > after[0]] if after else [],
+            order_by=[col(User.id)],
+            limit=limit + 1,
+            count_mode=count_mode,
+        )
+        next_cursor = None
+        if len(users) > limit:
+            users = users[:limit]
+            next_cursor = encode_cursor([users[-1].id])
+        return UsersPublic(data=users, count=count, next_cursor=next_cursor)
 
+    users, count = fetch_page(
+        session, User, offset=skip, limit=limit, count_mode=count_mode
+    )
     return UsersPublic(data=users, count=count)
 
 
+@router.get("/export", dependencies=[Depends(get_current_active_superuser)])
+def export_users(
+    session: SessionDep, format: ExportFormat = "ndjson"
+) -> StreamingResponse:
+    """
+    Export all users as NDJSON or CSV.
+
+    The response is streamed in batches, so it can cover any number of users.
+    """
+    return export_rows(
+        session, User, UserPublic, order_by=[col(User.id)], format=format
+    )
+
+
 @router.post(
     "/", dependencies=[Depends(get_current_active_superuser)], response_model=UserPublic
 )
-def create_user(*, session: SessionDep, user_in: UserCreate) -> Any:
+async def create_user(*, session: SessionDep, user_in: UserCreate) -> Any:
     """
     Create new user.
     """
-    user = crud.get_user_by_email(session=session, email=user_in.email)
+    user = await run_in_threadpool(
+        crud.get_user_by_email, session=session, email=user_in.email
+    )
     if user:
         raise HTTPException(
             status_code=400,
             detail="The user with this email already exists in the system.",
         )
 
-    user = crud.create_user(session=session, user_create=user_in)
+    hashed_password = await get_password_hash_async(user_in.password)
+    user = await run_in_threadpool(
+        crud.create_user,
+        session=session,
+        user_create=user_in,
+        hashed_password=hashed_password,
+    )
     if settings.EMAILS_ENABLED and user_in.email:
         email_data = generate_new_account_email(
             email_to=user_in.email, username=user_in.email, password=user_in.password
         )
-        send_email(
-            email_to=user_in.email,
-            subject=email_data.subject,
-            html_content=email_data.html_content,
-        )
+        queue_email(email_to=user_in.email, email_data=email_data)
     return user
 
 
@@ -90,38 +145,53 @@ def update_user_me(
                 status_code=409, detail="User with this email already exists"
             )
     user_data = user_in.model_dump(exclude_unset=True)
+    user_id = current_user.id
     current_user.sqlmodel_update(user_data)
     session.add(current_user)
     session.commit()
+    user_cache.invalidate_user(user_id)
     session.refresh(current_user)
     return current_user
 
 
 @router.patch("/me/password", response_model=Message)
-def update_password_me(
+async def update_password_me(
     *, session: SessionDep, body: UpdatePassword, current_user: CurrentUser
 ) -> Any:
     """
     Update own password.
     """
-    if not verify_password(body.current_password, current_user.hashed_password):
+    if not await verify_password_async(
+        body.current_password, current_user.hashed_password
+    ):
         raise HTTPException(status_code=400, detail="Incorrect password")
     if body.current_password == body.new_password:
         raise HTTPException(
             status_code=400, detail="New password cannot be the same as the current one"
         )
-    hashed_password = get_password_hash(body.new_password)
+    hashed_password = await get_password_hash_async(body.new_password)
+    user_id = current_user.id
     current_user.hashed_password = hashed_password
     session.add(current_user)
-    session.commit()
+    revocation_store.revoke_user(session, user_id)
+    await run_in_threadpool(session.commit)
+    user_cache.invalidate_user(user_id)
     return Message(message="Password updated successfully")
 
 
 @router.get("/me", response_model=UserPublic)
-def read_user_me(current_user: CurrentUser) -> Any:
+def read_user_me(
+    response: Response,
+    current_user: CurrentUser,
+    if_none_match: Annotated[str | None, Header()] = None,
+) -> Any:
     """
     Get current user.
     """
+    etag = row_etag(current_user)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
     return current_user
 
 
@@ -134,42 +204,60 @@ def delete_user_me(session: SessionDep, current_user: CurrentUser) -> Any:
         raise HTTPException(
             status_code=403, detail="Super users are not allowed to delete themselves"
         )
+    user_id = current_user.id
     session.delete(current_user)
+    revocation_store.revoke_user(session, user_id)
     session.commit()
+    user_cache.invalidate_user(user_id)
     return Message(message="User deleted successfully")
 
 
 @router.post("/signup", response_model=UserPublic)
-def register_user(session: SessionDep, user_in: UserRegister) -> Any:
+async def register_user(session: SessionDep, user_in: UserRegister) -> Any:
     """
     Create new user without the need to be logged in.
     """
-    user = crud.get_user_by_email(session=session, email=user_in.email)
+    user = await run_in_threadpool(
+        crud.get_user_by_email, session=session, email=user_in.email
+    )
     if user:
         raise HTTPException(
             status_code=400,
             detail="The user with this email already exists in the system",
         )
     user_create = UserCreate.model_validate(user_in)
-    user = crud.create_user(session=session, user_create=user_create)
+    hashed_password = await get_password_hash_async(user_create.password)
+    user = await run_in_threadpool(
+        crud.create_user,
+        session=session,
+        user_create=user_create,
+        hashed_password=hashed_password,
+    )
     return user
 
 
 @router.get("/{user_id}", response_model=UserPublic)
 def read_user_by_id(
-    user_id: uuid.UUID, session: SessionDep, current_user: CurrentUser
+    response: Response,
+    user_id: uuid.UUID,
+    session: SessionDep,
+    current_user: CurrentUser,
+    if_none_match: Annotated[str | None, Header()] = None,
 ) -> Any:
     """
     Get a specific user by id.
     """
     user = session.get(User, user_id)
-    if user == current_user:
-        return user
-    if not current_user.is_superuser:
+    if user != current_user and not current_user.is_superuser:
         raise HTTPException(
             status_code=403,
             detail="The user doesn't have enough privileges",
         )
+    if user is not None:
+        etag = row_etag(user)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+        response.headers["ETag"] = etag
     return user
 
 
@@ -178,30 +266,51 @@ def read_user_by_id(
     dependencies=[Depends(get_current_active_superuser)],
     response_model=UserPublic,
 )
-def update_user(
+async def update_user(
     *,
+    response: Response,
     session: SessionDep,
     user_id: uuid.UUID,
     user_in: UserUpdate,
+    if_match: Annotated[str | None, Header()] = None,
 ) -> Any:
     """
     Update a user.
+
+    With `If-Match`, the update only applies if the user still has that ETag
+    and fails with 412 otherwise.
     """
 
-    db_user = session.get(User, user_id)
+    # Lock the row so it can't change between the ETag check and the update
+    db_user = await run_in_threadpool(
+        session.get, User, user_id, with_for_update=if_match is not None
+    )
     if not db_user:
         raise HTTPException(
             status_code=404,
             detail="The user with this id does not exist in the system",
         )
+    check_if_match(if_match, row_etag(db_user))
     if user_in.email:
-        existing_user = crud.get_user_by_email(session=session, email=user_in.email)
+        existing_user = await run_in_threadpool(
+            crud.get_user_by_email, session=session, email=user_in.email
+        )
         if existing_user and existing_user.id != user_id:
             raise HTTPException(
                 status_code=409, detail="User with this email already exists"
             )
 
-    db_user = crud.update_user(session=session, db_user=db_user, user_in=user_in)
+    hashed_password = None
+    if user_in.password:
+        hashed_password = await get_password_hash_async(user_in.password)
+    db_user = await run_in_threadpool(
+        crud.update_user,
+        session=session,
+        db_user=db_user,
+        user_in=user_in,
+        hashed_password=hashed_password,
+    )
+    response.headers["ETag"] = row_etag(db_user)
     return db_user
 
 
@@ -222,5 +331,7 @@ def delete_user(
     statement = delete(Item).where(col(Item.owner_id) == user_id)
     session.exec(statement)  # type: ignore
     session.delete(user)
+    revocation_store.revoke_user(session, user_id)
     session.commit()
+    user_cache.invalidate_user(user_id)
     return Message(message="User deleted successfully")
@@ -0,0 +1,313 @@
+import uuid
+from typing import Annotated, Any
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Response
+from fastapi.responses import StreamingResponse
+from sqlmodel import col, delete
+
+from app import crud
+from app.api.deps import (
+    AsyncCurrentUser,
+    AsyncSessionDep,
+    get_current_active_superuser_async,
+)
+from app.api.etag import check_if_match, etag_matches, not_modified, row_etag
+from app.api.export import ExportFormat, export_rows_async
+from app.api.pagination import (
+    CountMode,
+    Limit,
+    Skip,
+    decode_uuid_cursor,
+    encode_cursor,
+    fetch_page_async,
+)
+from app.core.config import settings
+from app.core.revocation import revocation_store
+from app.core.security import get_password_hash_async, verify_password_async
+from app.core.user_cache import user_cache
+from app.models import (
+    Item,
+    Message,
+    UpdatePassword,
+    User,
+    UserCreate,
+    UserPublic,
+    UserRegister,
+    UsersPublic,
+    UserUpdate,
+    UserUpdateMe,
+)
+from app.utils import generate_new_account_email, queue_email
+
+router = APIRouter(prefix="/users", tags=["users"])
+
+
+@router.get(
+    "/",
+    dependencies=[Depends(get_current_active_superuser_async)],
+    response_model=UsersPublic,
+)
+async def read_users(
+    session: AsyncSessionDep,
+    skip: Skip = 0,
+    limit: Limit = 100,
+    cursor: str | None = None,
+    count_mode: CountMode = "exact",
+) -> Any:
+    """
+    Retrieve users.
+
+    Pass `cursor` (empty for the first page, then the returned `next_cursor`)
+    to page by `id` instead of `skip`, which stays fast on deep pages.
+    `count_mode` selects an exact, estimated or omitted `count`.
+    """
+
+    if cursor is not None:
+        after = decode_uuid_cursor(cursor, 1)
+        users, count = await fetch_page_async(
+            session,
+            User,
+            keyset=[col(User.id) > after[0]] if after else [],
+            order_by=[col(User.id)],
+            limit=limit + 1,
+            count_mode=count_mode,
+        )
+        next_cursor = None
+        if len(users) > limit:
+            users = users[:limit]
+            next_cursor = encode_cursor([users[-1].id])
+        return UsersPublic(data=users, count=count, next_cursor=next_cursor)
+
+    users, count = await fetch_page_async(
+        session, User, offset=skip, limit=limit, count_mode=count_mode
+    )
+    return UsersPublic(data=users, count=count)
+
+
+@router.get("/export", dependencies=[Depends(get_current_active_superuser_async)])
+async def export_users(format: ExportFormat = "ndjson") -> StreamingResponse:
+    """
+    Export all users as NDJSON or CSV.
+
+    The response is streamed in batches, so it can cover any number of users.
+    """
+    return export_rows_async(User, UserPublic, order_by=[col(User.id)], format=format)
+
+
+@router.post(
+    "/",
+    dependencies=[Depends(get_current_active_superuser_async)],
+    response_model=UserPublic,
+)
+async def create_user(*, session: AsyncSessionDep, user_in: UserCreate) -> Any:
+    """
+    Create new user.
+    """
+    user = await crud.get_user_by_email_async(session=session, email=user_in.email)
+    if user:
+        raise HTTPException(
+            status_code=400,
+            detail="The user with this email already exists in the system.",
+        )
+
+    user = await crud.create_user_async(session=session, user_create=user_in)
+    if settings.EMAILS_ENABLED and user_in.email:
+        email_data = generate_new_account_email(
+            email_to=user_in.email, username=user_in.email, password=user_in.password
+        )
+        queue_email(email_to=user_in.email, email_data=email_data)
+    return user
+
+
+@router.patch("/me", response_model=UserPublic)
+async def update_user_me(
+    *, session: AsyncSessionDep, user_in: UserUpdateMe, current_user: AsyncCurrentUser
+) -> Any:
+    """
+    Update own user.
+    """
+
+    if user_in.email:
+        existing_user = await crud.get_user_by_email_async(
+            session=session, email=user_in.email
+        )
+        if existing_user and existing_user.id != current_user.id:
+            raise HTTPException(
+                status_code=409, detail="User with this email already exists"
+            )
+    user_data = user_in.model_dump(exclude_unset=True)
+    user_id = current_user.id
+    current_user.sqlmodel_update(user_data)
+    session.add(current_user)
+    await session.commit()
+    user_cache.invalidate_user(user_id)
+    await session.refresh(current_user)
+    return current_user
+
+
+@router.patch("/me/password", response_model=Message)
+async def update_password_me(
+    *, session: AsyncSessionDep, body: UpdatePassword, current_user: AsyncCurrentUser
+) -> Any:
+    """
+    Update own password.
+    """
+    if not await verify_password_async(
+        body.current_password, current_user.hashed_password
+    ):
+        raise HTTPException(status_code=400, detail="Incorrect password")
+    if body.current_password == body.new_password:
+        raise HTTPException(
+            status_code=400, detail="New password cannot be the same as the current one"
+        )
+    hashed_password = await get_password_hash_async(body.new_password)
+    user_id = current_user.id
+    current_user.hashed_password = hashed_password
+    session.add(current_user)
+    revocation_store.revoke_user(session, user_id)
+    await session.commit()
+    user_cache.invalidate_user(user_id)
+    return Message(message="Password updated successfully")
+
+
+@router.get("/me", response_model=UserPublic)
+async def read_user_me(
+    response: Response,
+    current_user: AsyncCurrentUser,
+    if_none_match: Annotated[str | None, Header()] = None,
+) -> Any:
+    """
+    Get current user.
+    """
+    etag = row_etag(current_user)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
+    return current_user
+
+
+@router.delete("/me", response_model=Message)
+async def delete_user_me(
+    session: AsyncSessionDep, current_user: AsyncCurrentUser
+) -> Any:
+    """
+    Delete own user.
+    """
+    if current_user.is_superuser:
+        raise HTTPException(
+            status_code=403, detail="Super users are not allowed to delete themselves"
+        )
+    user_id = current_user.id
+    await session.delete(current_user)
+    revocation_store.revoke_user(session, user_id)
+    await session.commit()
+    user_cache.invalidate_user(user_id)
+    return Message(message="User deleted successfully")
+
+
+@router.post("/signup", response_model=UserPublic)
+async def register_user(session: AsyncSessionDep, user_in: UserRegister) -> Any:
+    """
+    Create new user without the need to be logged in.
+    """
+    user = await crud.get_user_by_email_async(session=session, email=user_in.email)
+    if user:
+        raise HTTPException(
+            status_code=400,
+            detail="The user with this email already exists in the system",
+        )
+    user_create = UserCreate.model_validate(user_in)
+    user = await crud.create_user_async(session=session, user_create=user_create)
+    return user
+
+
+@router.get("/{user_id}", response_model=UserPublic)
+async def read_user_by_id(
+    response: Response,
+    user_id: uuid.UUID,
+    session: AsyncSessionDep,
+    current_user: AsyncCurrentUser,
+    if_none_match: Annotated[str | None, Header()] = None,
+) -> Any:
+    """
+    Get a specific user by id.
+    """
+    user = await session.get(User, user_id)
+    if user != current_user and not current_user.is_superuser:
+        raise HTTPException(
+            status_code=403,
+            detail="The user doesn't have enough privileges",
+        )
+    if user is not None:
+        etag = row_etag(user)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+        response.headers["ETag"] = etag
+    return user
+
+
+@router.patch(
+    "/{user_id}",
+    dependencies=[Depends(get_current_active_superuser_async)],
+    response_model=UserPublic,
+)
+async def update_user(
+    *,
+    response: Response,
+    session: AsyncSessionDep,
+    user_id: uuid.UUID,
+    user_in: UserUpdate,
+    if_match: Annotated[str | None, Header()] = None,
+) -> Any:
+    """
+    Update a user.
+
+    With `If-Match`, the update only applies if the user still has that ETag
+    and fails with 412 otherwise.
+    """
+
+    # Lock the row so it can't change between the ETag check and the update
+    db_user = await session.get(User, user_id, with_for_update=if_match is not None)
+    if not db_user:
+        raise HTTPException(
+            status_code=404,
+            detail="The user with this id does not exist in the system",
+        )
+    check_if_match(if_match, row_etag(db_user))
+    if user_in.email:
+        existing_user = await crud.get_user_by_email_async(
+            session=session, email=user_in.email
+        )
+        if existing_user and existing_user.id != user_id:
+            raise HTTPException(
+                status_code=409, detail="User with this email already exists"
+            )
+
+    db_user = await crud.update_user_async(
+        session=session, db_user=db_user, user_in=user_in
+    )
+    response.headers["ETag"] = row_etag(db_user)
+    return db_user
+
+
+@router.delete("/{user_id}", dependencies=[Depends(get_current_active_superuser_async)])
+async def delete_user(
+    session: AsyncSessionDep, current_user: AsyncCurrentUser, user_id: uuid.UUID
+) -> Message:
+    """
+    Delete a user.
+    """
+    user = await session.get(User, user_id)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    if user == current_user:
+        raise HTTPException(
+            status_code=403, detail="Super users are not allowed to delete themselves"
+        )
+    statement = delete(Item).where(col(Item.owner_id) == user_id)
+    await session.exec(statement)  # type: ignore
+    await session.delete(user)
+    revocation_store.revoke_user(session, user_id)
+    await session.commit()
+    user_cache.invalidate_user(user_id)
+    return Message(message="User deleted successfully")
@@ -1,9 +1,13 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException
 from pydantic.networks import EmailStr
 
 from app.api.deps import get_current_active_superuser
-from app.models import Message
-from app.utils import generate_test_email, send_email
+from app.core.config import settings
+from app.core.db import get_pool_stats
+from app.core.outbox import email_outbox
+from app.core.security import password_hash_pool
+from app.models import DbPoolStats, EmailOutboxStats, Message, PasswordHashStats
+from app.utils import generate_test_email, queue_email
 
 router = APIRouter(prefix="/utils", tags=["utils"])
 
@@ -17,15 +21,46 @@ def test_email(email_to: EmailStr) -> Message:
     """
     Test emails.
     """
+    if not settings.EMAILS_ENABLED:
+        raise HTTPException(status_code=400, detail="Emails are not enabled")
     email_data = generate_test_email(email_to=email_to)
-    send_email(
-        email_to=email_to,
-        subject=email_data.subject,
-        html_content=email_data.html_content,
-    )
+    queue_email(email_to=email_to, email_data=email_data)
     return Message(message="Test email sent")
 
 
+@router.get(
+    "/password-hash-stats/",
+    dependencies=[Depends(get_current_active_superuser)],
+)
+def password_hash_stats() -> PasswordHashStats:
+    """
+    Password hashing pool utilisation and queue depth.
+    """
+    return PasswordHashStats(**password_hash_pool.stats())
+
+
+@router.get(
+    "/db-pool-stats/",
+    dependencies=[Depends(get_current_active_superuser)],
+)
+def db_pool_stats() -> DbPoolStats:
+    """
+    Database connection pool usage and checkout wait time histogram.
+    """
+    return DbPoolStats(**get_pool_stats())
+
+
+@router.get(
+    "/email-outbox-stats/",
+    dependencies=[Depends(get_current_active_superuser)],
+)
+def email_outbox_stats() -> EmailOutboxStats:
+    """
+    Background email queue depth and delivery counters.
+    """
+    return EmailOutboxStats(**email_outbox.stats())
+
+
 @router.get("/health-check/")
 async def health_check() -> bool:
     return True
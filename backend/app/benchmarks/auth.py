@@ -0,0 +1,87 @@
+"""
+Micro-benchmark of per-request access token verification.
+
+    python -m app.benchmarks.auth [--number 2000] [--repeat 5]
+
+Compares, per request:
+- jwt.decode + TokenPayload: verification as get_current_user used to do it
+- jwt.decode, PEM key: an asymmetric key parsed from PEM on every request
+- TokenVerifier: key prepared once, verified-token cache disabled
+- TokenVerifier, cached: a repeat token served from the verified-token cache
+"""
+
+import argparse
+import time
+import timeit
+from collections.abc import Callable
+
+import jwt
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ed25519, rsa
+
+from app.core.tokens import TokenSigner, TokenVerifier
+from app.models import TokenPayload
+
+SECRET = "a-benchmark-secret-that-is-long-enough-for-hs256"
+
+
+def key_pair(algorithm: str) -> tuple[str, str]:
+    private_key: rsa.RSAPrivateKey | ed25519.Ed25519PrivateKey
+    if algorithm == "RS256":
+        private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    else:
+        private_key = ed25519.Ed25519PrivateKey.generate()
+    private_pem = private_key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    )
+    public_pem = private_key.public_key().public_bytes(
+        serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+    )
+    return private_pem.decode(), public_pem.decode()
+
+
+def cases() -> dict[str, Callable[[], object]]:
+    claims = {"sub": "8d5d3f9e-6c1a-4a53-9a2e-1f0b5e4f7c21", "exp": time.time() + 3600}
+    keys = {"HS256": (SECRET, SECRET)}
+    keys.update({algorithm: key_pair(algorithm) for algorithm in ("RS256", "EdDSA")})
+
+    result: dict[str, Callable[[], object]] = {}
+    hs_token = TokenSigner("HS256", SECRET).sign(claims)
+    result["HS256 jwt.decode + TokenPayload"] = lambda: TokenPayload(
+        **jwt.decode(hs_token, SECRET, algorithms=["HS256"])
+    )
+    for algorithm, (private_key, public_key) in keys.items():
+        token = TokenSigner(algorithm, private_key).sign(claims)
+        if algorithm != "HS256":
+            result[f"{algorithm} jwt.decode, PEM key"] = (
+                lambda token=token, key=public_key, algorithm=algorithm: jwt.decode(
+                    token, key, algorithms=[algorithm]
+                )
+            )
+        uncached = TokenVerifier(algorithm, public_key, cache_size=0)
+        cached = TokenVerifier(algorithm, public_key, cache_size=1000)
+        result[f"{algorithm} TokenVerifier"] = lambda token=token, verifier=uncached: (
+            verifier.verify(token)
+        )
+        result[f"{algorithm} TokenVerifier, cached"] = (
+            lambda token=token, verifier=cached: verifier.verify(token)
+        )
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--number", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'case':<34} {'us/request':>10}")
+    for name, verify in cases().items():
+        best = min(timeit.repeat(verify, number=args.number, repeat=args.repeat))
+        print(f"{name:<34} {best / args.number * 1e6:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
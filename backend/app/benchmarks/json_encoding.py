@@ -0,0 +1,77 @@
+"""
+Micro-benchmark of JSON encoding of an `ItemsPublic` page per page size.
+
+    python -m app.benchmarks.json_encoding [--sizes 10 100 1000] [--repeat 5]
+
+Compares, per response:
+- jsonable_encoder: jsonable_encoder + json.dumps, which is what FastAPI does
+  for routes without a response model
+- default: response model dump to JSON-compatible Python + JSONResponse
+  (json.dumps), which is what FastAPI does for routes with a response model
+- orjson: response model dump to Python, with UUIDs and datetimes left for
+  orjson to encode natively, + ORJSONResponse
+- pydantic_json: Pydantic's own dump straight to JSON bytes, for reference
+  only; FastAPI doesn't use it for any response class
+"""
+
+import argparse
+import timeit
+import uuid
+from collections.abc import Callable
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+from app.api.responses import ORJSONResponse
+from app.models import ItemPublic, ItemsPublic
+
+adapter = TypeAdapter(ItemsPublic)
+
+
+def make_page(size: int) -> ItemsPublic:
+    owner_id = uuid.uuid4()
+    return ItemsPublic(
+        data=[
+            ItemPublic(
+                id=uuid.uuid4(),
+                owner_id=owner_id,
+                title=f"Item {i}",
+                description="Lorem ipsum dolor sit amet " * 3,
+            )
+            for i in range(size)
+        ],
+        count=size * 10,
+    )
+
+
+def encoders(page: ItemsPublic) -> dict[str, Callable[[], bytes]]:
+    return {
+        "jsonable_encoder": lambda: JSONResponse(jsonable_encoder(page)).body,
+        "default": lambda: JSONResponse(adapter.dump_python(page, mode="json")).body,
+        "orjson": lambda: ORJSONResponse(adapter.dump_python(page)).body,
+        "pydantic_json": lambda: adapter.dump_json(page),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'page size':>9}  {'encoder':<17} {'us/response':>12} {'vs default':>10}")
+    for size in args.sizes:
+        page = make_page(size)
+        number = max(1, 20_000 // size)
+        timings: dict[str, float] = {}
+        for name, encode in encoders(page).items():
+            best = min(timeit.repeat(encode, number=number, repeat=args.repeat))
+            timings[name] = best / number * 1e6
+        for name, micros in timings.items():
+            ratio = timings["default"] / micros
+            print(f"{size:>9}  {name:<17} {micros:>12.1f} {ratio:>9.2f}x")
+
+
+if __name__ == "__main__":
+    main()
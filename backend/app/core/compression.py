@@ -0,0 +1,220 @@
+import zlib
+from collections.abc import Callable, Iterable
+from functools import partial
+
+import anyio.to_thread
+import brotli  # type: ignore
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Media types worth compressing; "type/*" matches every subtype
+DEFAULT_MEDIA_TYPES = (
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "text/csv",
+    "text/css",
+    "text/html",
+    "text/plain",
+)
+
+# Encodings we can produce, most preferred first when the client ranks them equally
+ENCODINGS = ("br", "gzip")
+
+# Chunks at least this big are compressed in a worker thread
+THREAD_MINIMUM_SIZE = 128 * 1024
+
+
+def negotiate_encoding(accept_encoding: str) -> str | None:
+    """The encoding of `ENCODINGS` with the highest q-value in `accept_encoding`."""
+    qualities: dict[str, float] = {}
+    for entry in accept_encoding.split(","):
+        coding, _, params = entry.partition(";")
+        coding = coding.strip().lower()
+        quality = 1.0
+        name, _, value = params.partition("=")
+        if name.strip().lower() == "q":
+            try:
+                quality = float(value)
+            except ValueError:
+                quality = 0.0
+        if coding:
+            qualities[coding] = quality
+    wildcard = qualities.get("*", 0.0)
+    best = max(ENCODINGS, key=lambda coding: qualities.get(coding, wildcard))
+    return best if qualities.get(best, wildcard) > 0 else None
+
+
+# Compressors flush after every chunk but the last, so streamed exports reach
+# the client as they are produced instead of when the compressor's window fills
+
+
+class _GZipCompressor:
+    encoding = "gzip"
+
+    def __init__(self, level: int) -> None:
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, body: bytes, more_body: bool) -> bytes:
+        data = self._compressor.compress(body)
+        if more_body:
+            return data + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+        return data + self._compressor.flush()
+
+
+class _BrotliCompressor:
+    encoding = "br"
+
+    def __init__(self, quality: int) -> None:
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, body: bytes, more_body: bool) -> bytes:
+        data: bytes = self._compressor.process(body)
+        if more_body:
+            return data + self._compressor.flush()
+        return data + self._compressor.finish()
+
+
+class _Responder:
+    """
+    Compresses one response with the compressor `make_compressor` returns, or
+    only adds `Vary: Accept-Encoding` to it when `make_compressor` is None.
+
+    Responses that are already encoded, partial, smaller than `minimum_size`
+    or not of one of `media_types` are passed through untouched.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        make_compressor: Callable[[], _GZipCompressor | _BrotliCompressor] | None,
+        *,
+        minimum_size: int,
+        media_types: frozenset[str],
+    ) -> None:
+        self.app = app
+        self.make_compressor = make_compressor
+        self.minimum_size = minimum_size
+        self.media_types = media_types
+        self.compressor: _GZipCompressor | _BrotliCompressor | None = None
+        self.initial_message: Message = {}
+        self.started = False
+        self.passthrough = False
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        self.send = send
+        await self.app(scope, receive, self.send_with_compression)
+
+    async def send_with_compression(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            # Held back until the first body chunk shows how to set the headers
+            self.initial_message = message
+            headers = Headers(raw=message["headers"])
+            self.passthrough = (
+                "content-encoding" in headers
+                or message["status"] == 206
+                or not self._compressible(headers.get("content-type", ""))
+            )
+            if self.passthrough:
+                self.started = True
+                await self.send(message)
+            return
+
+        if not self.started:
+            self.started = True
+            if message["type"] == "http.response.body":
+                await self._start(message)
+            else:
+                # e.g. http.response.pathsend, whose body we never see
+                self.passthrough = True
+            await self.send(self.initial_message)
+
+        if not self.passthrough and message["type"] == "http.response.body":
+            message["body"] = await self._compress(
+                message.get("body", b""), message.get("more_body", False)
+            )
+        await self.send(message)
+
+    def _compressible(self, content_type: str) -> bool:
+        media_type = content_type.partition(";")[0].strip().lower()
+        wildcard = media_type.partition("/")[0] + "/*"
+        return media_type in self.media_types or wildcard in self.media_types
+
+    async def _start(self, message: Message) -> None:
+        """Set the response headers from the first body chunk."""
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if len(body) < self.minimum_size and not more_body:
+            self.passthrough = True
+            return
+        headers = MutableHeaders(raw=self.initial_message["headers"])
+        headers.add_vary_header("Accept-Encoding")
+        if self.make_compressor is None:
+            self.passthrough = True
+            return
+        self.compressor = self.make_compressor()
+        headers["Content-Encoding"] = self.compressor.encoding
+        if more_body or self.initial_message.get("trailers", False):
+            del headers["Content-Length"]
+        else:
+            message["body"] = await self._compress(body, more_body)
+            headers["Content-Length"] = str(len(message["body"]))
+            # Already compressed, don't compress it again when it's sent
+            self.passthrough = True
+
+    async def _compress(self, body: bytes, more_body: bool) -> bytes:
+        assert self.compressor is not None
+        if len(body) >= THREAD_MINIMUM_SIZE:
+            return await anyio.to_thread.run_sync(
+                self.compressor.compress, body, more_body
+            )
+        return self.compressor.compress(body, more_body)
+
+
+class CompressionMiddleware:
+    """
+    Compress responses with brotli or gzip, whichever the client prefers.
+
+    Only responses with one of `media_types` and a body of at least
+    `minimum_size` bytes are compressed. Streamed responses are compressed
+    chunk by chunk, whatever their size.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        *,
+        minimum_size: int = 1024,
+        media_types: Iterable[str] = DEFAULT_MEDIA_TYPES,
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+    ) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.media_types = frozenset(
+            media_type.strip().lower() for media_type in media_types
+        )
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        make_compressor: Callable[[], _GZipCompressor | _BrotliCompressor] | None
+        if encoding == "br":
+            make_compressor = partial(_BrotliCompressor, self.brotli_quality)
+        elif encoding == "gzip":
+            make_compressor = partial(_GZipCompressor, self.gzip_level)
+        else:
+            # Still adds Vary: Accept-Encoding to responses we would compress
+            make_compressor = None
+        responder = _Responder(
+            self.app,
+            make_compressor,
+            minimum_size=self.minimum_size,
+            media_types=self.media_types,
+        )
+        await responder(scope, receive, send)
@@ -38,6 +38,18 @@ class Settings(BaseSettings):
     SECRET_KEY: str = secrets.token_urlsafe(32)
     # 60 minutes * 24 hours * 8 days = 8 days
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 8
+    # Access tokens are signed and verified with SECRET_KEY for HS256. RS256
+    # and EdDSA sign with JWT_PRIVATE_KEY and verify with JWT_PUBLIC_KEY (PEM),
+    # so nodes that only authenticate requests need just the public key
+    JWT_ALGORITHM: Literal["HS256", "RS256", "EdDSA"] = "HS256"
+    JWT_PRIVATE_KEY: str | None = None
+    JWT_PUBLIC_KEY: str | None = None
+    # Verified access tokens remembered until they expire; 0 disables
+    JWT_VERIFY_CACHE_SIZE: int = 10_000
+    # Each process keeps the token revocations in memory and reloads the ones
+    # other processes added at most this often, which bounds how long a token
+    # revoked elsewhere keeps working
+    TOKEN_REVOCATION_REFRESH_SECONDS: float = 5.0
     FRONTEND_HOST: str = "http://localhost:5173"
     ENVIRONMENT: Literal["local", "staging", "production"] = "local"
 
@@ -72,6 +84,44 @@ class Settings(BaseSettings):
             path=self.POSTGRES_DB,
         )
 
+    # Compress responses with brotli or gzip, as the client accepts, when their
+    # media type is listed and their body is at least COMPRESSION_MINIMUM_SIZE
+    # bytes; streamed exports are compressed chunk by chunk
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MINIMUM_SIZE: int = 1024
+    COMPRESSION_MEDIA_TYPES: Annotated[list[str] | str, BeforeValidator(parse_cors)] = [
+        "application/json",
+        "application/x-ndjson",
+        "application/javascript",
+        "text/csv",
+        "text/css",
+        "text/html",
+        "text/plain",
+    ]
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 4
+
+    # Render JSON responses with orjson instead of json.dumps, which roughly
+    # halves encoding time, see app/benchmarks/json_encoding.py. Opt-in since
+    # orjson is stricter: integers wider than 64 bits fail and NaN becomes null
+    ORJSON_RESPONSES: bool = False
+
+    # Serve items/users/login from async routes on an async engine instead of
+    # sync routes running in the threadpool
+    USE_ASYNC_DB: bool = False
+
+    # SQLAlchemy connection pool (per process and per engine)
+    POSTGRES_POOL_SIZE: int = 5
+    POSTGRES_MAX_OVERFLOW: int = 10
+    POSTGRES_POOL_TIMEOUT: float = 30.0
+    POSTGRES_POOL_RECYCLE: int = 1800
+    POSTGRES_POOL_PRE_PING: bool = True
+    # Server-side statement timeout in milliseconds, None to use the server default
+    POSTGRES_STATEMENT_TIMEOUT_MS: int | None = None
+    # psycopg prepares a statement after it runs this many times; None disables
+    # server-side prepared statements (needed behind PgBouncer in transaction mode)
+    POSTGRES_PREPARE_THRESHOLD: int | None = 5
+
     SMTP_TLS: bool = True
     SMTP_SSL: bool = False
     SMTP_PORT: int = 587
@@ -97,6 +147,37 @@ class Settings(BaseSettings):
         self.EMAILS_ENABLED = bool(self.SMTP_HOST and self.EMAILS_FROM_EMAIL)
         return self
 
+    # Background email delivery: workers keep an SMTP connection open between
+    # batches and retry failed sends with exponential backoff
+    EMAIL_OUTBOX_WORKERS: int = 2
+    EMAIL_OUTBOX_BATCH_SIZE: int = 20
+    EMAIL_OUTBOX_MAX_ATTEMPTS: int = 5
+    EMAIL_OUTBOX_RETRY_BACKOFF_SECONDS: float = 1.0
+    EMAIL_OUTBOX_RETRY_MAX_SECONDS: float = 60.0
+    EMAIL_OUTBOX_IDLE_SECONDS: float = 30.0
+
+    # Dedicated worker pool for bcrypt so password hashing cannot occupy the
+    # shared request threadpool; requests beyond the queue limit get a 503
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_QUEUE: int = 64
+    # Scheme and cost of password hashes. Stored hashes made with another
+    # scheme or cost still verify and are rehashed with these at the next login
+    PASSWORD_HASH_SCHEME: Literal["bcrypt", "argon2"] = "bcrypt"
+    # bcrypt cost factor; each step doubles the work. The test suite drops it
+    # to bcrypt's minimum of 4, values below 10 are refused outside local
+    # development
+    BCRYPT_ROUNDS: int = 12
+    # argon2id memory (KiB), passes over it and lanes
+    ARGON2_MEMORY_COST_KIB: int = 65536
+    ARGON2_TIME_COST: int = 3
+    ARGON2_PARALLELISM: int = 4
+
+    # In-process cache of token -> user used by get_current_user; set either
+    # to 0 to disable. Changes made by other processes are seen within
+    # TOKEN_REVOCATION_REFRESH_SECONDS, when cached versions are rechecked
+    USER_CACHE_TTL_SECONDS: int = 60
+    USER_CACHE_MAX_SIZE: int = 10_000
+
     EMAIL_TEST_USER: EmailStr = "test@example.com"
     FIRST_SUPERUSER: EmailStr
     FIRST_SUPERUSER_PASSWORD: str
@@ -122,5 +203,20 @@ class Settings(BaseSettings):
 
         return self
 
+    @model_validator(mode="after")
+    def _check_jwt_keys(self) -> Self:
+        if self.JWT_ALGORITHM != "HS256" and not self.JWT_PUBLIC_KEY:
+            raise ValueError(f"JWT_ALGORITHM={self.JWT_ALGORITHM} needs JWT_PUBLIC_KEY.")
+        return self
+
+    @model_validator(mode="after")
+    def _check_bcrypt_rounds(self) -> Self:
+        if self.BCRYPT_ROUNDS < 10 and self.ENVIRONMENT != "local":
+            raise ValueError(
+                f"BCRYPT_ROUNDS={self.BCRYPT_ROUNDS} is too weak for deployments, "
+                "use at least 10."
+            )
+        return self
+
 
 settings = Settings()  # type: ignore
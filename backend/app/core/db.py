@@ -1,10 +1,137 @@
+import threading
+import time
+from bisect import bisect_left
+from typing import Any
+
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, ConnectionPoolEntry, QueuePool
 from sqlmodel import Session, create_engine, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app import crud
 from app.core.config import settings
 from app.models import User, UserCreate
 
-engine = create_engine(str(settings.SQLALCHEMY_DATABASE_URI))
+# Upper bounds (seconds) of the pool checkout wait histogram buckets
+POOL_WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0)
+
+
+class PoolMetrics:
+    """Checkout wait time histogram and timeout counter for the connection pool."""
+
+    def __init__(self, buckets: tuple[float, ...] = POOL_WAIT_BUCKETS) -> None:
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            # One extra bucket for waits above the largest bound
+            self._counts = [0] * (len(self.buckets) + 1)
+            self._sum = 0.0
+            self._timeouts = 0
+
+    def observe(self, wait: float, timed_out: bool = False) -> None:
+        with self._lock:
+            self._counts[bisect_left(self.buckets, wait)] += 1
+            self._sum += wait
+            if timed_out:
+                self._timeouts += 1
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            cumulative = 0
+            histogram = {}
+            for bound, count in zip(self.buckets, self._counts[:-1], strict=True):
+                cumulative += count
+                histogram[str(bound)] = cumulative
+            histogram["+Inf"] = cumulative + self._counts[-1]
+            return {
+                "wait_seconds_histogram": histogram,
+                "wait_seconds_sum": self._sum,
+                "checkouts": histogram["+Inf"],
+                "timeouts": self._timeouts,
+            }
+
+
+pool_metrics = PoolMetrics()
+
+
+class _InstrumentedPoolMixin:
+    """Records how long each pool checkout waited for a connection."""
+
+    def _do_get(self) -> ConnectionPoolEntry:
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()  # type: ignore[misc]
+        except PoolTimeoutError:
+            pool_metrics.observe(time.perf_counter() - start, timed_out=True)
+            raise
+        pool_metrics.observe(time.perf_counter() - start)
+        return connection
+
+
+class InstrumentedQueuePool(_InstrumentedPoolMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncAdaptedQueuePool(_InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def _connect_args() -> dict[str, Any]:
+    connect_args: dict[str, Any] = {
+        "prepare_threshold": settings.POSTGRES_PREPARE_THRESHOLD
+    }
+    if settings.POSTGRES_STATEMENT_TIMEOUT_MS is not None:
+        connect_args["options"] = (
+            f"-c statement_timeout={settings.POSTGRES_STATEMENT_TIMEOUT_MS}"
+        )
+    return connect_args
+
+
+def _engine_options() -> dict[str, Any]:
+    return {
+        "pool_size": settings.POSTGRES_POOL_SIZE,
+        "max_overflow": settings.POSTGRES_MAX_OVERFLOW,
+        "pool_timeout": settings.POSTGRES_POOL_TIMEOUT,
+        "pool_recycle": settings.POSTGRES_POOL_RECYCLE,
+        "pool_pre_ping": settings.POSTGRES_POOL_PRE_PING,
+        "connect_args": _connect_args(),
+    }
+
+
+engine = create_engine(
+    str(settings.SQLALCHEMY_DATABASE_URI),
+    poolclass=InstrumentedQueuePool,
+    **_engine_options(),
+)
+
+# psycopg 3 drives both engines; the async one serves the async route stack
+# (settings.USE_ASYNC_DB) and only opens connections when it is used
+async_engine = create_async_engine(
+    str(settings.SQLALCHEMY_DATABASE_URI),
+    poolclass=InstrumentedAsyncAdaptedQueuePool,
+    **_engine_options(),
+)
+# Async code must not lazily reload expired attributes, so keep them after commit
+async_session_maker = async_sessionmaker(
+    async_engine, class_=AsyncSession, expire_on_commit=False
+)
+
+
+def get_pool_stats() -> dict[str, Any]:
+    pool = engine.pool
+    assert isinstance(pool, QueuePool)
+    return {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),
+        "max_overflow": settings.POSTGRES_MAX_OVERFLOW,
+        **pool_metrics.snapshot(),
+    }
 
 
 # make sure all SQLModel models are imported (app.models) before initializing DB
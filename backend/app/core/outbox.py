@@ -0,0 +1,264 @@
+import heapq
+import itertools
+import logging
+import smtplib
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+from contextlib import suppress
+from dataclasses import dataclass
+from typing import Any, Protocol
+
+import emails  # type: ignore
+from emails.backend.smtp import SMTPBackend  # type: ignore
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class OutboxMessage:
+    email_to: str
+    subject: str
+    html_content: str
+    attempts: int = 0
+
+
+class EmailTransport(Protocol):
+    def send(self, message: OutboxMessage) -> None: ...
+
+    def close(self) -> None: ...
+
+
+def smtp_options() -> dict[str, Any]:
+    options: dict[str, Any] = {"host": settings.SMTP_HOST, "port": settings.SMTP_PORT}
+    if settings.SMTP_TLS:
+        options["tls"] = True
+    elif settings.SMTP_SSL:
+        options["ssl"] = True
+    if settings.SMTP_USER:
+        options["user"] = settings.SMTP_USER
+    if settings.SMTP_PASSWORD:
+        options["password"] = settings.SMTP_PASSWORD
+    return options
+
+
+class SMTPTransport:
+    """
+    One SMTP connection, opened on the first send and reused until `close`.
+    """
+
+    def __init__(self) -> None:
+        self._backend: SMTPBackend | None = None
+
+    def send(self, message: OutboxMessage) -> None:
+        if self._backend is None:
+            self._backend = SMTPBackend(fail_silently=False, **smtp_options())
+        mail = emails.Message(
+            subject=message.subject,
+            html=message.html_content,
+            mail_from=(settings.EMAILS_FROM_NAME, settings.EMAILS_FROM_EMAIL),
+        )
+        mail.send(to=message.email_to, smtp=self._backend)
+
+    def close(self) -> None:
+        if self._backend is not None:
+            # QUIT on a connection that already failed raises; it is gone anyway
+            with suppress(smtplib.SMTPException, OSError):
+                self._backend.close()
+            self._backend = None
+
+
+class EmailOutbox:
+    """
+    In-process queue of outgoing emails drained by background workers.
+
+    Each worker owns a transport (one SMTP connection) and sends up to
+    `batch_size` queued messages per wakeup over it, closing it after
+    `idle_timeout` seconds without work. A failed send drops the connection and
+    puts the message back with exponential backoff until `max_attempts`.
+    Workers start on the first `enqueue`.
+    """
+
+    def __init__(
+        self,
+        *,
+        workers: int,
+        batch_size: int,
+        max_attempts: int,
+        retry_backoff: float,
+        retry_max: float,
+        idle_timeout: float,
+        transport_factory: Callable[[], EmailTransport] = SMTPTransport,
+    ) -> None:
+        self.workers = workers
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.retry_backoff = retry_backoff
+        self.retry_max = retry_max
+        self.idle_timeout = idle_timeout
+        self.transport_factory = transport_factory
+        self._cond = threading.Condition()
+        self._ready: deque[OutboxMessage] = deque()
+        self._delayed: list[tuple[float, int, OutboxMessage]] = []
+        self._seq = itertools.count()
+        self._threads: list[threading.Thread] = []
+        self._closed = False
+        self._busy = 0
+        self._sent = 0
+        self._retried = 0
+        self._failed = 0
+
+    def enqueue(self, message: OutboxMessage) -> None:
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Email outbox is stopped")
+            if not self._threads:
+                self._start()
+            self._ready.append(message)
+            self._cond.notify()
+
+    def _start(self) -> None:
+        for i in range(self.workers):
+            thread = threading.Thread(
+                target=self._work, name=f"email-outbox-{i}", daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def _take_batch(self) -> list[OutboxMessage] | None:
+        """
+        Block until messages are due. Returns an empty batch after
+        `idle_timeout` without work and None once stopped and drained.
+        """
+        idle_until = time.monotonic() + self.idle_timeout
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                while self._delayed and self._delayed[0][0] <= now:
+                    self._ready.append(heapq.heappop(self._delayed)[2])
+                if self._ready:
+                    size = min(self.batch_size, len(self._ready))
+                    self._busy += 1
+                    return [self._ready.popleft() for _ in range(size)]
+                if self._closed:
+                    return None
+                if now >= idle_until:
+                    return []
+                timeout = idle_until - now
+                if self._delayed:
+                    timeout = min(timeout, self._delayed[0][0] - now)
+                self._cond.wait(timeout)
+
+    def _retry(self, message: OutboxMessage) -> None:
+        with self._cond:
+            if message.attempts >= self.max_attempts or self._closed:
+                self._failed += 1
+                logger.error(
+                    "Giving up on email to %s after %d attempts",
+                    message.email_to,
+                    message.attempts,
+                )
+                return
+            self._retried += 1
+            delay = min(
+                self.retry_backoff * 2 ** (message.attempts - 1), self.retry_max
+            )
+            heapq.heappush(
+                self._delayed, (time.monotonic() + delay, next(self._seq), message)
+            )
+            self._cond.notify()
+
+    def _work(self) -> None:
+        transport = self.transport_factory()
+        try:
+            while (batch := self._take_batch()) is not None:
+                if not batch:
+                    transport.close()
+                    continue
+                try:
+                    for message in batch:
+                        message.attempts += 1
+                        try:
+                            transport.send(message)
+                        except Exception:
+                            logger.warning(
+                                "Sending email to %s failed",
+                                message.email_to,
+                                exc_info=True,
+                            )
+                            transport.close()
+                            self._retry(message)
+                        else:
+                            with self._cond:
+                                self._sent += 1
+                finally:
+                    with self._cond:
+                        self._busy -= 1
+                        self._cond.notify_all()
+        finally:
+            transport.close()
+
+    def join(self, timeout: float | None = None) -> bool:
+        """Wait until nothing is queued, scheduled for retry or being sent."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while self._ready or self._delayed or self._busy:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+            return True
+
+    def stop(self, timeout: float = 10.0) -> bool:
+        """
+        Send what is already queued and close the connections. Messages still
+        waiting for a retry are dropped. Returns False if a worker is still
+        sending after `timeout`; the outbox then stays stopped, and `enqueue`
+        keeps failing, until a later `stop` sees every worker exit. Once it
+        has, a later `enqueue` starts new workers.
+        """
+        with self._cond:
+            self._closed = True
+            if self._delayed:
+                logger.warning(
+                    "Dropping %d emails waiting for retry", len(self._delayed)
+                )
+                self._failed += len(self._delayed)
+                self._delayed.clear()
+            self._cond.notify_all()
+        deadline = time.monotonic() + timeout
+        for thread in self._threads:
+            thread.join(max(0.0, deadline - time.monotonic()))
+        with self._cond:
+            running = sum(thread.is_alive() for thread in self._threads)
+            if running:
+                logger.warning("%d email workers still running after stop", running)
+                return False
+            self._threads = []
+            self._closed = False
+            return True
+
+    def stats(self) -> dict[str, Any]:
+        with self._cond:
+            return {
+                "workers": len(self._threads),
+                "queued": len(self._ready),
+                "retry_scheduled": len(self._delayed),
+                "sending": self._busy,
+                "sent": self._sent,
+                "retried": self._retried,
+                "failed": self._failed,
+            }
+
+
+email_outbox = EmailOutbox(
+    workers=settings.EMAIL_OUTBOX_WORKERS,
+    batch_size=settings.EMAIL_OUTBOX_BATCH_SIZE,
+    max_attempts=settings.EMAIL_OUTBOX_MAX_ATTEMPTS,
+    retry_backoff=settings.EMAIL_OUTBOX_RETRY_BACKOFF_SECONDS,
+    retry_max=settings.EMAIL_OUTBOX_RETRY_MAX_SECONDS,
+    idle_timeout=settings.EMAIL_OUTBOX_IDLE_SECONDS,
+)
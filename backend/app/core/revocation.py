@@ -0,0 +1,159 @@
+import threading
+import time
+import uuid
+from collections.abc import Iterable
+from datetime import datetime, timedelta, timezone
+
+from sqlmodel import Session, col, delete, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.config import settings
+from app.core.tokens import AccessToken
+from app.models import TokenRevocation
+
+# Rows committed a little after their revoked_at must not be skipped by the
+# next incremental refresh, so each refresh re-reads this many seconds
+REFRESH_OVERLAP_SECONDS = 60.0
+
+
+class RevocationStore:
+    """
+    In-memory copy of the token_revocation table.
+
+    Checking a token costs two dict lookups and no query. Revocations made in
+    this process apply at once; `refresh` picks up the rows other processes
+    added since the previous refresh, so those apply within
+    `refresh_interval` seconds.
+    """
+
+    def __init__(self, refresh_interval: float) -> None:
+        self.refresh_interval = refresh_interval
+        self._lock = threading.Lock()
+        self.clear()
+
+    def clear(self) -> None:
+        """Forget everything; the next refresh reloads the whole table."""
+        with self._lock:
+            # jti -> token expiry, and user id -> (cutoff, expiry), as timestamps
+            self._tokens: dict[str, float] = {}
+            self._users: dict[str, tuple[float, float]] = {}
+            self._watermark: datetime | None = None
+            self._refreshed_at = float("-inf")
+            self._refreshing = False
+
+    def is_revoked(self, token: AccessToken) -> bool:
+        if token.token_id is not None and token.token_id in self._tokens:
+            return True
+        user = self._users.get(token.subject)
+        if user is None:
+            return False
+        # Tokens from before jti/iat were issued can't be told apart, so a
+        # user-wide revocation covers them too
+        return token.issued_at is None or token.issued_at < user[0]
+
+    def refresh_due(self) -> bool:
+        return time.monotonic() - self._refreshed_at >= self.refresh_interval
+
+    def refresh(self, session: Session, *, only_if_due: bool = False) -> bool:
+        """
+        Load the revocations added since the previous refresh. Returns False
+        without refreshing if another thread is already at it or, with
+        `only_if_due`, got to it first since the caller checked `refresh_due`.
+        """
+        with self._lock:
+            if self._refreshing or (only_if_due and not self.refresh_due()):
+                return False
+            self._refreshing = True
+            watermark = self._watermark
+        try:
+            now = datetime.now(timezone.utc)
+            statement = select(TokenRevocation).where(
+                col(TokenRevocation.expires_at) > now
+            )
+            if watermark is not None:
+                since = watermark - timedelta(seconds=REFRESH_OVERLAP_SECONDS)
+                statement = statement.where(col(TokenRevocation.revoked_at) >= since)
+            rows = session.exec(statement).all()
+            with self._lock:
+                self._apply(rows)
+                self._prune(now.timestamp())
+                self._watermark = now
+                self._refreshed_at = time.monotonic()
+        finally:
+            self._refreshing = False
+        return True
+
+    def revoke_token(self, session: Session | AsyncSession, token: AccessToken) -> None:
+        """Revoke one token. The row is added to `session` for the caller to commit."""
+        if token.token_id is None:
+            raise ValueError("Token has no jti")
+        self._revoke(
+            session,
+            TokenRevocation(
+                jti=token.token_id,
+                revoked_at=datetime.now(timezone.utc),
+                expires_at=datetime.fromtimestamp(token.expires_at, timezone.utc),
+            ),
+        )
+
+    def revoke_user(self, session: Session | AsyncSession, user_id: uuid.UUID) -> None:
+        """
+        Revoke every token issued to the user so far. The row is added to
+        `session` for the caller to commit.
+        """
+        revoked_at = datetime.now(timezone.utc)
+        self._revoke(
+            session,
+            TokenRevocation(
+                user_id=user_id,
+                revoked_at=revoked_at,
+                # Every token issued before revoked_at has expired by then
+                expires_at=revoked_at
+                + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES),
+            ),
+        )
+
+    def _revoke(
+        self, session: Session | AsyncSession, revocation: TokenRevocation
+    ) -> None:
+        # Applied before the commit: if it fails, this process errs on the
+        # side of rejecting the token
+        with self._lock:
+            self._apply([revocation])
+        session.add(revocation)
+
+    def _apply(self, rows: Iterable[TokenRevocation]) -> None:
+        for row in rows:
+            expires_at = row.expires_at.timestamp()
+            if row.jti is not None:
+                self._tokens[row.jti] = expires_at
+            if row.user_id is not None:
+                key = str(row.user_id)
+                cutoff = row.revoked_at.timestamp()
+                previous = self._users.get(key)
+                if previous is None or previous[0] < cutoff:
+                    self._users[key] = (cutoff, expires_at)
+
+    def _prune(self, now: float) -> None:
+        self._tokens = {
+            jti: expires_at
+            for jti, expires_at in self._tokens.items()
+            if expires_at > now
+        }
+        self._users = {
+            user_id: entry for user_id, entry in self._users.items() if entry[1] > now
+        }
+
+
+def purge_expired_revocations(session: Session) -> None:
+    """Delete revocations whose tokens have all expired."""
+    statement = delete(TokenRevocation).where(
+        col(TokenRevocation.expires_at) <= datetime.now(timezone.utc)
+    )
+    session.execute(statement)
+    session.commit()
+
+
+revocation_store = RevocationStore(
+    refresh_interval=settings.TOKEN_REVOCATION_REFRESH_SECONDS
+)
@@ -1,30 +1,194 @@
+import asyncio
+import threading
+import time
+import uuid
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-from typing import Any
+from functools import partial
+from typing import Any, TypeVar
 
-import jwt
 from passlib.context import CryptContext
 
 from app.core.config import settings
+from app.core.tokens import token_signer
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+PASSWORD_HASH_SCHEMES = ("bcrypt", "argon2")
 
 
+def password_context_options() -> dict[str, Any]:
+    """
+    CryptContext options for the configured scheme and cost.
+
+    Every other scheme is deprecated and min/max equal the configured cost, so
+    any stored hash made differently is flagged by `verify_and_update`.
+    """
+    default = settings.PASSWORD_HASH_SCHEME
+    bcrypt_rounds = settings.BCRYPT_ROUNDS
+    argon2_time_cost = settings.ARGON2_TIME_COST
+    return {
+        "schemes": [default]
+        + [scheme for scheme in PASSWORD_HASH_SCHEMES if scheme != default],
+        "deprecated": "auto",
+        "bcrypt__rounds": bcrypt_rounds,
+        "bcrypt__min_rounds": bcrypt_rounds,
+        "bcrypt__max_rounds": bcrypt_rounds,
+        "argon2__type": "ID",
+        "argon2__memory_cost": settings.ARGON2_MEMORY_COST_KIB,
+        "argon2__parallelism": settings.ARGON2_PARALLELISM,
+        "argon2__rounds": argon2_time_cost,
+        "argon2__min_rounds": argon2_time_cost,
+        "argon2__max_rounds": argon2_time_cost,
+    }
+
+
+pwd_context = CryptContext(**password_context_options())
+
+
+# Password reset tokens; access tokens use settings.JWT_ALGORITHM
 ALGORITHM = "HS256"
 
+T = TypeVar("T")
+
+
+class PasswordHashingBusyError(Exception):
+    """Raised when the password hashing queue is full."""
+
+
+class PasswordHashPool:
+    """
+    Size-capped thread pool for bcrypt work.
+
+    bcrypt releases the GIL, so a few threads use that many cores while the
+    shared request threadpool stays free for other endpoints. Submissions beyond
+    `max_workers + max_queue` are rejected instead of queueing without bound.
+    """
+
+    def __init__(self, max_workers: int, max_queue: int) -> None:
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="password-hash"
+        )
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._peak_pending = 0
+        self._completed = 0
+        self._rejected = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+
+    def _run(self, func: Callable[[], T], enqueued_at: float) -> T:
+        wait = time.perf_counter() - enqueued_at
+        self._local.in_pool = True
+        try:
+            return func()
+        finally:
+            self._local.in_pool = False
+            with self._lock:
+                self._pending -= 1
+                self._completed += 1
+                self._total_wait += wait
+                self._max_wait = max(self._max_wait, wait)
+
+    def submit(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> "Future[T]":
+        with self._lock:
+            if self._pending >= self.max_workers + self.max_queue:
+                self._rejected += 1
+                raise PasswordHashingBusyError("Password hashing queue is full")
+            self._pending += 1
+            self._peak_pending = max(self._peak_pending, self._pending)
+        return self._executor.submit(
+            self._run, partial(func, *args, **kwargs), time.perf_counter()
+        )
+
+    def run(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        # Work already running on a pool thread runs inline, otherwise a
+        # saturated pool would wait on itself. This blocks the calling thread
+        # until a worker is free, so async routes await `run_async` instead
+        if getattr(self._local, "in_pool", False):
+            return func(*args, **kwargs)
+        return self.submit(func, *args, **kwargs).result()
+
+    async def run_async(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        return await asyncio.wrap_future(self.submit(func, *args, **kwargs))
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "in_flight": min(self._pending, self.max_workers),
+                "queue_depth": max(self._pending - self.max_workers, 0),
+                "peak_pending": self._peak_pending,
+                "completed": self._completed,
+                "rejected": self._rejected,
+                "avg_wait_seconds": self._total_wait / self._completed
+                if self._completed
+                else 0.0,
+                "max_wait_seconds": self._max_wait,
+            }
+
+
+password_hash_pool = PasswordHashPool(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    max_queue=settings.PASSWORD_HASH_MAX_QUEUE,
+)
+
 
 def create_access_token(subject: str | Any, expires_delta: timedelta | None = None) -> str:
     if expires_delta:
         expire = datetime.now(timezone.utc) + expires_delta
     else:
         expire = datetime.now(timezone.utc) + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    to_encode = {"exp": expire, "sub": str(subject)}
-    encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=ALGORITHM)
+    if token_signer is None:
+        raise RuntimeError("JWT_PRIVATE_KEY is not set, this node can't issue tokens")
+    # iat keeps sub-second precision so a token issued right after a user-wide
+    # revocation isn't taken for one issued before it
+    to_encode = {
+        "exp": expire,
+        "sub": str(subject),
+        "jti": uuid.uuid4().hex,
+        "iat": time.time(),
+    }
+    encoded_jwt = token_signer.sign(to_encode)
     return encoded_jwt
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    return password_hash_pool.run(pwd_context.verify, plain_password, hashed_password)
+
+
+def verify_and_update_password(
+    plain_password: str, hashed_password: str
+) -> tuple[bool, str | None]:
+    """
+    Verify the password and, when the stored hash doesn't use the configured
+    scheme and cost, also return a new hash to store in its place.
+    """
+    return password_hash_pool.run(
+        pwd_context.verify_and_update, plain_password, hashed_password
+    )
 
 
 def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+    return password_hash_pool.run(pwd_context.hash, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await password_hash_pool.run_async(
+        pwd_context.verify, plain_password, hashed_password
+    )
+
+
+async def verify_and_update_password_async(
+    plain_password: str, hashed_password: str
+) -> tuple[bool, str | None]:
+    return await password_hash_pool.run_async(
+        pwd_context.verify_and_update, plain_password, hashed_password
+    )
+
+
+async def get_password_hash_async(password: str) -> str:
+    return await password_hash_pool.run_async(pwd_context.hash, password)
@@ -0,0 +1,111 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any
+
+import jwt
+from jwt.exceptions import InvalidTokenError
+
+from app.core.config import settings
+
+
+@dataclass(frozen=True)
+class AccessToken:
+    subject: str
+    expires_at: float
+    # Absent from tokens issued before revocation support
+    token_id: str | None = None
+    issued_at: float | None = None
+
+
+def prepare_key(algorithm: str, key: str | bytes) -> Any:
+    """Parse `key` once into what `algorithm` signs or verifies with."""
+    return jwt.get_algorithm_by_name(algorithm).prepare_key(key)
+
+
+class TokenSigner:
+    """Signs access tokens with a key prepared once."""
+
+    def __init__(self, algorithm: str, key: str | bytes) -> None:
+        self.algorithm = algorithm
+        self._key = prepare_key(algorithm, key)
+
+    def sign(self, claims: dict[str, Any]) -> str:
+        return jwt.encode(claims, self._key, algorithm=self.algorithm)
+
+
+class TokenVerifier:
+    """
+    Verifies access tokens with a key prepared once.
+
+    Up to `cache_size` verified tokens are remembered until they expire, so a
+    repeat token costs a lookup instead of a signature check. Entries are keyed
+    by the whole token, signature included.
+    """
+
+    def __init__(self, algorithm: str, key: str | bytes, cache_size: int) -> None:
+        self.algorithm = algorithm
+        self.cache_size = cache_size
+        self._key = prepare_key(algorithm, key)
+        self._jwt = jwt.PyJWT(options={"require": ["exp", "sub"]})
+        self._verified: OrderedDict[str, AccessToken] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def verify(self, token: str) -> AccessToken:
+        """Raises `InvalidTokenError` if `token` is not valid."""
+        if self.cache_size > 0:
+            with self._lock:
+                cached = self._verified.get(token)
+                if cached is not None:
+                    if cached.expires_at > time.time():
+                        self._verified.move_to_end(token)
+                        return cached
+                    del self._verified[token]
+
+        payload = self._jwt.decode(token, self._key, algorithms=[self.algorithm])
+        subject = payload["sub"]
+        if not isinstance(subject, str):
+            raise InvalidTokenError("Subject must be a string")
+        issued_at = payload.get("iat")
+        verified = AccessToken(
+            subject=subject,
+            expires_at=float(payload["exp"]),
+            token_id=payload.get("jti"),
+            issued_at=None if issued_at is None else float(issued_at),
+        )
+
+        if self.cache_size > 0:
+            with self._lock:
+                self._verified[token] = verified
+                while len(self._verified) > self.cache_size:
+                    self._verified.popitem(last=False)
+        return verified
+
+    def clear(self) -> None:
+        with self._lock:
+            self._verified.clear()
+
+
+def _build_signer() -> TokenSigner | None:
+    # Nodes configured with only a public key verify tokens but can't issue them
+    if settings.JWT_ALGORITHM == "HS256":
+        return TokenSigner("HS256", settings.SECRET_KEY)
+    if settings.JWT_PRIVATE_KEY is None:
+        return None
+    return TokenSigner(settings.JWT_ALGORITHM, settings.JWT_PRIVATE_KEY)
+
+
+def _verification_key() -> str:
+    if settings.JWT_ALGORITHM == "HS256":
+        return settings.SECRET_KEY
+    assert settings.JWT_PUBLIC_KEY is not None
+    return settings.JWT_PUBLIC_KEY
+
+
+token_signer = _build_signer()
+token_verifier = TokenVerifier(
+    settings.JWT_ALGORITHM,
+    _verification_key(),
+    cache_size=settings.JWT_VERIFY_CACHE_SIZE,
+)
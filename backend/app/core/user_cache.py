@@ -0,0 +1,175 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any
+
+from sqlalchemy.orm import make_transient_to_detached
+from sqlalchemy.orm.util import identity_key
+from sqlmodel import Session, col, select
+
+from app.core.config import settings
+from app.models import User
+
+
+@dataclass
+class _Entry:
+    user_id: uuid.UUID
+    snapshot: dict[str, Any]
+    expires_at: float
+
+
+class UserCache:
+    """
+    TTL + LRU cache of access token -> authenticated user snapshot.
+
+    Lets `get_current_user` skip the user lookup for repeat requests. Entries
+    never outlive the token's own expiry, and every code path that changes or
+    deletes a user must call `invalidate_user`, so deactivation and privilege
+    changes apply on the next request in this process. Changes made by other
+    processes are picked up by `refresh_versions`.
+    """
+
+    # Users per query in refresh_versions
+    REFRESH_BATCH_SIZE = 1000
+
+    def __init__(self, maxsize: int, ttl_seconds: float) -> None:
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self._tokens_by_user: dict[uuid.UUID, set[str]] = {}
+        # Bumped by every invalidate_user, so a put of a user loaded before an
+        # invalidation can be told apart from one loaded after it
+        self._generation = 0
+        # Generation of each user's latest invalidation, for the most recently
+        # invalidated users. Older ones are folded into _invalidated_floor,
+        # which then stands in for any user missing from the dict
+        self._invalidated: OrderedDict[str, int] = OrderedDict()
+        self._invalidated_floor = 0
+        self._lock = threading.Lock()
+        self._refreshing = False
+
+    @property
+    def enabled(self) -> bool:
+        return self.maxsize > 0 and self.ttl_seconds > 0
+
+    def get(self, token: str) -> dict[str, Any] | None:
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                return None
+            if entry.expires_at <= time.time():
+                self._remove(token)
+                return None
+            self._entries.move_to_end(token)
+            return entry.snapshot
+
+    def generation(self) -> int:
+        """Read before loading a user and pass to `put` with the loaded user."""
+        with self._lock:
+            return self._generation
+
+    def put(
+        self,
+        token: str,
+        user: User,
+        token_expires_at: float,
+        generation: int | None = None,
+    ) -> None:
+        """
+        Cache `user` for `token`. With `generation`, the user isn't cached if
+        it was invalidated since that generation was read, as it may have
+        been loaded before the change.
+        """
+        if not self.enabled:
+            return
+        entry = _Entry(
+            user_id=user.id,
+            snapshot=user.model_dump(),
+            expires_at=min(time.time() + self.ttl_seconds, token_expires_at),
+        )
+        with self._lock:
+            if generation is not None and generation < self._invalidated.get(
+                str(user.id), self._invalidated_floor
+            ):
+                return
+            self._remove(token)
+            self._entries[token] = entry
+            self._tokens_by_user.setdefault(user.id, set()).add(token)
+            while len(self._entries) > self.maxsize:
+                self._remove(next(iter(self._entries)))
+
+    def invalidate_user(self, user_id: uuid.UUID) -> None:
+        with self._lock:
+            self._generation += 1
+            key = str(user_id)
+            self._invalidated[key] = self._generation
+            self._invalidated.move_to_end(key)
+            while len(self._invalidated) > self.maxsize:
+                _, generation = self._invalidated.popitem(last=False)
+                self._invalidated_floor = generation
+            for token in self._tokens_by_user.pop(user_id, set()):
+                self._entries.pop(token, None)
+
+    def refresh_versions(self, session: Session) -> None:
+        """
+        Invalidate users whose row was changed or deleted since they were
+        cached, by comparing the cached `version` with the stored one. Returns
+        at once if another thread is already refreshing.
+        """
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+            cached: dict[uuid.UUID, set[int]] = {}
+            for entry in self._entries.values():
+                cached.setdefault(entry.user_id, set()).add(entry.snapshot["version"])
+        try:
+            user_ids = list(cached)
+            current: dict[uuid.UUID, int] = {}
+            for start in range(0, len(user_ids), self.REFRESH_BATCH_SIZE):
+                batch = user_ids[start : start + self.REFRESH_BATCH_SIZE]
+                statement = select(User.id, User.version).where(col(User.id).in_(batch))
+                current.update(session.exec(statement).all())
+            for user_id, versions in cached.items():
+                if versions != {current.get(user_id)}:
+                    self.invalidate_user(user_id)
+        finally:
+            self._refreshing = False
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._tokens_by_user.clear()
+            self._invalidated.clear()
+            # Loads that started before the clear are not cached
+            self._invalidated_floor = self._generation
+
+    def _remove(self, token: str) -> None:
+        entry = self._entries.pop(token, None)
+        if entry is None:
+            return
+        tokens = self._tokens_by_user.get(entry.user_id)
+        if tokens is not None:
+            tokens.discard(token)
+            if not tokens:
+                del self._tokens_by_user[entry.user_id]
+
+
+def attach_user(session: Session, snapshot: dict[str, Any]) -> User:
+    """Rebuild a cached user as a persistent instance of `session` without a query."""
+    existing = session.identity_map.get(identity_key(User, snapshot["id"]))
+    if existing is not None:
+        return existing  # type: ignore[no-any-return]
+    user = User(**snapshot)
+    make_transient_to_detached(user)
+    session.add(user)
+    return user
+
+
+user_cache = UserCache(
+    maxsize=settings.USER_CACHE_MAX_SIZE, ttl_seconds=settings.USER_CACHE_TTL_SECONDS
+)
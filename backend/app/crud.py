@@ -1,15 +1,37 @@
 import uuid
 from typing import Any
 
-from sqlmodel import Session, select
+from fastapi.concurrency import run_in_threadpool
+from sqlmodel import Session, col, delete, insert, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.core.security import get_password_hash, verify_password
-from app.models import Item, ItemCreate, User, UserCreate, UserUpdate
+from app.core.security import (
+    get_password_hash,
+    get_password_hash_async,
+    verify_and_update_password,
+    verify_and_update_password_async,
+)
+from app.core.user_cache import user_cache
+from app.models import (
+    BulkItemError,
+    Item,
+    ItemBulkUpdate,
+    ItemCreate,
+    ItemPublic,
+    User,
+    UserCreate,
+    UserUpdate,
+)
 
 
-def create_user(*, session: Session, user_create: UserCreate) -> User:
+def create_user(
+    *, session: Session, user_create: UserCreate, hashed_password: str | None = None
+) -> User:
+    # Async routes hash on the password hashing pool first and pass the result
+    if hashed_password is None:
+        hashed_password = get_password_hash(user_create.password)
     db_obj = User.model_validate(
-        user_create, update={"hashed_password": get_password_hash(user_create.password)}
+        user_create, update={"hashed_password": hashed_password}
     )
     session.add(db_obj)
     session.commit()
@@ -17,16 +39,24 @@ def create_user(*, session: Session, user_create: UserCreate) -> User:
     return db_obj
 
 
-def update_user(*, session: Session, db_user: User, user_in: UserUpdate) -> Any:
+def update_user(
+    *,
+    session: Session,
+    db_user: User,
+    user_in: UserUpdate,
+    hashed_password: str | None = None,
+) -> Any:
     user_data = user_in.model_dump(exclude_unset=True)
     extra_data = {}
     if "password" in user_data:
-        password = user_data["password"]
-        hashed_password = get_password_hash(password)
+        if hashed_password is None:
+            hashed_password = get_password_hash(user_data["password"])
         extra_data["hashed_password"] = hashed_password
+    user_id = db_user.id
     db_user.sqlmodel_update(user_data, update=extra_data)
     session.add(db_user)
     session.commit()
+    user_cache.invalidate_user(user_id)
     session.refresh(db_user)
     return db_user
 
@@ -41,14 +71,200 @@ def authenticate(*, session: Session, email: str, password: str) -> User | None:
     db_user = get_user_by_email(session=session, email=email)
     if not db_user:
         return None
-    if not verify_password(password, db_user.hashed_password):
+    verified, new_hash = verify_and_update_password(password, db_user.hashed_password)
+    if not verified:
+        return None
+    if new_hash:
+        _store_rehashed_password(session=session, db_user=db_user, new_hash=new_hash)
+    return db_user
+
+
+async def authenticate_in_threadpool(
+    *, session: Session, email: str, password: str
+) -> User | None:
+    """
+    `authenticate` for async routes on a sync session. Queries run on the
+    request threadpool and only the hash check on the password hashing pool,
+    so neither holds a thread while waiting on the other.
+    """
+    db_user = await run_in_threadpool(get_user_by_email, session=session, email=email)
+    if not db_user:
+        return None
+    verified, new_hash = await verify_and_update_password_async(
+        password, db_user.hashed_password
+    )
+    if not verified:
         return None
+    if new_hash:
+        await run_in_threadpool(
+            _store_rehashed_password,
+            session=session,
+            db_user=db_user,
+            new_hash=new_hash,
+        )
     return db_user
 
 
+def _store_rehashed_password(*, session: Session, db_user: User, new_hash: str) -> None:
+    # Move the stored hash to the configured scheme and cost
+    user_id = db_user.id
+    db_user.hashed_password = new_hash
+    session.add(db_user)
+    session.commit()
+    user_cache.invalidate_user(user_id)
+    session.refresh(db_user)
+
+
 def create_item(*, session: Session, item_in: ItemCreate, owner_id: uuid.UUID) -> Item:
     db_item = Item.model_validate(item_in, update={"owner_id": owner_id})
     session.add(db_item)
     session.commit()
     session.refresh(db_item)
     return db_item
+
+
+# Bulk item operations return public models built before the commit, which
+# would otherwise expire every row and reload it one SELECT at a time. Pass
+# owner_id=None to skip the ownership check (superusers)
+
+
+def create_items(
+    *, session: Session, items_in: list[ItemCreate], owner_id: uuid.UUID
+) -> list[ItemPublic]:
+    rows = [
+        item_in.model_dump() | {"id": uuid.uuid4(), "owner_id": owner_id}
+        for item_in in items_in
+    ]
+    statement = insert(Item).returning(
+        col(Item.id),
+        col(Item.title),
+        col(Item.description),
+        col(Item.owner_id),
+        sort_by_parameter_order=True,
+    )
+    # A list of parameter sets is sent as multi-row INSERT ... VALUES batches
+    result = session.execute(statement, rows)
+    items = [ItemPublic.model_validate(row._mapping) for row in result]
+    session.commit()
+    return items
+
+
+def _check_items(
+    db_items: dict[uuid.UUID, Any], ids: list[uuid.UUID], owner_id: uuid.UUID | None
+) -> tuple[list[int], list[BulkItemError]]:
+    """Split request rows into the indexes to apply and per-row errors."""
+    allowed: list[int] = []
+    errors: list[BulkItemError] = []
+    for index, item_id in enumerate(ids):
+        db_item = db_items.get(item_id)
+        if db_item is None:
+            errors.append(
+                BulkItemError(index=index, id=item_id, detail="Item not found")
+            )
+        elif owner_id is not None and db_item.owner_id != owner_id:
+            errors.append(
+                BulkItemError(index=index, id=item_id, detail="Not enough permissions")
+            )
+        else:
+            allowed.append(index)
+    return allowed, errors
+
+
+def update_items(
+    *, session: Session, items_in: list[ItemBulkUpdate], owner_id: uuid.UUID | None
+) -> tuple[list[ItemPublic], list[BulkItemError]]:
+    ids = [item_in.id for item_in in items_in]
+    statement = select(Item).where(col(Item.id).in_(set(ids)))
+    db_items = {item.id: item for item in session.exec(statement)}
+    allowed, errors = _check_items(db_items, ids, owner_id)
+    updated: dict[uuid.UUID, Item] = {}
+    for index in allowed:
+        item_in = items_in[index]
+        db_item = db_items[item_in.id]
+        db_item.sqlmodel_update(item_in.model_dump(exclude_unset=True, exclude={"id"}))
+        updated[db_item.id] = db_item
+    session.flush()
+    items = [ItemPublic.model_validate(db_item) for db_item in updated.values()]
+    session.commit()
+    return items, errors
+
+
+def delete_items(
+    *, session: Session, ids: list[uuid.UUID], owner_id: uuid.UUID | None
+) -> tuple[list[uuid.UUID], list[BulkItemError]]:
+    statement = select(Item.id, Item.owner_id).where(col(Item.id).in_(set(ids)))
+    db_items = {row.id: row for row in session.exec(statement)}
+    allowed, errors = _check_items(db_items, ids, owner_id)
+    deleted = list(dict.fromkeys(ids[index] for index in allowed))
+    if deleted:
+        session.execute(delete(Item).where(col(Item.id).in_(deleted)))
+    session.commit()
+    return deleted, errors
+
+
+# Async versions for the async route stack (settings.USE_ASYNC_DB)
+
+
+async def create_user_async(*, session: AsyncSession, user_create: UserCreate) -> User:
+    hashed_password = await get_password_hash_async(user_create.password)
+    db_obj = User.model_validate(
+        user_create, update={"hashed_password": hashed_password}
+    )
+    session.add(db_obj)
+    await session.commit()
+    await session.refresh(db_obj)
+    return db_obj
+
+
+async def update_user_async(
+    *, session: AsyncSession, db_user: User, user_in: UserUpdate
+) -> Any:
+    user_data = user_in.model_dump(exclude_unset=True)
+    extra_data = {}
+    if "password" in user_data:
+        password = user_data["password"]
+        hashed_password = await get_password_hash_async(password)
+        extra_data["hashed_password"] = hashed_password
+    user_id = db_user.id
+    db_user.sqlmodel_update(user_data, update=extra_data)
+    session.add(db_user)
+    await session.commit()
+    user_cache.invalidate_user(user_id)
+    await session.refresh(db_user)
+    return db_user
+
+
+async def get_user_by_email_async(*, session: AsyncSession, email: str) -> User | None:
+    statement = select(User).where(User.email == email)
+    session_user = (await session.exec(statement)).first()
+    return session_user
+
+
+async def authenticate_async(
+    *, session: AsyncSession, email: str, password: str
+) -> User | None:
+    db_user = await get_user_by_email_async(session=session, email=email)
+    if not db_user:
+        return None
+    verified, new_hash = await verify_and_update_password_async(
+        password, db_user.hashed_password
+    )
+    if not verified:
+        return None
+    if new_hash:
+        db_user.hashed_password = new_hash
+        session.add(db_user)
+        await session.commit()
+        user_cache.invalidate_user(db_user.id)
+        await session.refresh(db_user)
+    return db_user
+
+
+async def create_item_async(
+    *, session: AsyncSession, item_in: ItemCreate, owner_id: uuid.UUID
+) -> Item:
+    db_item = Item.model_validate(item_in, update={"owner_id": owner_id})
+    session.add(db_item)
+    await session.commit()
+    await session.refresh(db_item)
+    return db_item
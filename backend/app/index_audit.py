@@ -0,0 +1,97 @@
+import logging
+import sys
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass
+
+from sqlalchemy import Engine, MetaData, inspect
+from sqlalchemy.engine.reflection import Inspector
+from sqlmodel import SQLModel
+
+from app.core.db import engine
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Columns that list endpoints filter on besides foreign keys, as "table.column"
+FILTERED_COLUMNS = ("user.email", "item.owner_id")
+
+
+@dataclass(frozen=True)
+class MissingIndex:
+    table: str
+    columns: tuple[str, ...]
+    reason: str
+
+    def __str__(self) -> str:
+        return f"{self.table}({', '.join(self.columns)}): {self.reason}"
+
+
+def _leading_columns(inspector: Inspector, table: str) -> list[tuple[str, ...]]:
+    """Column lists of every index on `table`, including PK and unique ones."""
+    indexed = [tuple(inspector.get_pk_constraint(table)["constrained_columns"])]
+    indexed += [
+        tuple(constraint["column_names"])
+        for constraint in inspector.get_unique_constraints(table)
+    ]
+    # Expression index entries are None and can't serve a plain column lookup
+    indexed += [
+        tuple(column or "" for column in index["column_names"])
+        for index in inspector.get_indexes(table)
+    ]
+    return indexed
+
+
+def _is_covered(columns: Sequence[str], indexed: list[tuple[str, ...]]) -> bool:
+    # An index serves lookups on the columns only if they are its leading ones
+    return any(set(index[: len(columns)]) == set(columns) for index in indexed)
+
+
+def audit_indexes(
+    db_engine: Engine = engine,
+    metadata: MetaData = SQLModel.metadata,
+    filtered_columns: Iterable[str] = FILTERED_COLUMNS,
+) -> list[MissingIndex]:
+    """
+    Check the live database for foreign keys and filtered columns of the
+    `metadata` tables that no index leads with.
+    """
+    inspector = inspect(db_engine)
+    filtered: dict[str, list[str]] = {}
+    for name in filtered_columns:
+        table, column = name.split(".")
+        filtered.setdefault(table, []).append(column)
+
+    missing: list[MissingIndex] = []
+    for table in metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        indexed = _leading_columns(inspector, table.name)
+        checks = [
+            (tuple(fk["constrained_columns"]), f"foreign key to {fk['referred_table']}")
+            for fk in inspector.get_foreign_keys(table.name)
+        ]
+        checks += [
+            ((column,), "filtered column") for column in filtered.get(table.name, [])
+        ]
+        seen: set[tuple[str, ...]] = set()
+        for columns, reason in checks:
+            if columns in seen:
+                continue
+            seen.add(columns)
+            if not _is_covered(columns, indexed):
+                missing.append(MissingIndex(table.name, columns, reason))
+    return missing
+
+
+def main() -> None:
+    logger.info("Auditing indexes")
+    missing = audit_indexes()
+    for entry in missing:
+        logger.warning(f"Missing index: {entry}")
+    if missing:
+        sys.exit(1)
+    logger.info("All foreign keys and filtered columns are indexed")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,7 @@ import logging
 from sqlmodel import Session
 
 from app.core.db import engine, init_db
+from app.core.revocation import purge_expired_revocations
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -11,6 +12,7 @@ logger = logging.getLogger(__name__)
 def init() -> None:
     with Session(engine) as session:
         init_db(session)
+        purge_expired_revocations(session)
 
 
 def main() -> None:
@@ -1,12 +1,21 @@
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
 import sentry_sdk
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.datastructures import Default
+from fastapi.responses import FileResponse, JSONResponse
 from fastapi.routing import APIRoute
-from fastapi.responses import FileResponse
-
 from starlette.middleware.cors import CORSMiddleware
 
 from app.api.main import api_router
+from app.api.responses import ORJSONResponse
+from app.core.compression import CompressionMiddleware
 from app.core.config import settings
+from app.core.outbox import email_outbox
+from app.core.security import PasswordHashingBusyError
+from app.utils import precompile_email_templates
 
 
 def custom_generate_unique_id(route: APIRoute) -> str:
@@ -18,8 +27,20 @@ def custom_generate_unique_id(route: APIRoute) -> str:
 if settings.SENTRY_DSN and settings.ENVIRONMENT != "local":
     sentry_sdk.init(dsn=str(settings.SENTRY_DSN), enable_tracing=True)
 
+@asynccontextmanager
+async def lifespan(_app: FastAPI) -> AsyncIterator[None]:
+    precompile_email_templates()
+    yield
+    # Deliver what is still queued before the process exits
+    await run_in_threadpool(email_outbox.stop)
+
+
 app = FastAPI(
     title=settings.PROJECT_NAME,
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
+    if settings.ORJSON_RESPONSES
+    else Default(JSONResponse),
     openapi_url=f"{settings.API_V1_STR}/openapi.json",
     generate_unique_id_function=custom_generate_unique_id,
 )
@@ -34,6 +55,27 @@ app.add_middleware(
     expose_headers=["Content-Type", "X-Total-Count"],
 )
 
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+        media_types=settings.COMPRESSION_MEDIA_TYPES,
+        gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+        brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
+    )
+
+
+@app.exception_handler(PasswordHashingBusyError)
+def password_hashing_busy_handler(
+    _request: Request, _exc: PasswordHashingBusyError
+) -> JSONResponse:
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Server is busy, please retry"},
+        headers={"Retry-After": "1"},
+    )
+
+
 # Add a root route
 @app.get("/")
 def read_root():
@@ -1,7 +1,12 @@
 import uuid
+from datetime import datetime
+from typing import Any
 
 from pydantic import EmailStr
-from sqlmodel import Field, Relationship, SQLModel
+from sqlalchemy import Column, DateTime, Index, event
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import Mapper, object_session
+from sqlmodel import Field, Relationship, SQLModel, func
 
 
 # Shared properties
@@ -43,6 +48,8 @@ class UpdatePassword(SQLModel):
 class User(UserBase, table=True):
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
     hashed_password: str
+    # Bumped on every update, see _bump_version; ETags are derived from it
+    version: int = Field(default=1, sa_column_kwargs={"server_default": "1"})
     items: list["Item"] = Relationship(back_populates="owner", cascade_delete=True)
 
 
@@ -53,7 +60,8 @@ class UserPublic(UserBase):
 
 class UsersPublic(SQLModel):
     data: list[UserPublic]
-    count: int
+    count: int | None
+    next_cursor: str | None = None
 
 
 # Shared properties
@@ -79,6 +87,38 @@ class Item(ItemBase, table=True):
         foreign_key="user.id", nullable=False, ondelete="CASCADE"
     )
     owner: User | None = Relationship(back_populates="items")
+    version: int = Field(default=1, sa_column_kwargs={"server_default": "1"})
+
+
+@event.listens_for(User, "before_update")
+@event.listens_for(Item, "before_update")
+def _bump_version(mapper: Mapper[Any], _connection: Any, target: Any) -> None:
+    # Objects can be flushed as dirty without any net column change
+    session = object_session(target)
+    if session is not None and session.is_modified(target, include_collections=False):
+        # Incremented by the UPDATE itself, so overlapping updates each count
+        # and a stale in-memory version, such as a cached user's, is never
+        # written back. The attribute is reloaded on next access
+        target.version = mapper.c.version + 1
+
+
+# Full-text search document of an item, set by Postgres on write through the
+# item_search_vector_update trigger (see migration 1523974583f0). It is a
+# table column but not a model field, so loading items never fetches it
+ITEM_SEARCH_CONFIG = "english"
+
+item_search_vector = Column("search_vector", TSVECTOR)
+Item.__table__.append_column(item_search_vector)  # type: ignore[attr-defined]
+# Serves owner filters, the user -> items cascade delete and the (owner_id, id)
+# keyset order of item listings
+Index("ix_item_owner_id_id", Item.owner_id, Item.id)
+Index("ix_item_search_vector", item_search_vector, postgresql_using="gin")
+# Serves case-insensitive title prefix filters (lower(title) LIKE 'abc%')
+Index(
+    "ix_item_title_lower_pattern",
+    func.lower(Item.__table__.c.title).label("title_lower"),  # type: ignore[attr-defined]
+    postgresql_ops={"title_lower": "text_pattern_ops"},
+)
 
 
 # Properties to return via API, id is always required
@@ -89,7 +129,46 @@ class ItemPublic(ItemBase):
 
 class ItemsPublic(SQLModel):
     data: list[ItemPublic]
-    count: int
+    count: int | None
+    next_cursor: str | None = None
+
+
+# Bulk item operations: rows that fail the existence or ownership check are
+# reported in `errors` and skipped, the rest are applied in one transaction
+ITEMS_BULK_MAX_SIZE = 1000
+
+
+class ItemsBulkCreate(SQLModel):
+    data: list[ItemCreate] = Field(min_length=1, max_length=ITEMS_BULK_MAX_SIZE)
+
+
+class ItemBulkUpdate(ItemUpdate):
+    id: uuid.UUID
+
+
+class ItemsBulkUpdate(SQLModel):
+    data: list[ItemBulkUpdate] = Field(min_length=1, max_length=ITEMS_BULK_MAX_SIZE)
+
+
+class ItemsBulkDelete(SQLModel):
+    ids: list[uuid.UUID] = Field(min_length=1, max_length=ITEMS_BULK_MAX_SIZE)
+
+
+class BulkItemError(SQLModel):
+    # Position of the row in the request
+    index: int
+    id: uuid.UUID
+    detail: str
+
+
+class ItemsBulkPublic(SQLModel):
+    data: list[ItemPublic]
+    errors: list[BulkItemError]
+
+
+class ItemsBulkDeleted(SQLModel):
+    ids: list[uuid.UUID]
+    errors: list[BulkItemError]
 
 
 # Generic message
@@ -108,6 +187,53 @@ class TokenPayload(SQLModel):
     sub: str | None = None
 
 
+# A revoked access token (jti), or every token of user_id issued before
+# revoked_at. Rows can be purged once expires_at has passed
+class TokenRevocation(SQLModel, table=True):
+    __tablename__ = "token_revocation"
+
+    id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
+    jti: str | None = Field(default=None, max_length=64)
+    user_id: uuid.UUID | None = None
+    revoked_at: datetime = Field(sa_type=DateTime(timezone=True), index=True)
+    expires_at: datetime = Field(sa_type=DateTime(timezone=True))
+
+
+class PasswordHashStats(SQLModel):
+    workers: int
+    max_queue: int
+    in_flight: int
+    queue_depth: int
+    peak_pending: int
+    completed: int
+    rejected: int
+    avg_wait_seconds: float
+    max_wait_seconds: float
+
+
+class DbPoolStats(SQLModel):
+    size: int
+    checked_out: int
+    checked_in: int
+    overflow: int
+    max_overflow: int
+    # Cumulative checkout counts per wait time upper bound (seconds)
+    wait_seconds_histogram: dict[str, int]
+    wait_seconds_sum: float
+    checkouts: int
+    timeouts: int
+
+
+class EmailOutboxStats(SQLModel):
+    workers: int
+    queued: int
+    retry_scheduled: int
+    sending: int
+    sent: int
+    retried: int
+    failed: int
+
+
 class NewPassword(SQLModel):
     token: str
     new_password: str = Field(min_length=8, max_length=40)
@@ -0,0 +1,119 @@
+import json
+import uuid
+from collections.abc import Generator
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+
+from app.api.routes import items_async, login_async, users_async
+from app.core.config import settings
+from app.core.db import async_engine
+from app.tests.utils.item import create_random_item
+from app.tests.utils.utils import random_lower_string
+
+
+@pytest.fixture(scope="module")
+def async_client() -> Generator[TestClient, None, None]:
+    app = FastAPI()
+    for module in (login_async, users_async, items_async):
+        app.include_router(module.router, prefix=settings.API_V1_STR)
+    with TestClient(app) as c:
+        yield c
+        # Pooled psycopg async connections belong to the client's event loop
+        c.portal.call(async_engine.dispose)
+
+
+def test_login_async(async_client: TestClient) -> None:
+    r = async_client.post(
+        f"{settings.API_V1_STR}/login/access-token",
+        data={"username": settings.FIRST_SUPERUSER, "password": "wrong-password"},
+    )
+    assert r.status_code == 400
+
+    r = async_client.post(
+        f"{settings.API_V1_STR}/login/access-token",
+        data={
+            "username": settings.FIRST_SUPERUSER,
+            "password": settings.FIRST_SUPERUSER_PASSWORD,
+        },
+    )
+    assert r.status_code == 200
+    assert r.json()["access_token"]
+
+
+def test_read_user_me_async(
+    async_client: TestClient, superuser_token_headers: dict[str, str]
+) -> None:
+    r = async_client.get(
+        f"{settings.API_V1_STR}/users/me", headers=superuser_token_headers
+    )
+    assert r.status_code == 200
+    assert r.json()["email"] == settings.FIRST_SUPERUSER
+
+
+def test_create_and_read_item_async(
+    async_client: TestClient, superuser_token_headers: dict[str, str]
+) -> None:
+    title = random_lower_string()
+    r = async_client.post(
+        f"{settings.API_V1_STR}/items/",
+        headers=superuser_token_headers,
+        json={"title": title},
+    )
+    assert r.status_code == 200
+    item_id = r.json()["id"]
+    r = async_client.get(
+        f"{settings.API_V1_STR}/items/{item_id}", headers=superuser_token_headers
+    )
+    assert r.status_code == 200
+    assert r.json()["title"] == title
+    r = async_client.get(
+        f"{settings.API_V1_STR}/items/{uuid.uuid4()}",
+        headers=superuser_token_headers,
+    )
+    assert r.status_code == 404
+
+
+def test_read_items_async(
+    async_client: TestClient,
+    superuser_token_headers: dict[str, str],
+    committed_db: Session,
+) -> None:
+    create_random_item(committed_db)
+    r = async_client.get(
+        f"{settings.API_V1_STR}/items/", headers=superuser_token_headers
+    )
+    assert r.status_code == 200
+    content = r.json()
+    assert content["count"] >= 1
+    assert len(content["data"]) >= 1
+
+
+@pytest.mark.parametrize("path", ["/items/", "/users/"])
+@pytest.mark.parametrize("params", [{"cursor": "", "limit": 0}, {"limit": -1}])
+def test_read_list_rejects_invalid_page_async(
+    async_client: TestClient,
+    superuser_token_headers: dict[str, str],
+    path: str,
+    params: dict,
+) -> None:
+    r = async_client.get(
+        f"{settings.API_V1_STR}{path}", headers=superuser_token_headers, params=params
+    )
+    assert r.status_code == 422
+
+
+def test_export_items_async(
+    async_client: TestClient,
+    superuser_token_headers: dict[str, str],
+    committed_db: Session,
+) -> None:
+    item = create_random_item(committed_db)
+    r = async_client.get(
+        f"{settings.API_V1_STR}/items/export", headers=superuser_token_headers
+    )
+    assert r.status_code == 200
+    ids = {json.loads(line)["id"] for line in r.text.splitlines()}
+    assert str(item.id) in ids
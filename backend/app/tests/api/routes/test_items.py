@@ -1,9 +1,15 @@
+import csv
+import io
+import json
 import uuid
 
+import pytest
 from fastapi.testclient import TestClient
 from sqlmodel import Session
 
+from app.api.pagination import MAX_PAGE_SIZE
 from app.core.config import settings
+from app.models import Item
 from app.tests.utils.item import create_random_item
 
 
@@ -79,6 +85,97 @@ def test_read_items(
     assert len(content["data"]) >= 2
 
 
+def test_read_items_cursor_pagination(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    for _ in range(3):
+        create_random_item(db)
+    seen: list[str] = []
+    cursor = ""
+    while True:
+        response = client.get(
+            f"{settings.API_V1_STR}/items/",
+            headers=superuser_token_headers,
+            params={"cursor": cursor, "limit": 2},
+        )
+        assert response.status_code == 200
+        content = response.json()
+        assert len(content["data"]) <= 2
+        seen.extend(item["id"] for item in content["data"])
+        if content["next_cursor"] is None:
+            break
+        cursor = content["next_cursor"]
+    assert len(seen) == len(set(seen)) == content["count"]
+
+
+@pytest.mark.parametrize(
+    "params",
+    [
+        {"limit": 0},
+        {"limit": -1},
+        {"limit": MAX_PAGE_SIZE + 1},
+        {"skip": -1},
+        {"cursor": "", "limit": 0},
+        {"cursor": "", "limit": -1},
+    ],
+)
+def test_read_items_rejects_invalid_page(
+    client: TestClient, superuser_token_headers: dict[str, str], params: dict
+) -> None:
+    response = client.get(
+        f"{settings.API_V1_STR}/items/", headers=superuser_token_headers, params=params
+    )
+    assert response.status_code == 422
+
+
+def test_read_items_count_modes(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    create_random_item(db)
+    exact = client.get(
+        f"{settings.API_V1_STR}/items/",
+        headers=superuser_token_headers,
+        params={"count_mode": "exact", "limit": 1},
+    ).json()
+    assert exact["count"] >= 1
+    assert len(exact["data"]) == 1
+
+    past_end = client.get(
+        f"{settings.API_V1_STR}/items/",
+        headers=superuser_token_headers,
+        params={"skip": exact["count"], "limit": 1},
+    ).json()
+    assert past_end["data"] == []
+    assert past_end["count"] == exact["count"]
+
+    no_count = client.get(
+        f"{settings.API_V1_STR}/items/",
+        headers=superuser_token_headers,
+        params={"count_mode": "none"},
+    ).json()
+    assert no_count["count"] is None
+
+    estimate = client.get(
+        f"{settings.API_V1_STR}/items/",
+        headers=superuser_token_headers,
+        params={"count_mode": "estimate"},
+    )
+    assert estimate.status_code == 200
+    assert isinstance(estimate.json()["count"], int)
+
+
+def test_read_items_invalid_cursor(
+    client: TestClient, superuser_token_headers: dict[str, str]
+) -> None:
+    response = client.get(
+        f"{settings.API_V1_STR}/items/",
+        headers=superuser_token_headers,
+        params={"cursor": "not-a-cursor"},
+    )
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid cursor"
+
+
 def test_update_item(
     client: TestClient, superuser_token_headers: dict[str, str], db: Session
 ) -> None:
@@ -162,3 +259,268 @@ def test_delete_item_not_enough_permissions(
     assert response.status_code == 400
     content = response.json()
     assert content["detail"] == "Not enough permissions"
+
+
+def test_create_items_bulk(
+    client: TestClient, normal_user_token_headers: dict[str, str], db: Session
+) -> None:
+    data = [{"title": f"Bulk {i}", "description": str(i)} for i in range(5)]
+    response = client.post(
+        f"{settings.API_V1_STR}/items/bulk",
+        headers=normal_user_token_headers,
+        json={"data": data},
+    )
+    assert response.status_code == 200
+    content = response.json()
+    assert content["errors"] == []
+    assert [item["title"] for item in content["data"]] == [d["title"] for d in data]
+    for item in content["data"]:
+        db_item = db.get(Item, uuid.UUID(item["id"]))
+        assert db_item
+        assert db_item.description == item["description"]
+
+
+def test_create_items_bulk_empty(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    response = client.post(
+        f"{settings.API_V1_STR}/items/bulk",
+        headers=normal_user_token_headers,
+        json={"data": []},
+    )
+    assert response.status_code == 422
+
+
+def test_update_items_bulk(
+    client: TestClient, normal_user_token_headers: dict[str, str], db: Session
+) -> None:
+    r = client.post(
+        f"{settings.API_V1_STR}/items/bulk",
+        headers=normal_user_token_headers,
+        json={"data": [{"title": "Mine 1"}, {"title": "Mine 2"}]},
+    )
+    own = r.json()["data"]
+    other = create_random_item(db)
+    missing = uuid.uuid4()
+    data = [
+        {"id": own[0]["id"], "title": "Updated 1"},
+        {"id": str(other.id), "title": "Not mine"},
+        {"id": own[1]["id"], "description": "Updated 2"},
+        {"id": str(missing), "title": "Missing"},
+    ]
+    response = client.patch(
+        f"{settings.API_V1_STR}/items/bulk",
+        headers=normal_user_token_headers,
+        json={"data": data},
+    )
+    assert response.status_code == 200
+    content = response.json()
+    assert [(item["title"], item["description"]) for item in content["data"]] == [
+        ("Updated 1", None),
+        ("Mine 2", "Updated 2"),
+    ]
+    assert content["errors"] == [
+        {"index": 1, "id": str(other.id), "detail": "Not enough permissions"},
+        {"index": 3, "id": str(missing), "detail": "Item not found"},
+    ]
+    db.refresh(other)
+    assert other.title != "Not mine"
+
+
+def test_delete_items_bulk(
+    client: TestClient, normal_user_token_headers: dict[str, str], db: Session
+) -> None:
+    r = client.post(
+        f"{settings.API_V1_STR}/items/bulk",
+        headers=normal_user_token_headers,
+        json={"data": [{"title": "Delete 1"}, {"title": "Delete 2"}]},
+    )
+    own_ids = [item["id"] for item in r.json()["data"]]
+    other = create_random_item(db)
+    response = client.request(
+        "DELETE",
+        f"{settings.API_V1_STR}/items/bulk",
+        headers=normal_user_token_headers,
+        json={"ids": [own_ids[0], str(other.id), own_ids[1]]},
+    )
+    assert response.status_code == 200
+    content = response.json()
+    assert content["ids"] == own_ids
+    assert content["errors"] == [
+        {"index": 1, "id": str(other.id), "detail": "Not enough permissions"}
+    ]
+    assert db.get(Item, uuid.UUID(own_ids[0])) is None
+    assert db.get(Item, other.id) is not None
+
+
+def test_export_items_ndjson(
+    client: TestClient, normal_user_token_headers: dict[str, str], db: Session
+) -> None:
+    r = client.post(
+        f"{settings.API_V1_STR}/items/bulk",
+        headers=normal_user_token_headers,
+        json={"data": [{"title": "Export 1"}, {"title": "Export 2"}]},
+    )
+    own = r.json()["data"]
+    other = create_random_item(db)
+    response = client.get(
+        f"{settings.API_V1_STR}/items/export", headers=normal_user_token_headers
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    ids = {row["id"] for row in rows}
+    assert {item["id"] for item in own} <= ids
+    assert str(other.id) not in ids
+    assert {row["owner_id"] for row in rows} == {own[0]["owner_id"]}
+
+
+def test_export_items_csv(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    item = create_random_item(db)
+    response = client.get(
+        f"{settings.API_V1_STR}/items/export",
+        headers=superuser_token_headers,
+        params={"format": "csv"},
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    assert 'filename="item.csv"' in response.headers["content-disposition"]
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert list(rows[0]) == ["title", "description", "id", "owner_id"]
+    assert {
+        "title": item.title,
+        "description": item.description,
+        "id": str(item.id),
+        "owner_id": str(item.owner_id),
+    } in rows
+
+
+def test_read_items_filter_and_sort(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    prefix = f"Zq{uuid.uuid4().hex[:8]}"
+    data = [
+        {"title": f"{prefix} banana", "description": "yellow fruit"},
+        {"title": f"{prefix} apple", "description": "red fruits and more fruits"},
+        {"title": f"{prefix}cherry", "description": "small stone fruit"},
+        {"title": f"Other {prefix}", "description": "not a match"},
+    ]
+    client.post(
+        f"{settings.API_V1_STR}/items/bulk",
+        headers=normal_user_token_headers,
+        json={"data": data},
+    )
+    response = client.get(
+        f"{settings.API_V1_STR}/items/",
+        headers=normal_user_token_headers,
+        params={"title_prefix": prefix.lower(), "sort": "-title"},
+    )
+    assert response.status_code == 200
+    content = response.json()
+    assert [item["title"] for item in content["data"]] == [
+        f"{prefix}cherry",
+        f"{prefix} banana",
+        f"{prefix} apple",
+    ]
+    assert content["count"] == 3
+
+    # Stemming matches "fruits" and "fruit"; rank puts the most mentions first
+    response = client.get(
+        f"{settings.API_V1_STR}/items/",
+        headers=normal_user_token_headers,
+        params={"title_prefix": prefix, "q": "fruits", "sort": "rank"},
+    )
+    titles = [item["title"] for item in response.json()["data"]]
+    assert titles[0] == f"{prefix} apple"
+    assert len(titles) == 3
+
+    response = client.get(
+        f"{settings.API_V1_STR}/items/",
+        headers=normal_user_token_headers,
+        params={"title_prefix": prefix, "q": "fruits -stone", "sort": "title"},
+    )
+    titles = [item["title"] for item in response.json()["data"]]
+    assert titles == [f"{prefix} apple", f"{prefix} banana"]
+
+
+def test_read_items_sort_errors(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    response = client.get(
+        f"{settings.API_V1_STR}/items/",
+        headers=normal_user_token_headers,
+        params={"sort": "rank"},
+    )
+    assert response.status_code == 400
+    response = client.get(
+        f"{settings.API_V1_STR}/items/",
+        headers=normal_user_token_headers,
+        params={"sort": "title", "cursor": ""},
+    )
+    assert response.status_code == 400
+
+
+def test_read_item_etag(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    item = create_random_item(db)
+    url = f"{settings.API_V1_STR}/items/{item.id}"
+    response = client.get(url, headers=superuser_token_headers)
+    etag = response.headers["etag"]
+    assert etag.startswith('W/"')
+    response = client.get(
+        url, headers={**superuser_token_headers, "If-None-Match": etag}
+    )
+    assert response.status_code == 304
+    assert response.content == b""
+
+    response = client.put(
+        url,
+        headers={**superuser_token_headers, "If-Match": etag},
+        json={"title": "Changed"},
+    )
+    assert response.status_code == 200
+    new_etag = response.headers["etag"]
+    assert new_etag != etag
+    response = client.get(
+        url, headers={**superuser_token_headers, "If-None-Match": etag}
+    )
+    assert response.status_code == 200
+    assert response.headers["etag"] == new_etag
+
+
+def test_update_item_if_match_stale(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    item = create_random_item(db)
+    url = f"{settings.API_V1_STR}/items/{item.id}"
+    etag = client.get(url, headers=superuser_token_headers).headers["etag"]
+    client.put(url, headers=superuser_token_headers, json={"title": "First"})
+    response = client.put(
+        url,
+        headers={**superuser_token_headers, "If-Match": etag},
+        json={"title": "Second"},
+    )
+    assert response.status_code == 412
+    db.refresh(item)
+    assert item.title == "First"
+    assert item.version == 2
+
+
+def test_read_items_etag(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    url = f"{settings.API_V1_STR}/items/"
+    etag = client.get(url, headers=normal_user_token_headers).headers["etag"]
+    response = client.get(
+        url, headers={**normal_user_token_headers, "If-None-Match": etag}
+    )
+    assert response.status_code == 304
+    client.post(url, headers=normal_user_token_headers, json={"title": "New"})
+    response = client.get(
+        url, headers={**normal_user_token_headers, "If-None-Match": etag}
+    )
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
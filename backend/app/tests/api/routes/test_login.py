@@ -4,10 +4,15 @@ from fastapi.testclient import TestClient
 from sqlmodel import Session
 
 from app.core.config import settings
-from app.core.security import verify_password
+from app.core.security import (
+    PasswordHashingBusyError,
+    password_hash_pool,
+    pwd_context,
+    verify_password,
+)
 from app.crud import create_user
 from app.models import UserCreate
-from app.tests.utils.user import user_authentication_headers
+from app.tests.utils.user import token_headers, user_authentication_headers
 from app.tests.utils.utils import random_email, random_lower_string
 from app.utils import generate_password_reset_token
 
@@ -33,6 +38,66 @@ def test_get_access_token_incorrect_password(client: TestClient) -> None:
     assert r.status_code == 400
 
 
+def test_get_access_token_hashing_busy(client: TestClient) -> None:
+    login_data = {
+        "username": settings.FIRST_SUPERUSER,
+        "password": settings.FIRST_SUPERUSER_PASSWORD,
+    }
+    with patch(
+        "app.core.security.password_hash_pool.submit",
+        side_effect=PasswordHashingBusyError("full"),
+    ):
+        r = client.post(f"{settings.API_V1_STR}/login/access-token", data=login_data)
+    assert r.status_code == 503
+    assert r.headers["Retry-After"] == "1"
+
+
+def test_password_routes_await_hash_pool(client: TestClient) -> None:
+    """
+    Hashing routes await the pool instead of blocking a threadpool thread on
+    it, and only the hash itself runs there, not the queries around it.
+    """
+    email = random_email()
+    password = random_lower_string()
+    new_password = random_lower_string()
+    hash_functions = {
+        pwd_context.hash,
+        pwd_context.verify,
+        pwd_context.verify_and_update,
+    }
+    with (
+        patch.object(password_hash_pool, "run", side_effect=AssertionError),
+        patch.object(
+            password_hash_pool, "submit", wraps=password_hash_pool.submit
+        ) as submit,
+    ):
+        r = client.post(
+            f"{settings.API_V1_STR}/users/signup",
+            json={"email": email, "password": password},
+        )
+        assert r.status_code == 200
+        headers = user_authentication_headers(
+            client=client, email=email, password=password
+        )
+        r = client.patch(
+            f"{settings.API_V1_STR}/users/me/password",
+            headers=headers,
+            json={"current_password": password, "new_password": new_password},
+        )
+        assert r.status_code == 200
+        r = client.post(
+            f"{settings.API_V1_STR}/reset-password/",
+            json={
+                "new_password": password,
+                "token": generate_password_reset_token(email),
+            },
+        )
+        assert r.status_code == 200
+    submitted = [call.args[0] for call in submit.call_args_list]
+    assert len(submitted) == 5
+    assert set(submitted) <= hash_functions
+
+
 def test_use_access_token(
     client: TestClient, superuser_token_headers: dict[str, str]
 ) -> None:
@@ -58,7 +123,9 @@ def test_recovery_password(
         patch("app.core.config.settings.EMAILS_FROM_EMAIL", "test@example.com"),
         patch("app.core.config.settings.EMAILS_ENABLED", True),
         patch("app.core.config.settings.EMAILS_FROM_NAME", "Test"),
-        patch("app.core.config.settings.EMAILS_TEMPLATES_DIR", "app/email-templates/build"),
+        patch(
+            "app.core.config.settings.EMAILS_TEMPLATES_DIR", "app/email-templates/build"
+        ),
         patch("app.utils.send_email", return_value=None),
     ):
         email = "test@example.com"
@@ -125,3 +192,22 @@ def test_reset_password_invalid_token(
     assert "detail" in response
     assert r.status_code == 400
     assert response["detail"] == "Invalid token"
+
+
+def test_logout_revokes_token(client: TestClient, db: Session) -> None:
+    user = create_user(
+        session=db,
+        user_create=UserCreate(email=random_email(), password=random_lower_string()),
+    )
+    headers = token_headers(user.id)
+    r = client.post(f"{settings.API_V1_STR}/logout", headers=headers)
+    assert r.status_code == 200
+    assert r.json() == {"message": "Logged out"}
+
+    r = client.post(f"{settings.API_V1_STR}/login/test-token", headers=headers)
+    assert r.status_code == 403
+    # Other tokens of the user stay valid
+    r = client.post(
+        f"{settings.API_V1_STR}/login/test-token", headers=token_headers(user.id)
+    )
+    assert r.status_code == 200
@@ -1,13 +1,17 @@
+import json
 import uuid
 from unittest.mock import patch
 
+import pytest
 from fastapi.testclient import TestClient
 from sqlmodel import Session, select
 
 from app import crud
+from app.api.pagination import MAX_PAGE_SIZE
 from app.core.config import settings
 from app.core.security import verify_password
 from app.models import User, UserCreate
+from app.tests.utils.user import token_headers
 from app.tests.utils.utils import random_email, random_lower_string
 
 
@@ -168,6 +172,50 @@ def test_retrieve_users(
         assert "email" in item
 
 
+def test_retrieve_users_cursor_pagination(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    for _ in range(2):
+        user_in = UserCreate(email=random_email(), password=random_lower_string())
+        crud.create_user(session=db, user_create=user_in)
+
+    seen: list[str] = []
+    cursor = ""
+    while True:
+        r = client.get(
+            f"{settings.API_V1_STR}/users/",
+            headers=superuser_token_headers,
+            params={"cursor": cursor, "limit": 1},
+        )
+        assert r.status_code == 200
+        page = r.json()
+        seen.extend(user["id"] for user in page["data"])
+        if page["next_cursor"] is None:
+            break
+        cursor = page["next_cursor"]
+    assert len(seen) == len(set(seen)) == page["count"]
+
+
+@pytest.mark.parametrize(
+    "params",
+    [
+        {"limit": 0},
+        {"limit": -1},
+        {"limit": MAX_PAGE_SIZE + 1},
+        {"skip": -1},
+        {"cursor": "", "limit": 0},
+        {"cursor": "", "limit": -1},
+    ],
+)
+def test_retrieve_users_rejects_invalid_page(
+    client: TestClient, superuser_token_headers: dict[str, str], params: dict
+) -> None:
+    r = client.get(
+        f"{settings.API_V1_STR}/users/", headers=superuser_token_headers, params=params
+    )
+    assert r.status_code == 422
+
+
 def test_update_user_me(
     client: TestClient, normal_user_token_headers: dict[str, str], db: Session
 ) -> None:
@@ -214,6 +262,10 @@ def test_update_password_me(
     assert user_db.email == settings.FIRST_SUPERUSER
     assert verify_password(new_password, user_db.hashed_password)
 
+    # Changing the password revokes the tokens issued before it
+    r = client.get(f"{settings.API_V1_STR}/users/me", headers=superuser_token_headers)
+    assert r.status_code == 403
+
     # Revert to the old password to keep consistency in test
     old_data = {
         "current_password": new_password,
@@ -221,7 +273,7 @@ def test_update_password_me(
     }
     r = client.patch(
         f"{settings.API_V1_STR}/users/me/password",
-        headers=superuser_token_headers,
+        headers=token_headers(user_db.id),
         json=old_data,
     )
     db.refresh(user_db)
@@ -382,6 +434,33 @@ def test_update_user_email_exists(
     assert r.json()["detail"] == "User with this email already exists"
 
 
+def test_deactivated_user_rejected_immediately(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    username = random_email()
+    password = random_lower_string()
+    user_in = UserCreate(email=username, password=password)
+    user = crud.create_user(session=db, user_create=user_in)
+    login_data = {"username": username, "password": password}
+    r = client.post(f"{settings.API_V1_STR}/login/access-token", data=login_data)
+    headers = {"Authorization": f"Bearer {r.json()['access_token']}"}
+
+    # Warm the authenticated-user cache
+    r = client.get(f"{settings.API_V1_STR}/users/me", headers=headers)
+    assert r.status_code == 200
+
+    r = client.patch(
+        f"{settings.API_V1_STR}/users/{user.id}",
+        headers=superuser_token_headers,
+        json={"is_active": False},
+    )
+    assert r.status_code == 200
+
+    r = client.get(f"{settings.API_V1_STR}/users/me", headers=headers)
+    assert r.status_code == 400
+    assert r.json()["detail"] == "Inactive user"
+
+
 def test_delete_user_me(client: TestClient, db: Session) -> None:
     username = random_email()
     password = random_lower_string()
@@ -484,3 +563,68 @@ def test_delete_user_without_privileges(
     )
     assert r.status_code == 403
     assert r.json()["detail"] == "The user doesn't have enough privileges"
+
+
+def test_export_users(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    user = crud.create_user(
+        session=db,
+        user_create=UserCreate(email=random_email(), password=random_lower_string()),
+    )
+    r = client.get(
+        f"{settings.API_V1_STR}/users/export", headers=superuser_token_headers
+    )
+    assert r.status_code == 200
+    rows = [json.loads(line) for line in r.text.splitlines()]
+    exported = {row["id"]: row for row in rows}
+    assert exported[str(user.id)]["email"] == user.email
+    assert "hashed_password" not in exported[str(user.id)]
+    assert [row["id"] for row in rows] == sorted(exported, key=uuid.UUID)
+
+
+def test_export_users_normal_user(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    r = client.get(
+        f"{settings.API_V1_STR}/users/export", headers=normal_user_token_headers
+    )
+    assert r.status_code == 403
+
+
+def test_read_user_me_etag(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    url = f"{settings.API_V1_STR}/users/me"
+    etag = client.get(url, headers=normal_user_token_headers).headers["etag"]
+    r = client.get(url, headers={**normal_user_token_headers, "If-None-Match": etag})
+    assert r.status_code == 304
+
+
+def test_update_user_if_match(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    user = crud.create_user(
+        session=db,
+        user_create=UserCreate(email=random_email(), password=random_lower_string()),
+    )
+    url = f"{settings.API_V1_STR}/users/{user.id}"
+    r = client.get(url, headers=superuser_token_headers)
+    etag = r.headers["etag"]
+    assert client.get(
+        url, headers={**superuser_token_headers, "If-None-Match": etag}
+    ).status_code == 304
+    r = client.patch(
+        url,
+        headers={**superuser_token_headers, "If-Match": etag},
+        json={"full_name": "Updated"},
+    )
+    assert r.status_code == 200
+    r = client.patch(
+        url,
+        headers={**superuser_token_headers, "If-Match": etag},
+        json={"full_name": "Stale"},
+    )
+    assert r.status_code == 412
+    db.refresh(user)
+    assert user.full_name == "Updated"
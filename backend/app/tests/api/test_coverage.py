@@ -4,7 +4,6 @@ from sqlmodel import Session
 
 from app.main import app
 from app.tests.utils.user import create_random_user
-from app.tests.utils.utils import get_superuser_token_headers
 
 
 @pytest.fixture(scope="module")
@@ -0,0 +1,26 @@
+import json
+import uuid
+from datetime import datetime, timezone
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.api.responses import ORJSONResponse
+from app.models import ItemPublic, ItemsPublic
+
+
+def test_orjson_response_matches_json_response() -> None:
+    """ORJSONResponse decodes to the same document as the default response."""
+    page = ItemsPublic(
+        data=[ItemPublic(id=uuid.uuid4(), owner_id=uuid.uuid4(), title="Foo")],
+        count=1,
+    )
+    content = {
+        "page": page,
+        "created": datetime(2026, 1, 1, tzinfo=timezone.utc),
+        1: "non-string key",
+    }
+    response = ORJSONResponse(content)
+    expected = JSONResponse(jsonable_encoder(content))
+    assert response.headers["content-type"] == "application/json"
+    assert json.loads(response.body) == json.loads(expected.body)
@@ -1,19 +1,64 @@
-from collections.abc import Generator
+import os
+import uuid
+from collections.abc import Callable, Generator
+from functools import cache
+from unittest.mock import patch
 
 import pytest
 from fastapi.testclient import TestClient
 from sqlmodel import Session, delete
 
+from app import crud
+from app.api.deps import get_db
 from app.core.config import settings
 from app.core.db import engine, init_db
+from app.core.revocation import revocation_store
+from app.core.security import password_context_options, pwd_context
+from app.core.user_cache import user_cache
 from app.main import app
 from app.models import Item, User
-from app.tests.utils.user import authentication_token_from_email
-from app.tests.utils.utils import get_superuser_token_headers
+from app.tests.utils.database import worker_database
+from app.tests.utils.user import authentication_token_from_email, token_headers
+
+# bcrypt's lowest cost factor, for hashes made by the tests
+TEST_BCRYPT_ROUNDS = 4
+
+
+@pytest.fixture(scope="session", autouse=True)
+def database() -> Generator[None, None, None]:
+    """
+    Under pytest-xdist each worker runs against its own copy of the migrated
+    test database, dropped when the worker is done.
+    """
+    worker = os.environ.get("PYTEST_XDIST_WORKER")
+    if worker is None:
+        yield
+        return
+    with worker_database(worker):
+        yield
 
 
 @pytest.fixture(scope="session", autouse=True)
-def db() -> Generator[Session, None, None]:
+def fast_password_hashing() -> Generator[None, None, None]:
+    """
+    Hash at the lowest bcrypt cost during the run. Verifying uses the cost
+    stored in the hash, so this also speeds up logins of the test users.
+    """
+    with patch.object(settings, "BCRYPT_ROUNDS", TEST_BCRYPT_ROUNDS):
+        pwd_context.load(password_context_options())
+        yield
+    pwd_context.load(password_context_options())
+
+
+@pytest.fixture(scope="session")
+def committed_db(
+    database: None,  # noqa: ARG001
+    fast_password_hashing: None,  # noqa: ARG001
+) -> Generator[Session, None, None]:
+    """
+    Session whose commits are kept for the rest of the run, for data that
+    code on other connections must see, like the async routes.
+    """
     with Session(engine) as session:
         init_db(session)
         yield session
@@ -24,19 +69,57 @@ def db() -> Generator[Session, None, None]:
         session.commit()
 
 
+@pytest.fixture(autouse=True)
+def db(committed_db: Session) -> Generator[Session, None, None]:  # noqa: ARG001
+    """
+    Session in a transaction that is rolled back after the test.
+
+    Requests made during the test use sessions on the same connection, so
+    they see the test's data and their commits only release a SAVEPOINT.
+    """
+    connection = engine.connect()
+    transaction = connection.begin()
+
+    def get_test_db() -> Generator[Session, None, None]:
+        with Session(connection, join_transaction_mode="create_savepoint") as session:
+            yield session
+
+    app.dependency_overrides[get_db] = get_test_db
+    with Session(connection, join_transaction_mode="create_savepoint") as session:
+        yield session
+    app.dependency_overrides.pop(get_db)
+    # Cached users and revocations may hold values that are being rolled back
+    user_cache.clear()
+    revocation_store.clear()
+    transaction.rollback()
+    connection.close()
+
+
 @pytest.fixture(scope="module")
 def client() -> Generator[TestClient, None, None]:
     with TestClient(app) as c:
         yield c
 
 
-@pytest.fixture(scope="module")
-def superuser_token_headers(client: TestClient) -> dict[str, str]:
-    return get_superuser_token_headers(client)
+@pytest.fixture(scope="session")
+def token_factory() -> Callable[[uuid.UUID], dict[str, str]]:
+    """Auth headers per user id, minted once instead of logging in."""
+    return cache(token_headers)
 
 
-@pytest.fixture(scope="module")
-def normal_user_token_headers(client: TestClient, db: Session) -> dict[str, str]:
+@pytest.fixture(scope="session")
+def superuser_token_headers(
+    committed_db: Session, token_factory: Callable[[uuid.UUID], dict[str, str]]
+) -> dict[str, str]:
+    user = crud.get_user_by_email(session=committed_db, email=settings.FIRST_SUPERUSER)
+    assert user is not None
+    return token_factory(user.id)
+
+
+@pytest.fixture(scope="session")
+def normal_user_token_headers(
+    committed_db: Session, token_factory: Callable[[uuid.UUID], dict[str, str]]
+) -> dict[str, str]:
     return authentication_token_from_email(
-        client=client, email=settings.EMAIL_TEST_USER, db=db
+        email=settings.EMAIL_TEST_USER, db=committed_db, token_factory=token_factory
     )
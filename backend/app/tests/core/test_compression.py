@@ -0,0 +1,116 @@
+from collections.abc import Iterator
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.core.compression import (
+    THREAD_MINIMUM_SIZE,
+    CompressionMiddleware,
+    negotiate_encoding,
+)
+from app.core.config import settings
+from app.main import app as main_app
+
+BODY = "x" * 2000
+
+
+@pytest.fixture(scope="module")
+def client() -> Iterator[TestClient]:
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=1000)
+
+    @app.get("/text")
+    def text(size: int = len(BODY)) -> PlainTextResponse:
+        return PlainTextResponse("x" * size)
+
+    @app.get("/image")
+    def image() -> Response:
+        return Response(BODY.encode(), media_type="image/png")
+
+    @app.get("/encoded")
+    def encoded() -> PlainTextResponse:
+        return PlainTextResponse(BODY, headers={"Content-Encoding": "identity"})
+
+    @app.get("/stream")
+    def stream() -> StreamingResponse:
+        return StreamingResponse(
+            (f"{n}\n" for n in range(3)), media_type="application/x-ndjson"
+        )
+
+    with TestClient(app) as c:
+        yield c
+
+
+@pytest.mark.parametrize(
+    "accept_encoding, expected",
+    [
+        ("gzip, deflate, br", "br"),
+        ("gzip", "gzip"),
+        ("br;q=0.5, gzip", "gzip"),
+        ("br;q=0, gzip;q=0", None),
+        ("*", "br"),
+        ("identity", None),
+        ("", None),
+    ],
+)
+def test_negotiate_encoding(accept_encoding: str, expected: str | None) -> None:
+    assert negotiate_encoding(accept_encoding) == expected
+
+
+@pytest.mark.parametrize("encoding", ["br", "gzip"])
+def test_compresses_large_response(client: TestClient, encoding: str) -> None:
+    r = client.get("/text", headers={"Accept-Encoding": encoding})
+    assert r.headers["content-encoding"] == encoding
+    assert int(r.headers["content-length"]) < len(BODY)
+    assert r.headers["vary"] == "Accept-Encoding"
+    assert r.text == BODY
+
+
+def test_skips_small_response(client: TestClient) -> None:
+    r = client.get("/text", params={"size": 10}, headers={"Accept-Encoding": "br"})
+    assert "content-encoding" not in r.headers
+    assert r.text == "x" * 10
+
+
+def test_skips_unlisted_media_type(client: TestClient) -> None:
+    r = client.get("/image", headers={"Accept-Encoding": "br"})
+    assert "content-encoding" not in r.headers
+    assert r.content == BODY.encode()
+
+
+def test_skips_encoded_response(client: TestClient) -> None:
+    r = client.get("/encoded", headers={"Accept-Encoding": "br"})
+    assert r.headers["content-encoding"] == "identity"
+    assert r.text == BODY
+
+
+def test_varies_without_accepted_encoding(client: TestClient) -> None:
+    r = client.get("/text", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in r.headers
+    assert r.headers["vary"] == "Accept-Encoding"
+    assert r.text == BODY
+
+
+def test_compresses_large_body_in_thread(client: TestClient) -> None:
+    size = THREAD_MINIMUM_SIZE + 1
+    r = client.get("/text", params={"size": size}, headers={"Accept-Encoding": "br"})
+    assert r.headers["content-encoding"] == "br"
+    assert r.text == "x" * size
+
+
+@pytest.mark.parametrize("encoding", ["br", "gzip"])
+def test_compresses_streamed_response(client: TestClient, encoding: str) -> None:
+    r = client.get("/stream", headers={"Accept-Encoding": encoding})
+    assert r.headers["content-encoding"] == encoding
+    assert "content-length" not in r.headers
+    assert r.text == "0\n1\n2\n"
+
+
+def test_app_compresses_openapi() -> None:
+    r = TestClient(main_app).get(
+        f"{settings.API_V1_STR}/openapi.json", headers={"Accept-Encoding": "br"}
+    )
+    assert r.headers["content-encoding"] == "br"
+    assert r.json()["info"]["title"] == settings.PROJECT_NAME
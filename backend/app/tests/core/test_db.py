@@ -0,0 +1,35 @@
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.core.db import PoolMetrics, get_pool_stats
+
+
+def test_pool_metrics_histogram():
+    """Waits are counted in cumulative buckets, timeouts separately."""
+    metrics = PoolMetrics(buckets=(0.01, 0.1))
+    metrics.observe(0.005)
+    metrics.observe(0.05)
+    metrics.observe(5.0, timed_out=True)
+    snapshot = metrics.snapshot()
+    assert snapshot["wait_seconds_histogram"] == {"0.01": 1, "0.1": 2, "+Inf": 3}
+    assert snapshot["checkouts"] == 3
+    assert snapshot["timeouts"] == 1
+
+
+def test_get_pool_stats():
+    """Pool stats reflect the configured pool."""
+    stats = get_pool_stats()
+    assert stats["size"] == settings.POSTGRES_POOL_SIZE
+    assert stats["max_overflow"] == settings.POSTGRES_MAX_OVERFLOW
+    assert stats["checkouts"] >= 1
+
+
+def test_db_pool_stats_endpoint(
+    client: TestClient, superuser_token_headers: dict[str, str]
+) -> None:
+    r = client.get(
+        f"{settings.API_V1_STR}/utils/db-pool-stats/",
+        headers=superuser_token_headers,
+    )
+    assert r.status_code == 200
+    assert "wait_seconds_histogram" in r.json()
@@ -0,0 +1,205 @@
+import socket
+import threading
+from collections.abc import Generator
+from typing import Any
+from unittest.mock import patch
+
+import pytest
+from aiosmtpd.controller import Controller
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.core.outbox import EmailOutbox, OutboxMessage
+from app.utils import EmailData, queue_email
+
+
+class RecordingHandler:
+    """aiosmtpd handler that records messages and can reject the first few."""
+
+    def __init__(self, reject: int = 0) -> None:
+        self.reject = reject
+        self.peers: set[Any] = set()
+        self.recipients: list[str] = []
+
+    async def handle_DATA(self, _server: Any, session: Any, envelope: Any) -> str:
+        if self.reject:
+            self.reject -= 1
+            return "451 Try again later"
+        self.peers.add(session.peer)
+        self.recipients.extend(envelope.rcpt_tos)
+        return "250 OK"
+
+
+@pytest.fixture
+def smtp_server() -> Generator[tuple[Controller, RecordingHandler], None, None]:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    handler = RecordingHandler()
+    controller = Controller(handler, hostname="127.0.0.1", port=port)
+    controller.start()
+    with (
+        patch("app.core.config.settings.SMTP_HOST", "127.0.0.1"),
+        patch("app.core.config.settings.SMTP_PORT", port),
+        patch("app.core.config.settings.SMTP_TLS", False),
+        patch("app.core.config.settings.SMTP_SSL", False),
+        patch("app.core.config.settings.SMTP_USER", None),
+        patch("app.core.config.settings.SMTP_PASSWORD", None),
+        patch("app.core.config.settings.EMAILS_FROM_EMAIL", "noreply@example.com"),
+    ):
+        yield controller, handler
+    controller.stop()
+
+
+def make_outbox(**kwargs: Any) -> EmailOutbox:
+    options: dict[str, Any] = {
+        "workers": 1,
+        "batch_size": 10,
+        "max_attempts": 3,
+        "retry_backoff": 0.01,
+        "retry_max": 0.05,
+        "idle_timeout": 5.0,
+    }
+    options.update(kwargs)
+    return EmailOutbox(**options)
+
+
+def message(n: int) -> OutboxMessage:
+    return OutboxMessage(
+        email_to=f"user{n}@example.com", subject="Hi", html_content="<p>Hi</p>"
+    )
+
+
+def test_outbox_reuses_smtp_connection(smtp_server):
+    """A batch of emails is delivered over one SMTP connection."""
+    _, handler = smtp_server
+    outbox = make_outbox()
+    for n in range(5):
+        outbox.enqueue(message(n))
+    assert outbox.join(timeout=10)
+    outbox.stop()
+    assert sorted(handler.recipients) == [f"user{n}@example.com" for n in range(5)]
+    assert len(handler.peers) == 1
+    assert outbox.stats()["sent"] == 5
+
+
+def test_outbox_retries_rejected_send(smtp_server):
+    """A temporary SMTP failure is retried on a fresh connection."""
+    _, handler = smtp_server
+    handler.reject = 2
+    outbox = make_outbox()
+    outbox.enqueue(message(1))
+    assert outbox.join(timeout=10)
+    outbox.stop()
+    assert handler.recipients == ["user1@example.com"]
+    stats = outbox.stats()
+    assert stats["retried"] == 2
+    assert stats["sent"] == 1
+    assert stats["failed"] == 0
+
+
+def test_outbox_gives_up_after_max_attempts():
+    """Messages that keep failing are dropped once max_attempts is reached."""
+    attempts: list[int] = []
+
+    class FailingTransport:
+        def send(self, message: OutboxMessage) -> None:
+            attempts.append(message.attempts)
+            raise OSError("connection refused")
+
+        def close(self) -> None:
+            pass
+
+    outbox = make_outbox(transport_factory=FailingTransport)
+    outbox.enqueue(message(1))
+    assert outbox.join(timeout=10)
+    outbox.stop()
+    assert attempts == [1, 2, 3]
+    assert outbox.stats()["failed"] == 1
+
+
+def test_outbox_restarts_after_stop():
+    """Stopping drains the queue; a later enqueue starts workers again."""
+    sent: list[str] = []
+
+    class ListTransport:
+        def send(self, message: OutboxMessage) -> None:
+            sent.append(message.email_to)
+
+        def close(self) -> None:
+            pass
+
+    outbox = make_outbox(transport_factory=ListTransport)
+    outbox.enqueue(message(1))
+    outbox.stop()
+    outbox.enqueue(message(2))
+    outbox.stop()
+    assert sent == ["user1@example.com", "user2@example.com"]
+    assert outbox.stats()["workers"] == 0
+
+
+def test_outbox_stop_waits_for_every_worker():
+    """Workers still sending after the timeout keep the outbox stopped."""
+    sending = threading.Event()
+    release = threading.Event()
+    sent: list[str] = []
+
+    class SlowTransport:
+        def send(self, message: OutboxMessage) -> None:
+            sending.set()
+            release.wait(timeout=10)
+            sent.append(message.email_to)
+
+        def close(self) -> None:
+            pass
+
+    outbox = make_outbox(transport_factory=SlowTransport)
+    outbox.enqueue(message(1))
+    assert sending.wait(timeout=10)
+    assert not outbox.stop(timeout=0.05)
+    with pytest.raises(RuntimeError):
+        outbox.enqueue(message(2))
+    assert outbox.stats()["workers"] == 1
+
+    release.set()
+    assert outbox.stop()
+    outbox.enqueue(message(3))
+    assert outbox.stop()
+    assert sent == ["user1@example.com", "user3@example.com"]
+
+
+def test_queue_email_disabled():
+    """Nothing is queued when emails are disabled."""
+    with (
+        patch("app.core.config.settings.EMAILS_ENABLED", False),
+        patch("app.utils.email_outbox") as outbox,
+    ):
+        queue_email(
+            email_to="test@example.com",
+            email_data=EmailData(html_content="<p>Hi</p>", subject="Hi"),
+        )
+    outbox.enqueue.assert_not_called()
+
+
+def test_test_email_route(
+    client: TestClient, superuser_token_headers: dict[str, str]
+) -> None:
+    """The test email route only reports success when the email is queued."""
+    url = f"{settings.API_V1_STR}/utils/test-email/"
+    params = {"email_to": "test@example.com"}
+    with (
+        patch("app.core.config.settings.EMAILS_ENABLED", False),
+        patch("app.utils.email_outbox") as outbox,
+    ):
+        r = client.post(url, params=params, headers=superuser_token_headers)
+    assert r.status_code == 400
+    outbox.enqueue.assert_not_called()
+
+    with (
+        patch("app.core.config.settings.EMAILS_ENABLED", True),
+        patch("app.utils.email_outbox") as outbox,
+    ):
+        r = client.post(url, params=params, headers=superuser_token_headers)
+    assert r.status_code == 201
+    assert r.json() == {"message": "Test email sent"}
+    outbox.enqueue.assert_called_once()
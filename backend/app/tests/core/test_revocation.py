@@ -0,0 +1,77 @@
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from sqlmodel import Session
+
+from app.core.revocation import RevocationStore
+from app.core.tokens import AccessToken
+from app.models import TokenRevocation
+
+
+def access_token(
+    subject: str, issued_at: float | None = None, token_id: str | None = None
+) -> AccessToken:
+    now = time.time()
+    return AccessToken(
+        subject=subject,
+        expires_at=now + 60,
+        token_id=uuid.uuid4().hex if token_id is None else token_id,
+        issued_at=now if issued_at is None else issued_at,
+    )
+
+
+def test_revoke_token_by_jti(db: Session) -> None:
+    store = RevocationStore(refresh_interval=60)
+    token = access_token("user")
+    store.revoke_token(db, token)
+    assert store.is_revoked(token)
+    assert not store.is_revoked(access_token("user"))
+
+
+def test_revoke_user_covers_tokens_issued_before(db: Session) -> None:
+    store = RevocationStore(refresh_interval=60)
+    user_id = uuid.uuid4()
+    before = access_token(str(user_id), issued_at=time.time() - 1)
+    store.revoke_user(db, user_id)
+    after = access_token(str(user_id), issued_at=time.time() + 1)
+    assert store.is_revoked(before)
+    assert not store.is_revoked(after)
+    assert not store.is_revoked(access_token(str(uuid.uuid4())))
+    # Tokens without iat can't be ordered against the revocation
+    assert store.is_revoked(AccessToken(subject=str(user_id), expires_at=0))
+
+
+def test_refresh_loads_revocations_from_other_processes(db: Session) -> None:
+    store = RevocationStore(refresh_interval=60)
+    store.refresh(db)
+    assert not store.refresh_due()
+
+    now = datetime.now(timezone.utc)
+    revoked = access_token("user")
+    db.add(
+        TokenRevocation(
+            jti=revoked.token_id, revoked_at=now, expires_at=now + timedelta(minutes=1)
+        )
+    )
+    db.add(
+        TokenRevocation(
+            jti="expired",
+            revoked_at=now - timedelta(minutes=2),
+            expires_at=now - timedelta(minutes=1),
+        )
+    )
+    db.flush()
+    assert not store.is_revoked(revoked)
+    store.refresh(db)
+    assert store.is_revoked(revoked)
+    assert not store.is_revoked(access_token("user", token_id="expired"))
+
+
+def test_refresh_only_if_due(db: Session) -> None:
+    """A due refresh already done by another request isn't repeated."""
+    store = RevocationStore(refresh_interval=60)
+    assert store.refresh_due()
+    assert store.refresh(db, only_if_due=True)
+    assert not store.refresh(db, only_if_due=True)
+    assert store.refresh(db)
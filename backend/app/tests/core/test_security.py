@@ -1,3 +1,5 @@
+import threading
+
 import pytest
 from datetime import datetime, timedelta, timezone
 from unittest.mock import patch
@@ -6,7 +8,7 @@ import jwt
 from jwt.exceptions import InvalidTokenError
 
 from app.core import security
-from app.core.config import settings
+from app.core.config import Settings, settings
 
 
 def test_create_access_token():
@@ -42,4 +44,39 @@ def test_get_password_hash():
     """Test password hashing."""
     hashed_password = security.get_password_hash("password123")
     assert hashed_password != "password123"
-    assert security.verify_password("password123", hashed_password)
\ No newline at end of file
+    assert security.verify_password("password123", hashed_password)
+
+
+def test_password_hash_pool_rejects_when_full():
+    """Submissions beyond workers + queue are rejected, not queued."""
+    pool = security.PasswordHashPool(max_workers=1, max_queue=1)
+    release = threading.Event()
+    pool.submit(release.wait)
+    pool.submit(release.wait)
+    with pytest.raises(security.PasswordHashingBusyError):
+        pool.submit(release.wait)
+    stats = pool.stats()
+    assert stats["in_flight"] == 1
+    assert stats["queue_depth"] == 1
+    assert stats["rejected"] == 1
+    release.set()
+
+
+def test_password_hash_pool_runs_nested_work_inline():
+    """Hashing from a pool thread does not wait on the (saturated) pool."""
+    pool = security.PasswordHashPool(max_workers=1, max_queue=0)
+    assert pool.run(lambda: pool.run(lambda: 42)) == 42
+    assert pool.stats()["completed"] == 1
+
+
+def test_bcrypt_rounds_refused_outside_local():
+    """Test-only bcrypt costs can't reach a deployment."""
+    # Non-default secrets, so the "changethis" check can't fail first
+    secrets = {
+        "SECRET_KEY": "not-the-default-secret-key",
+        "POSTGRES_PASSWORD": "not-the-default-password",
+        "FIRST_SUPERUSER_PASSWORD": "not-the-default-password",
+    }
+    with pytest.raises(ValueError, match="BCRYPT_ROUNDS"):
+        Settings(ENVIRONMENT="staging", BCRYPT_ROUNDS=4, **secrets)
+    assert Settings(ENVIRONMENT="local", BCRYPT_ROUNDS=4).BCRYPT_ROUNDS == 4
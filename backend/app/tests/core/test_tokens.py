@@ -0,0 +1,96 @@
+import time
+from unittest.mock import patch
+
+import jwt
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ed25519, rsa
+from jwt.exceptions import ExpiredSignatureError, InvalidTokenError
+
+from app.core.config import Settings
+from app.core.tokens import AccessToken, TokenSigner, TokenVerifier
+
+SECRET = "a-test-secret-that-is-long-enough-for-hs256"
+
+
+def key_pair(algorithm: str) -> tuple[str, str]:
+    """PEM private and public keys for `algorithm`."""
+    private_key: rsa.RSAPrivateKey | ed25519.Ed25519PrivateKey
+    if algorithm == "RS256":
+        private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    else:
+        private_key = ed25519.Ed25519PrivateKey.generate()
+    private_pem = private_key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    )
+    public_pem = private_key.public_key().public_bytes(
+        serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+    )
+    return private_pem.decode(), public_pem.decode()
+
+
+def claims(subject: str = "user", lifetime: float = 60) -> dict[str, object]:
+    return {"sub": subject, "exp": int(time.time() + lifetime)}
+
+
+@pytest.mark.parametrize("algorithm", ["RS256", "EdDSA"])
+def test_asymmetric_tokens_verify_with_public_key(algorithm: str) -> None:
+    private_pem, public_pem = key_pair(algorithm)
+    token = TokenSigner(algorithm, private_pem).sign(claims("alice"))
+    verified = TokenVerifier(algorithm, public_pem, cache_size=0).verify(token)
+    assert verified.subject == "alice"
+
+    _, other_public_pem = key_pair(algorithm)
+    with pytest.raises(InvalidTokenError):
+        TokenVerifier(algorithm, other_public_pem, cache_size=0).verify(token)
+
+
+def test_verifier_rejects_other_algorithm() -> None:
+    _, public_pem = key_pair("EdDSA")
+    token = TokenSigner("HS256", SECRET).sign(claims())
+    with pytest.raises(InvalidTokenError):
+        TokenVerifier("EdDSA", public_pem, cache_size=0).verify(token)
+
+
+def test_verifier_requires_subject_and_expiry() -> None:
+    verifier = TokenVerifier("HS256", SECRET, cache_size=10)
+    with pytest.raises(InvalidTokenError):
+        verifier.verify(jwt.encode({"sub": "user"}, SECRET, algorithm="HS256"))
+    with pytest.raises(InvalidTokenError):
+        verifier.verify(
+            jwt.encode({"exp": int(time.time()) + 60}, SECRET, algorithm="HS256")
+        )
+    with pytest.raises(ExpiredSignatureError):
+        verifier.verify(TokenSigner("HS256", SECRET).sign(claims(lifetime=-1)))
+
+
+def test_verifier_caches_until_expiry() -> None:
+    """A repeat token skips the signature check until the token expires."""
+    verifier = TokenVerifier("HS256", SECRET, cache_size=10)
+    token = TokenSigner("HS256", SECRET).sign(claims(lifetime=60))
+    with patch.object(verifier, "_jwt", wraps=verifier._jwt) as decoder:
+        first = verifier.verify(token)
+        assert verifier.verify(token) == first
+        assert decoder.decode.call_count == 1
+        with patch("app.core.tokens.time.time", return_value=first.expires_at):
+            verifier.verify(token)
+        assert decoder.decode.call_count == 2
+
+
+def test_verifier_cache_is_bounded() -> None:
+    signer = TokenSigner("HS256", SECRET)
+    verifier = TokenVerifier("HS256", SECRET, cache_size=2)
+    tokens = [signer.sign(claims(f"user{n}")) for n in range(3)]
+    for token in tokens:
+        verifier.verify(token)
+    assert list(verifier._verified) == tokens[1:]
+    assert verifier.verify(tokens[0]) == AccessToken(
+        subject="user0", expires_at=jwt.decode(tokens[0], SECRET, ["HS256"])["exp"]
+    )
+
+
+def test_asymmetric_algorithm_needs_public_key() -> None:
+    with pytest.raises(ValueError, match="JWT_PUBLIC_KEY"):
+        Settings(JWT_ALGORITHM="EdDSA")
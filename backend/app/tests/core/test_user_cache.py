@@ -0,0 +1,143 @@
+import threading
+import time
+import uuid
+from unittest.mock import MagicMock, patch
+
+from sqlmodel import Session
+
+from app.api.deps import get_current_user
+from app.core.security import create_access_token
+from app.core.user_cache import UserCache, user_cache
+from app.models import User
+from app.tests.utils.user import create_random_user
+
+
+def _user() -> User:
+    return User(id=uuid.uuid4(), email="cache@example.com", hashed_password="x")
+
+
+def test_user_cache_hit_and_invalidate():
+    """Cached snapshots are returned until the user is invalidated."""
+    cache = UserCache(maxsize=10, ttl_seconds=60)
+    user = _user()
+    cache.put("token", user, token_expires_at=time.time() + 60)
+    snapshot = cache.get("token")
+    assert snapshot is not None
+    assert snapshot["id"] == user.id
+    cache.invalidate_user(user.id)
+    assert cache.get("token") is None
+
+
+def test_user_cache_respects_token_expiry():
+    """Entries never outlive the token they were created from."""
+    cache = UserCache(maxsize=10, ttl_seconds=60)
+    cache.put("token", _user(), token_expires_at=time.time() - 1)
+    assert cache.get("token") is None
+
+
+def test_user_cache_evicts_least_recently_used():
+    """The oldest untouched entry is dropped once maxsize is exceeded."""
+    cache = UserCache(maxsize=2, ttl_seconds=60)
+    expires = time.time() + 60
+    cache.put("a", _user(), token_expires_at=expires)
+    cache.put("b", _user(), token_expires_at=expires)
+    assert cache.get("a") is not None
+    cache.put("c", _user(), token_expires_at=expires)
+    assert cache.get("a") is not None
+    assert cache.get("b") is None
+    assert cache.get("c") is not None
+
+
+def test_user_cache_skips_put_after_invalidation():
+    """A user loaded before an invalidation isn't cached after it."""
+    cache = UserCache(maxsize=10, ttl_seconds=60)
+    user = _user()
+    generation = cache.generation()
+    cache.invalidate_user(user.id)
+    cache.put("token", user, token_expires_at=time.time() + 60, generation=generation)
+    assert cache.get("token") is None
+    cache.put(
+        "token",
+        user,
+        token_expires_at=time.time() + 60,
+        generation=cache.generation(),
+    )
+    assert cache.get("token") is not None
+
+
+def test_user_cache_bounds_invalidated_users():
+    """Only maxsize invalidations are tracked, without letting stale puts in."""
+    cache = UserCache(maxsize=2, ttl_seconds=60)
+    stale, *others = (_user() for _ in range(3))
+    generation = cache.generation()
+    for user in (stale, *others):
+        cache.invalidate_user(user.id)
+    assert len(cache._invalidated) == 2
+    cache.put("stale", stale, token_expires_at=time.time() + 60, generation=generation)
+    assert cache.get("stale") is None
+    cache.put(
+        "fresh",
+        stale,
+        token_expires_at=time.time() + 60,
+        generation=cache.generation(),
+    )
+    assert cache.get("fresh") is not None
+
+
+def test_get_current_user_invalidated_during_load(db: Session):
+    user = create_random_user(db)
+    token = create_access_token(user.id)
+    load = db.get
+
+    def load_then_invalidate(*args, **kwargs):
+        loaded = load(*args, **kwargs)
+        user_cache.invalidate_user(user.id)
+        return loaded
+
+    with patch.object(db, "get", side_effect=load_then_invalidate):
+        assert get_current_user(session=db, token=token).id == user.id
+    assert user_cache.get(token) is None
+
+
+def test_refresh_versions_drops_users_changed_elsewhere(db: Session):
+    """Users updated or deleted since they were cached are invalidated."""
+    cache = UserCache(maxsize=10, ttl_seconds=60)
+    expires = time.time() + 60
+    unchanged, updated, deleted = (create_random_user(db) for _ in range(3))
+    for user in (unchanged, updated, deleted):
+        cache.put(str(user.id), user, token_expires_at=expires)
+
+    updated.is_active = False
+    db.add(updated)
+    db.delete(deleted)
+    db.commit()
+    cache.refresh_versions(db)
+
+    assert cache.get(str(unchanged.id)) is not None
+    assert cache.get(str(updated.id)) is None
+    assert cache.get(str(deleted.id)) is None
+
+
+def test_refresh_versions_runs_on_one_thread_at_a_time():
+    """A refresh started while another is running returns without a query."""
+    cache = UserCache(maxsize=10, ttl_seconds=60)
+    user = _user()
+    cache.put("token", user, token_expires_at=time.time() + 60)
+    querying = threading.Event()
+    release = threading.Event()
+    session = MagicMock()
+
+    def exec_(_statement: object) -> MagicMock:
+        querying.set()
+        release.wait(timeout=5)
+        return MagicMock(all=lambda: [(user.id, user.version)])
+
+    session.exec.side_effect = exec_
+    thread = threading.Thread(target=cache.refresh_versions, args=(session,))
+    thread.start()
+    assert querying.wait(timeout=5)
+    cache.refresh_versions(session)
+    release.set()
+    thread.join(timeout=5)
+    assert session.exec.call_count == 1
+    assert cache.get("token") is not None
@@ -1,9 +1,17 @@
+from collections.abc import Generator
+from unittest.mock import patch
+
+import pytest
 from fastapi.encoders import jsonable_encoder
+from passlib.context import CryptContext
 from sqlmodel import Session
 
 from app import crud
-from app.core.security import verify_password
+from app.core.config import settings
+from app.core.security import password_context_options, pwd_context, verify_password
+from app.core.user_cache import attach_user
 from app.models import User, UserCreate, UserUpdate
+from app.tests.utils.user import create_random_user
 from app.tests.utils.utils import random_email, random_lower_string
 
 
@@ -26,6 +34,61 @@ def test_authenticate_user(db: Session) -> None:
     assert user.email == authenticated_user.email
 
 
+@pytest.fixture
+def argon2_hashing() -> Generator[None, None, None]:
+    """Hash new passwords with a cheap argon2id for the test."""
+    with (
+        patch.object(settings, "PASSWORD_HASH_SCHEME", "argon2"),
+        patch.object(settings, "ARGON2_MEMORY_COST_KIB", 1024),
+        patch.object(settings, "ARGON2_TIME_COST", 1),
+        patch.object(settings, "ARGON2_PARALLELISM", 1),
+    ):
+        pwd_context.load(password_context_options())
+        yield
+    pwd_context.load(password_context_options())
+
+
+def test_authenticate_rehashes_other_cost(db: Session) -> None:
+    """Logging in moves a hash of another bcrypt cost to the configured one."""
+    email = random_email()
+    password = random_lower_string()
+    user = crud.create_user(
+        session=db, user_create=UserCreate(email=email, password=password)
+    )
+    user.hashed_password = CryptContext(["bcrypt"], bcrypt__rounds=5).hash(password)
+    db.add(user)
+    db.commit()
+    authenticated_user = crud.authenticate(session=db, email=email, password=password)
+    assert authenticated_user
+    assert authenticated_user.hashed_password.startswith(
+        f"$2b${settings.BCRYPT_ROUNDS:02d}$"
+    )
+    assert verify_password(password, authenticated_user.hashed_password)
+
+
+def test_authenticate_migrates_bcrypt_to_argon2(
+    db: Session,
+    argon2_hashing: None,  # noqa: ARG001
+) -> None:
+    email = random_email()
+    password = random_lower_string()
+    with patch.object(settings, "PASSWORD_HASH_SCHEME", "bcrypt"):
+        pwd_context.load(password_context_options())
+        crud.create_user(
+            session=db, user_create=UserCreate(email=email, password=password)
+        )
+    pwd_context.load(password_context_options())
+    user = crud.authenticate(session=db, email=email, password=password)
+    assert user
+    assert user.hashed_password.startswith("$argon2id$v=19$m=1024,t=1,p=1$")
+    stored_hash = user.hashed_password
+    # Already current: a second login keeps the hash
+    user = crud.authenticate(session=db, email=email, password=password)
+    assert user
+    assert user.hashed_password == stored_hash
+    assert crud.authenticate(session=db, email=email, password="wrong") is None
+
+
 def test_not_authenticate_user(db: Session) -> None:
     email = random_email()
     password = random_lower_string()
@@ -89,3 +152,27 @@ def test_update_user(db: Session) -> None:
     assert user_2
     assert user.email == user_2.email
     assert verify_password(new_password, user_2.hashed_password)
+
+
+def test_overlapping_updates_each_bump_version(db: Session) -> None:
+    """The version is incremented in SQL, not from a possibly stale copy."""
+    user = create_random_user(db)
+    assert user.version == 1
+    # A cached snapshot, taken before either update
+    snapshot = user.model_dump()
+
+    with Session(db.connection(), join_transaction_mode="create_savepoint") as other:
+        stale = attach_user(other, snapshot)
+        user.full_name = "First"
+        db.add(user)
+        db.commit()
+        assert user.version == 2
+
+        stale.full_name = "Second"
+        other.add(stale)
+        other.commit()
+        assert stale.version == 3
+
+    db.refresh(user)
+    assert user.full_name == "Second"
+    assert user.version == 3
@@ -0,0 +1,45 @@
+import uuid
+from collections.abc import Generator
+
+import pytest
+from sqlalchemy import Column, ForeignKey, Index, Integer, MetaData, String, Table
+
+from app.core.db import engine
+from app.index_audit import MissingIndex, audit_indexes
+
+
+@pytest.fixture
+def audit_metadata() -> Generator[MetaData, None, None]:
+    suffix = uuid.uuid4().hex[:8]
+    metadata = MetaData()
+    parent = Table(
+        f"audit_parent_{suffix}", metadata, Column("id", Integer, primary_key=True)
+    )
+    child = Table(
+        f"audit_child_{suffix}",
+        metadata,
+        Column("id", Integer, primary_key=True),
+        Column("parent_id", ForeignKey(parent.c.id)),
+        Column("other_id", ForeignKey(parent.c.id)),
+        Column("name", String),
+    )
+    Index(f"ix_audit_other_{suffix}", child.c.other_id, child.c.name)
+    metadata.create_all(engine)
+    yield metadata
+    metadata.drop_all(engine)
+
+
+def test_models_are_indexed() -> None:
+    """Every foreign key and filtered column of the app's tables is indexed."""
+    assert audit_indexes() == []
+
+
+def test_audit_flags_unindexed_columns(audit_metadata: MetaData) -> None:
+    parent, child = audit_metadata.sorted_tables
+    missing = audit_indexes(
+        metadata=audit_metadata, filtered_columns=[f"{child.name}.name"]
+    )
+    assert missing == [
+        MissingIndex(child.name, ("parent_id",), f"foreign key to {parent.name}"),
+        MissingIndex(child.name, ("name",), "filtered column"),
+    ]
@@ -0,0 +1,84 @@
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import Any
+
+from sqlalchemy import Engine, create_engine, event, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.pool import NullPool
+from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_random
+
+from app.core.config import settings
+from app.core.db import async_engine, engine
+
+# Engines whose connections follow use_database()
+ENGINES = (engine, async_engine.sync_engine)
+
+
+def _admin_engine() -> Engine:
+    # Cloning needs a connection outside the template database itself
+    url = make_url(str(settings.SQLALCHEMY_DATABASE_URI)).set(database="postgres")
+    return create_engine(url, isolation_level="AUTOCOMMIT", poolclass=NullPool)
+
+
+def drop_database(name: str) -> None:
+    admin = _admin_engine()
+    with admin.connect() as connection:
+        connection.execute(text(f'DROP DATABASE IF EXISTS "{name}" WITH (FORCE)'))
+    admin.dispose()
+
+
+# Postgres refuses to clone a template another session is connected to, which
+# happens while other workers are cloning it too
+@retry(
+    retry=retry_if_exception_type(OperationalError),
+    stop=stop_after_attempt(50),
+    wait=wait_random(0.05, 0.5),
+    reraise=True,
+)
+def create_database(name: str, template: str) -> None:
+    """Create `name` as a copy of the migrated `template` database."""
+    drop_database(name)
+    admin = _admin_engine()
+    with admin.connect() as connection:
+        connection.execute(text(f'CREATE DATABASE "{name}" TEMPLATE "{template}"'))
+    admin.dispose()
+
+
+@contextmanager
+def use_database(name: str) -> Iterator[None]:
+    """
+    Point the app's engines, and engines built from settings meanwhile, at
+    database `name`.
+    """
+
+    def do_connect(
+        _dialect: Any, _record: Any, _cargs: Any, cparams: dict[str, Any]
+    ) -> None:
+        cparams["dbname"] = name
+
+    previous = settings.POSTGRES_DB
+    settings.POSTGRES_DB = name
+    # The async pool is still empty here and is disposed by its event loop
+    engine.dispose()
+    for db_engine in ENGINES:
+        event.listen(db_engine, "do_connect", do_connect)
+    try:
+        yield
+    finally:
+        for db_engine in ENGINES:
+            event.remove(db_engine, "do_connect", do_connect)
+        engine.dispose()
+        settings.POSTGRES_DB = previous
+
+
+@contextmanager
+def worker_database(worker: str) -> Iterator[str]:
+    """A private copy of the test database for one pytest-xdist worker."""
+    name = f"{settings.POSTGRES_DB}_test_{worker}"
+    create_database(name, template=settings.POSTGRES_DB)
+    try:
+        with use_database(name):
+            yield name
+    finally:
+        drop_database(name)
@@ -3,9 +3,12 @@ from datetime import datetime, timedelta, timezone
 from pathlib import Path
 from unittest.mock import MagicMock, patch
 import jwt
+from jinja2 import DictLoader, Environment
 
 from app.utils import (
     EmailData, 
+    email_templates,
+    precompile_email_templates,
     render_email_template, 
     send_email, 
     generate_test_email,
@@ -25,14 +28,9 @@ def test_email_data_class():
     assert email_data.subject == "Test Subject"
 
 
-@patch("app.utils.Path")
-def test_render_email_template(mock_path):
+@patch("app.utils.email_templates", Environment(loader=DictLoader({"test.html": "Hello {{ name }}!"})))
+def test_render_email_template():
     """Test the render_email_template function."""
-    # Setup mock
-    mock_file = MagicMock()
-    mock_file.read_text.return_value = "Hello {{ name }}!"
-    mock_path.return_value.parent.__truediv__.return_value.__truediv__.return_value.__truediv__.return_value = mock_file
-
     # Call function
     result = render_email_template(template_name="test.html", context={"name": "World"})
 
@@ -41,6 +39,20 @@ def test_render_email_template(mock_path):
     # Don't assert on the mock calls as the implementation may change
 
 
+def test_precompile_email_templates():
+    """All built templates are compiled once and then served from the cache."""
+    count = precompile_email_templates()
+
+    assert count == len(list(Path("app/email-templates/build").glob("*.html")))
+    with patch.object(email_templates.loader, "get_source") as get_source:
+        html = render_email_template(
+            template_name="test_email.html",
+            context={"project_name": "Cached", "email": "test@example.com"},
+        )
+    get_source.assert_not_called()
+    assert "Cached" in html
+
+
 @patch("app.utils.emails.Message")
 def test_send_email_with_tls(mock_message):
     """Test the send_email function with TLS configuration."""
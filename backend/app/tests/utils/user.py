@@ -1,9 +1,13 @@
+import uuid
+from collections.abc import Callable
+
 from fastapi.testclient import TestClient
 from sqlmodel import Session
 
 from app import crud
 from app.core.config import settings
-from app.models import User, UserCreate, UserUpdate
+from app.core.security import create_access_token
+from app.models import User, UserCreate
 from app.tests.utils.utils import random_email, random_lower_string
 
 
@@ -27,23 +31,24 @@ def create_random_user(db: Session) -> User:
     return user
 
 
+def token_headers(user_id: uuid.UUID) -> dict[str, str]:
+    """Auth headers for the user, minted directly instead of logging in."""
+    return {"Authorization": f"Bearer {create_access_token(user_id)}"}
+
+
 def authentication_token_from_email(
-    *, client: TestClient, email: str, db: Session
+    *,
+    email: str,
+    db: Session,
+    token_factory: Callable[[uuid.UUID], dict[str, str]] = token_headers,
 ) -> dict[str, str]:
     """
     Return a valid token for the user with given email.
 
     If the user doesn't exist it is created first.
     """
-    password = random_lower_string()
     user = crud.get_user_by_email(session=db, email=email)
     if not user:
-        user_in_create = UserCreate(email=email, password=password)
+        user_in_create = UserCreate(email=email, password=random_lower_string())
         user = crud.create_user(session=db, user_create=user_in_create)
-    else:
-        user_in_update = UserUpdate(password=password)
-        if not user.id:
-            raise Exception("User id not set")
-        user = crud.update_user(session=db, db_user=user, user_in=user_in_update)
-
-    return user_authentication_headers(client=client, email=email, password=password)
+    return token_factory(user.id)
@@ -6,11 +6,12 @@ from typing import Any
 
 import emails  # type: ignore
 import jwt
-from jinja2 import Template
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
 from jwt.exceptions import InvalidTokenError
 
 from app.core import security
 from app.core.config import settings
+from app.core.outbox import OutboxMessage, email_outbox, smtp_options
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -22,12 +23,34 @@ class EmailData:
     subject: str
 
 
+def _email_templates_dir() -> Path:
+    # EMAILS_TEMPLATES_DIR is relative to the backend directory, not the cwd
+    templates_dir = Path(settings.EMAILS_TEMPLATES_DIR)
+    if not templates_dir.is_absolute():
+        templates_dir = Path(__file__).parent.parent / templates_dir
+    return templates_dir
+
+
+# Compiled templates are kept in memory and their bytecode on disk, so workers
+# after the first one skip compiling. Templates only change on deploy, so
+# auto_reload's per-render mtime check is turned off
+email_templates = Environment(
+    loader=FileSystemLoader(_email_templates_dir()),
+    bytecode_cache=FileSystemBytecodeCache(),
+    auto_reload=False,
+)
+
+
+def precompile_email_templates() -> int:
+    """Load every HTML email template into the environment's cache."""
+    names = email_templates.list_templates(extensions=["html"])
+    for name in names:
+        email_templates.get_template(name)
+    return len(names)
+
+
 def render_email_template(*, template_name: str, context: dict[str, Any]) -> str:
-    template_str = (
-        Path(__file__).parent / "email-templates" / "build" / template_name
-    ).read_text()
-    html_content = Template(template_str).render(context)
-    return html_content
+    return email_templates.get_template(template_name).render(context)
 
 
 def send_email(
@@ -44,19 +67,26 @@ def send_email(
         html=html_content,
         mail_from=(settings.EMAILS_FROM_NAME, settings.EMAILS_FROM_EMAIL),
     )
-    smtp_options = {"host": settings.SMTP_HOST, "port": settings.SMTP_PORT}
-    if settings.SMTP_TLS:
-        smtp_options["tls"] = True
-    elif settings.SMTP_SSL:
-        smtp_options["ssl"] = True
-    if settings.SMTP_USER:
-        smtp_options["user"] = settings.SMTP_USER
-    if settings.SMTP_PASSWORD:
-        smtp_options["password"] = settings.SMTP_PASSWORD
-    response = message.send(to=email_to, smtp=smtp_options)
+    response = message.send(to=email_to, smtp=smtp_options())
     logger.info(f"send email result: {response}")
 
 
+def queue_email(*, email_to: str, email_data: EmailData) -> None:
+    """
+    Hand an email to the background outbox instead of sending it inline. Does
+    nothing when emails are disabled.
+    """
+    if not settings.EMAILS_ENABLED:
+        return
+    email_outbox.enqueue(
+        OutboxMessage(
+            email_to=email_to,
+            subject=email_data.subject,
+            html_content=email_data.html_content,
+        )
+    )
+
+
 def generate_test_email(email_to: str) -> EmailData:
     project_name = settings.PROJECT_NAME
     subject = f"{project_name} - Test email"
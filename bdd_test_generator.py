@@ -1,7 +1,12 @@
 import os
 import json
 import argparse
+import hashlib
+import random
+import re
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from typing import Dict, Any, List, Optional, Tuple
 
@@ -9,6 +14,7 @@ import groq
 from dotenv import load_dotenv
 
 from analyze_coverage_gaps import (
+    analyze_coverage_diff,
     analyze_coverage_xml,
     group_by_function,
     DEFAULT_EXCLUDE_PATTERNS,
@@ -18,6 +24,7 @@ from analyze_coverage_gaps import (
 load_dotenv()
 
 # Configuration
+SOURCE_ROOT = Path('backend/app')
 API_DIR = Path('backend/app/api')
 MODELS_FILE = Path('backend/app/models.py')
 CRUD_FILE = Path('backend/app/crud.py')
@@ -25,6 +32,23 @@ FEATURE_DIR = Path('backend/app/tests/features')
 STEPS_DIR = Path('backend/app/tests/features/steps')
 TEMPLATES_FILE = Path('prompt_templates.json')
 COVERAGE_XML_PATH = Path('backend/coverage.xml')
+MANIFEST_FILE = FEATURE_DIR / '.bdd_manifest.json'
+
+# Concurrency / rate limiting defaults (Groq free tier allows 30 requests per minute)
+DEFAULT_WORKERS = 1
+DEFAULT_REQUESTS_PER_MINUTE = 30
+MAX_RATE_LIMIT_RETRIES = 5
+BACKOFF_BASE_SECONDS = 2.0
+BACKOFF_MAX_SECONDS = 120.0
+
+# Generation parameters (part of the response cache key)
+TEMPERATURE = 0.2  # Lower temperature for more deterministic outputs
+MAX_TOKENS = 2000
+
+# Response cache defaults
+CACHE_DIR = Path('.bdd_cache')
+CACHE_MAX_AGE_DAYS = 30
+CACHE_MAX_SIZE_MB = 200
 
 # Ensure directories exist
 FEATURE_DIR.mkdir(exist_ok=True, parents=True)
@@ -38,10 +62,225 @@ def load_templates() -> Dict[str, Dict[str, str]]:
     with open(TEMPLATES_FILE, 'r') as f:
         return json.load(f)
 
+def _parse_reset_duration(value: Optional[str]) -> Optional[float]:
+    """Parse a rate-limit reset header (e.g. "7.66s", "2m59.56s", "120ms") into seconds."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+
+    total = 0.0
+    matched = False
+    for amount, unit in re.findall(r'([0-9]*\.?[0-9]+)(ms|h|m|s)', value):
+        matched = True
+        amount = float(amount)
+        if unit == 'ms':
+            total += amount / 1000
+        elif unit == 'h':
+            total += amount * 3600
+        elif unit == 'm':
+            total += amount * 60
+        else:
+            total += amount
+    return total if matched else None
+
+
+class TokenBucket:
+    """Thread-safe token bucket that also honours the provider's rate-limit headers.
+
+    The bucket refills at ``requests_per_minute`` and every request takes one
+    token. Groq reports its remaining quota via ``x-ratelimit-*`` headers and a
+    ``retry-after`` header on 429 responses; when either says the quota is
+    exhausted, all workers pause until the advertised reset time.
+    """
+
+    def __init__(self, requests_per_minute: float = DEFAULT_REQUESTS_PER_MINUTE):
+        self._lock = threading.Lock()
+        self.configure(requests_per_minute)
+
+    def configure(self, requests_per_minute: float) -> None:
+        with self._lock:
+            self.capacity = max(1.0, float(requests_per_minute))
+            self.refill_rate = self.capacity / 60.0
+            self.tokens = self.capacity
+            self.updated_at = time.monotonic()
+            self.blocked_until = 0.0
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self.updated_at
+        self.tokens = min(self.capacity, self.tokens + elapsed * self.refill_rate)
+        self.updated_at = now
+
+    def acquire(self) -> None:
+        """Block until a request may be sent."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now < self.blocked_until:
+                    wait = self.blocked_until - now
+                elif self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                else:
+                    wait = (1 - self.tokens) / self.refill_rate
+            time.sleep(wait)
+
+    def pause(self, seconds: float) -> None:
+        """Stop handing out tokens for ``seconds`` (shared by all workers)."""
+        with self._lock:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+    def update_from_headers(self, headers: Any) -> None:
+        """Pause until the reset time when the provider reports an exhausted quota."""
+        if not headers:
+            return
+        for kind in ('requests', 'tokens'):
+            remaining = headers.get(f'x-ratelimit-remaining-{kind}')
+            reset = _parse_reset_duration(headers.get(f'x-ratelimit-reset-{kind}'))
+            try:
+                exhausted = remaining is not None and int(float(remaining)) <= 0
+            except ValueError:
+                exhausted = False
+            if exhausted and reset:
+                self.pause(reset)
+        retry_after = _parse_reset_duration(headers.get('retry-after'))
+        if retry_after:
+            self.pause(retry_after)
+
+
+rate_limiter = TokenBucket()
+
+
+class ResponseCache:
+    """Content-addressed on-disk cache of LLM responses.
+
+    Entries are keyed by a SHA-256 of everything that determines the response
+    (prompt type, rendered system and user prompts, model, temperature and
+    max_tokens), so any change to the source file, template, model or coverage
+    context produces a new key. Entries older than ``max_age_days`` are ignored,
+    and ``evict`` trims the least recently used entries down to ``max_size_mb``.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Path = CACHE_DIR,
+        max_age_days: float = CACHE_MAX_AGE_DAYS,
+        max_size_mb: float = CACHE_MAX_SIZE_MB,
+        enabled: bool = True,
+    ):
+        self.cache_dir = Path(cache_dir)
+        self.max_age_seconds = max_age_days * 24 * 3600
+        self.max_size_bytes = int(max_size_mb * 1024 * 1024)
+        self.enabled = enabled
+        # Hit/miss counters, updated from every worker thread
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(
+        prompt_type: str,
+        system_prompt: str,
+        user_prompt: str,
+        model: str,
+        temperature: float,
+        max_tokens: int,
+    ) -> str:
+        payload = json.dumps(
+            [prompt_type, system_prompt, user_prompt, model, temperature, max_tokens],
+            ensure_ascii=False,
+        )
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.json"
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached response for ``key`` or None if missing/expired."""
+        if not self.enabled:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            self._count(hit=False)
+            return None
+        if time.time() - entry.get('created_at', 0) > self.max_age_seconds:
+            path.unlink(missing_ok=True)
+            self._count(hit=False)
+            return None
+        # Touch the entry so size-based eviction drops least recently used first
+        os.utime(path)
+        self._count(hit=True)
+        return entry['response']
+
+    def _count(self, hit: bool) -> None:
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def put(self, key: str, response: str) -> None:
+        if not self.enabled:
+            return
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f".{threading.get_ident()}.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'created_at': time.time(), 'response': response}, f)
+        os.replace(tmp_path, path)
+
+    def evict(self) -> int:
+        """Drop expired entries, then least recently used ones until under the size cap."""
+        if not self.enabled or not self.cache_dir.exists():
+            return 0
+        now = time.time()
+        entries = []
+        removed = 0
+        for path in self.cache_dir.glob('*/*.json'):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            if now - stat.st_mtime > self.max_age_seconds:
+                path.unlink(missing_ok=True)
+                removed += 1
+            else:
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+        total_size = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total_size <= self.max_size_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total_size -= size
+            removed += 1
+        return removed
+
+
+response_cache = ResponseCache()
+
+_client_lock = threading.Lock()
+_clients: Dict[str, groq.Groq] = {}
+
+
+def _get_client() -> groq.Groq:
+    """Return a shared Groq client; call_groq_api retries with the rate limiter instead."""
+    api_key = os.environ["GROQ_API_KEY"]
+    with _client_lock:
+        if api_key not in _clients:
+            _clients[api_key] = groq.Groq(api_key=api_key, max_retries=0)
+        return _clients[api_key]
+
+
 def extract_code_from_response(response_text: str) -> str:
     """Extract clean code from Groq API response."""
-    import re
-    
     # Remove any markdown code block markers
     # Pattern matches: ```python, ```gherkin, ```, etc.
     cleaned = re.sub(r'^```[a-z]*\n', '', response_text, flags=re.MULTILINE)
@@ -54,16 +293,22 @@ def extract_code_from_response(response_text: str) -> str:
     
     return cleaned.strip()
 
+def _backoff_delay(attempt: int) -> float:
+    """Exponential backoff with jitter for retry number ``attempt``."""
+    delay = min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2 ** attempt)
+    return delay + random.uniform(0, delay / 2)
+
 def call_groq_api(
     prompt_type: str,
     content: str,
     model: str = "llama-3.1-8b-instant",
     coverage_context: str = "",
 ) -> str:
-    """Call Groq API with the specified prompt template and content"""
-    if "GROQ_API_KEY" not in os.environ:
-        raise ValueError("GROQ_API_KEY environment variable is not set. Please set it to run this script.")
+    """Call Groq API with the specified prompt template and content.
 
+    Responses are served from the on-disk cache when the rendered prompt and
+    generation parameters are unchanged, in which case no network call is made.
+    """
     templates = load_templates()
     
     if prompt_type not in templates:
@@ -81,30 +326,62 @@ def call_groq_api(
         or "No uncovered lines reported; include happy-path, negative, and edge cases.",
     }
     user_prompt = template["user"].format(**default_context)
-    
-    try:
-        client = groq.Groq(api_key=os.environ["GROQ_API_KEY"])
-        response = client.chat.completions.create(
-            model=model,
-            messages=[
-                {"role": "system", "content": template["system"]},
-                {"role": "user", "content": user_prompt}
-            ],
-            temperature=0.2,  # Lower temperature for more deterministic outputs
-            max_tokens=2000
-        )
-        raw_response = response.choices[0].message.content
-        # Extract clean code from response
-        clean_code = extract_code_from_response(raw_response)
-        return clean_code
-    except groq.RateLimitError as e:
-        print(f"\n  Groq API Rate Limit Reached!")
-        print(f"Error: {e}")
-        print(f"Please wait ~23 minutes or upgrade your Groq plan.")
-        raise e
-    except Exception as e:
-        print(f"Error calling Groq API: {e}")
-        raise e
+
+    cache_key = ResponseCache.make_key(
+        prompt_type, template["system"], user_prompt, model, TEMPERATURE, MAX_TOKENS
+    )
+    cached = response_cache.get(cache_key)
+    if cached is not None:
+        return extract_code_from_response(cached)
+
+    if "GROQ_API_KEY" not in os.environ:
+        raise ValueError("GROQ_API_KEY environment variable is not set. Please set it to run this script.")
+
+    client = _get_client()
+    for attempt in range(MAX_RATE_LIMIT_RETRIES + 1):
+        rate_limiter.acquire()
+        try:
+            raw = client.chat.completions.with_raw_response.create(
+                model=model,
+                messages=[
+                    {"role": "system", "content": template["system"]},
+                    {"role": "user", "content": user_prompt}
+                ],
+                temperature=TEMPERATURE,
+                max_tokens=MAX_TOKENS
+            )
+            rate_limiter.update_from_headers(raw.headers)
+            response = raw.parse()
+            raw_response = response.choices[0].message.content
+            if raw_response:
+                response_cache.put(cache_key, raw_response)
+            # Extract clean code from response
+            clean_code = extract_code_from_response(raw_response)
+            return clean_code
+        except groq.RateLimitError as e:
+            rate_limiter.update_from_headers(e.response.headers)
+            if attempt == MAX_RATE_LIMIT_RETRIES:
+                print(f"\n  Groq API Rate Limit Reached!")
+                print(f"Error: {e}")
+                print(f"Gave up after {MAX_RATE_LIMIT_RETRIES} retries; wait for the quota to reset or upgrade your Groq plan.")
+                raise e
+            delay = _backoff_delay(attempt)
+            print(f"  Rate limited ({prompt_type}); retrying in {delay:.1f}s "
+                  f"(attempt {attempt + 1}/{MAX_RATE_LIMIT_RETRIES})")
+            rate_limiter.pause(delay)
+        except (groq.APIConnectionError, groq.InternalServerError) as e:
+            # The client is built with max_retries=0, so transient failures the
+            # SDK would have retried are retried here
+            if attempt == MAX_RATE_LIMIT_RETRIES:
+                print(f"Error calling Groq API: {e}")
+                raise e
+            delay = _backoff_delay(attempt)
+            print(f"  Groq API error ({prompt_type}): {e}; retrying in {delay:.1f}s "
+                  f"(attempt {attempt + 1}/{MAX_RATE_LIMIT_RETRIES})")
+            time.sleep(delay)
+        except Exception as e:
+            print(f"Error calling Groq API: {e}")
+            raise e
 
 def extract_api_endpoints():
     """Extract all backend Python files for test generation.
@@ -160,13 +437,24 @@ def _normalize_path_for_lookup(file_path: str) -> str:
     return Path(file_path).as_posix().replace("backend/app/", "").lstrip("./")
 
 
-def _build_coverage_lookup(coverage_xml: Path) -> Dict[str, str]:
-    """Create a lookup of coverage gaps per file (normalized path -> text)."""
-    if not coverage_xml.exists():
-        print(f"Coverage XML not found at {coverage_xml}. Continuing without coverage hints.")
+def _build_coverage_lookup(
+    coverage_xml: List[Path],
+    baseline_xml: Optional[List[Path]] = None,
+) -> Dict[str, str]:
+    """Create a lookup of coverage gaps per file (normalized path -> text).
+
+    Several reports are merged. With ``baseline_xml`` only lines that became
+    uncovered since the baseline are included, so generation targets regressions.
+    """
+    missing = [path for path in coverage_xml if not path.exists()]
+    if missing:
+        print(f"Coverage XML not found at {', '.join(map(str, missing))}. Continuing without coverage hints.")
         return {}
 
-    coverage_data = analyze_coverage_xml(str(coverage_xml), DEFAULT_EXCLUDE_PATTERNS)
+    if baseline_xml:
+        coverage_data = analyze_coverage_diff(coverage_xml, baseline_xml, DEFAULT_EXCLUDE_PATTERNS)
+    else:
+        coverage_data = analyze_coverage_xml(coverage_xml, DEFAULT_EXCLUDE_PATTERNS)
     if not coverage_data:
         print("Coverage data could not be parsed. Continuing without coverage hints.")
         return {}
@@ -187,7 +475,7 @@ def _build_coverage_lookup(coverage_xml: Path) -> Dict[str, str]:
 
         lookup[normalized] = "\n".join(parts)
 
-    print(f"Loaded coverage hints for {len(lookup)} files from {coverage_xml}")
+    print(f"Loaded coverage hints for {len(lookup)} files from {', '.join(map(str, coverage_xml))}")
     return lookup
 
 def generate_feature_file(
@@ -214,8 +502,7 @@ def generate_feature_file(
         print(f"Generated feature file: {output_path}")
     else:
         # Generate output path based on file name
-        file_name = os.path.basename(endpoint_info['file']).replace('.py', '')
-        output_path = FEATURE_DIR / f"{file_name}.feature"
+        output_path, _ = _output_paths(endpoint_info)
         with open(output_path, 'w') as f:
             f.write(feature_content)
         print(f"Generated feature file: {output_path}")
@@ -228,7 +515,7 @@ def generate_step_definitions(
     model: str,
 ) -> Path:
     """Generate step definitions for a feature file"""
-    feature_name = os.path.basename(feature_path).replace('.feature', '')
+    feature_name = Path(feature_path).stem
     print(f"Generating step definitions for: {feature_name}")
     
     # Call Groq API to generate step definitions
@@ -242,15 +529,190 @@ def generate_step_definitions(
     print(f"Generated step definition file: {step_file}")
     return step_file
 
+def _hash_text(text: str) -> str:
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+def load_manifest(manifest_path: Path = MANIFEST_FILE) -> Dict[str, Dict[str, Any]]:
+    """Load the generation manifest (source file -> inputs hashes and output paths)."""
+    if not manifest_path.exists():
+        return {}
+    try:
+        with open(manifest_path, 'r') as f:
+            return json.load(f).get('files', {})
+    except (OSError, ValueError) as e:
+        print(f"Ignoring unreadable manifest {manifest_path}: {e}")
+        return {}
+
+def save_manifest(manifest: Dict[str, Dict[str, Any]], manifest_path: Path = MANIFEST_FILE) -> None:
+    tmp_path = manifest_path.with_suffix('.tmp')
+    with open(tmp_path, 'w') as f:
+        json.dump({'version': 1, 'files': manifest}, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, manifest_path)
+
+def _manifest_key(endpoint: Dict[str, str]) -> str:
+    return Path(endpoint['file']).as_posix()
+
+def _output_name(file_path: str) -> str:
+    """Output base name for a source file, unique per path under SOURCE_ROOT.
+
+    backend/app/main.py gives ``main`` and backend/app/api/main.py ``api_main``.
+    """
+    relative = Path(os.path.relpath(file_path, SOURCE_ROOT))
+    if relative.parts[0] == os.pardir:
+        relative = Path(os.path.relpath(file_path))
+    parts = [part for part in relative.parent.parts if part not in (os.curdir, os.pardir)]
+    return '_'.join(parts + [os.path.splitext(relative.name)[0]])
+
+def _output_paths(endpoint: Dict[str, str]) -> Tuple[Path, Path]:
+    """Paths of the .feature/_steps.py pair generated for a source file."""
+    name = _output_name(endpoint['file'])
+    return FEATURE_DIR / f"{name}.feature", STEPS_DIR / f"{name}_steps.py"
+
+def build_manifest_entry(
+    endpoint: Dict[str, str],
+    coverage_context: str,
+    model: str,
+    templates_hash: str,
+) -> Dict[str, Any]:
+    feature_path, step_path = _output_paths(endpoint)
+    return {
+        'source_hash': _hash_text(endpoint['content']),
+        'coverage_hash': _hash_text(coverage_context),
+        'templates_hash': templates_hash,
+        'model': model,
+        'feature_file': feature_path.as_posix(),
+        'steps_file': step_path.as_posix(),
+    }
+
+def select_changed_endpoints(
+    endpoints: List[Dict[str, str]],
+    coverage_lookup: Dict[str, str],
+    manifest: Dict[str, Dict[str, Any]],
+    model: str,
+    templates_hash: str,
+) -> List[Dict[str, str]]:
+    """Return endpoints whose inputs differ from the manifest or whose outputs are missing."""
+    changed = []
+    for endpoint in endpoints:
+        expected = build_manifest_entry(
+            endpoint, _coverage_context_for(endpoint, coverage_lookup), model, templates_hash
+        )
+        recorded = manifest.get(_manifest_key(endpoint))
+        outputs_exist = all(Path(expected[k]).exists() for k in ('feature_file', 'steps_file'))
+        if recorded != expected or not outputs_exist:
+            changed.append(endpoint)
+    return changed
+
+def _coverage_context_for(endpoint: Dict[str, str], coverage_lookup: Dict[str, str]) -> str:
+    """Look up the coverage hints for an endpoint file."""
+    normalized_path = _normalize_path_for_lookup(endpoint["file"])
+    return coverage_lookup.get(
+        normalized_path,
+        "No uncovered lines reported; include auth failures, validation errors, and edge cases.",
+    )
+
+def run_generation_pipeline(
+    endpoints: List[Dict[str, str]],
+    coverage_lookup: Dict[str, str],
+    model: str,
+    workers: int = DEFAULT_WORKERS,
+) -> Dict[str, Tuple[Path, Path]]:
+    """Generate feature files and step definitions as two pipelined stages.
+
+    Stage one generates a feature file per endpoint; as soon as one finishes its
+    step definitions are queued on the second stage, so step generation for early
+    files overlaps with feature generation for later ones. Both stages share the
+    module-level rate limiter. Returns the generated pair for each source file
+    that completed both stages.
+    """
+    workers = max(1, workers)
+    generated: Dict[str, Tuple[Path, Path]] = {}
+    failures: List[str] = []
+
+    # Concurrent workers writing the same file would interleave their output
+    owners: Dict[Path, str] = {}
+    for endpoint in endpoints:
+        feature_path, _ = _output_paths(endpoint)
+        if feature_path in owners:
+            raise ValueError(
+                f"{owners[feature_path]} and {endpoint['file']} both generate {feature_path}"
+            )
+        owners[feature_path] = endpoint['file']
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="feature") as feature_pool, \
+            ThreadPoolExecutor(max_workers=workers, thread_name_prefix="steps") as steps_pool:
+        feature_futures = {
+            feature_pool.submit(
+                generate_feature_file,
+                endpoint,
+                coverage_context=_coverage_context_for(endpoint, coverage_lookup),
+                model=model,
+                output_path=_output_paths(endpoint)[0],
+            ): endpoint
+            for endpoint in endpoints
+        }
+
+        step_futures = {}
+        for future in as_completed(feature_futures):
+            endpoint = feature_futures[future]
+            try:
+                feature_path, feature_content = future.result()
+            except Exception as e:
+                failures.append(endpoint['file'])
+                print(f"Feature generation failed for {endpoint['file']}: {e}")
+                continue
+            step_future = steps_pool.submit(
+                generate_step_definitions, feature_path, feature_content, model=model
+            )
+            step_futures[step_future] = (endpoint, feature_path)
+
+        for future in as_completed(step_futures):
+            endpoint, feature_path = step_futures[future]
+            try:
+                generated[endpoint['file']] = (feature_path, future.result())
+            except Exception as e:
+                failures.append(endpoint['file'])
+                print(f"Step generation failed for {endpoint['file']}: {e}")
+
+    if failures:
+        print(f"\n{len(failures)} file(s) failed: {', '.join(sorted(failures))}")
+    return generated
+
 def main():
     parser = argparse.ArgumentParser(description='Generate BDD tests using Groq API')
     parser.add_argument('--api-key', type=str, help='Groq API key')
     parser.add_argument('--model', type=str, default='llama-3.1-8b-instant', help='Groq model to use')
     parser.add_argument('--endpoint', type=str, help='Specific API endpoint file to analyze')
-    parser.add_argument('--coverage-xml', type=str, default=str(COVERAGE_XML_PATH),
-                        help='Coverage XML file to prioritize uncovered lines')
+    parser.add_argument('--coverage-xml', type=str, nargs='+', default=[str(COVERAGE_XML_PATH)],
+                        help='Coverage XML file(s) to prioritize uncovered lines (merged)')
+    parser.add_argument('--baseline-xml', type=str, nargs='+',
+                        help='Baseline coverage XML file(s); only target lines newly uncovered since then')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                        help='Number of concurrent Groq requests per pipeline stage')
+    parser.add_argument('--rpm', type=float, default=DEFAULT_REQUESTS_PER_MINUTE,
+                        help='Client-side request budget per minute (token bucket size)')
+    parser.add_argument('--incremental', action='store_true',
+                        help='Only regenerate files whose source, coverage gaps, model or templates changed')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Always call the Groq API instead of reusing cached responses')
+    parser.add_argument('--cache-dir', type=str, default=str(CACHE_DIR),
+                        help='Directory for cached Groq responses')
+    parser.add_argument('--cache-max-age-days', type=float, default=CACHE_MAX_AGE_DAYS,
+                        help='Discard cached responses older than this many days')
+    parser.add_argument('--cache-max-mb', type=float, default=CACHE_MAX_SIZE_MB,
+                        help='Evict least recently used cached responses above this size')
     args = parser.parse_args()
     
+    rate_limiter.configure(args.rpm)
+
+    global response_cache
+    response_cache = ResponseCache(
+        cache_dir=Path(args.cache_dir),
+        max_age_days=args.cache_max_age_days,
+        max_size_mb=args.cache_max_mb,
+        enabled=not args.no_cache,
+    )
+    
     # Set Groq API key if provided
     if args.api_key:
         os.environ["GROQ_API_KEY"] = args.api_key
@@ -271,28 +733,43 @@ def main():
     print(f"Found {len(endpoints)} API endpoint files")
 
     # Load coverage hints if available
-    coverage_lookup = _build_coverage_lookup(Path(args.coverage_xml))
+    coverage_lookup = _build_coverage_lookup(
+        [Path(path) for path in args.coverage_xml],
+        [Path(path) for path in args.baseline_xml] if args.baseline_xml else None,
+    )
     
-    # Generate feature files and step definitions
-    for endpoint in endpoints:
-        normalized_path = _normalize_path_for_lookup(endpoint["file"])
-        coverage_context = coverage_lookup.get(
-            normalized_path,
-            "No uncovered lines reported; include auth failures, validation errors, and edge cases.",
+    templates_hash = _hash_text(TEMPLATES_FILE.read_text())
+    manifest = load_manifest()
+    if args.incremental:
+        all_count = len(endpoints)
+        endpoints = select_changed_endpoints(
+            endpoints, coverage_lookup, manifest, args.model, templates_hash
         )
+        print(f"Incremental mode: {len(endpoints)} of {all_count} files changed since last run")
+    
+    # Generate feature files and step definitions
+    generated = run_generation_pipeline(
+        endpoints,
+        coverage_lookup,
+        model=args.model,
+        workers=args.workers,
+    )
 
-        # Generate feature file
-        feature_path, feature_content = generate_feature_file(
-            endpoint,
-            coverage_context=coverage_context,
-            model=args.model,
-        )
-        
-        # Generate step definitions
-        generate_step_definitions(feature_path, feature_content, model=args.model)
-        
-        # Delay to avoid rate limiting
-        time.sleep(1)
+    # Record inputs of every successfully generated pair for the next incremental run
+    for endpoint in endpoints:
+        if endpoint['file'] in generated:
+            manifest[_manifest_key(endpoint)] = build_manifest_entry(
+                endpoint,
+                _coverage_context_for(endpoint, coverage_lookup),
+                args.model,
+                templates_hash,
+            )
+    save_manifest(manifest)
+    
+    if response_cache.enabled:
+        evicted = response_cache.evict()
+        print(f"\nResponse cache: {response_cache.hits} hits, {response_cache.misses} misses, "
+              f"{evicted} entries evicted ({response_cache.cache_dir})")
     
     print("\nBDD test generation complete!")
     print("Run the tests with: cd backend && python -m behave app/tests/features")